@@ -413,6 +413,23 @@ const Results = () => {
       const candidateNames = resultsCandidates[constituency] || [];
       const votesData = {};
 
+      // Cached tallies from the backend indexer, the contract is the fallback
+      try {
+        const response = await fetch(`http://localhost:5000/api/results?constituency=${constituency.toLowerCase()}`);
+        if (response.ok) {
+          const data = await response.json();
+          const cached = data.constituencies[constituency.toLowerCase()]?.candidates || [];
+          candidateNames.forEach((name, idx) => {
+            const entry = cached.find(c => c.index === idx);
+            votesData[name] = entry ? entry.votes : 0;
+          });
+          setVotes(votesData);
+          return;
+        }
+      } catch {
+        // Backend unreachable, read the contract directly below
+      }
+
       try {
         const rawResults = await contract.getResultsFor(cIdx);
         const counts = Array.isArray(rawResults) ? rawResults.map(v => Number(v)) 
@@ -489,6 +506,19 @@ const Results = () => {
           <option value="">Choose a constituency</option>
           {resultsConstituencies.map(c => <option key={c} value={c}>{c}</option>)}
         </select>
+        {/* Streamed from the backend, gzipped by the browser's Accept-Encoding */}
+        <div style={{ display: 'flex', gap: '12px', marginTop: '16px', flexWrap: 'wrap' }}>
+          {selectedConstituency && (
+            <a href={`http://localhost:5000/api/export/voters?format=csv&limit=0&constituency=${selectedConstituency.toLowerCase()}`}
+              style={{ ...styles.button, ...styles.buttonPrimary, textDecoration: 'none' }}>
+              ⬇️ {selectedConstituency} Voter Roll (CSV)
+            </a>
+          )}
+          <a href="http://localhost:5000/api/export/turnout?format=csv"
+            style={{ ...styles.button, ...styles.buttonPrimary, textDecoration: 'none' }}>
+            ⬇️ Turnout (CSV)
+          </a>
+        </div>
       </div>
 
       {loading && (
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 
 const FingerprintEnroll = ({ onFingerprintCaptured, styles }) => {
   const [enrolling, setEnrolling] = useState(false);
@@ -6,9 +6,15 @@ const FingerprintEnroll = ({ onFingerprintCaptured, styles }) => {
   const [status, setStatus] = useState('');
   const [scannerStatus, setScannerStatus] = useState(null);
   const [checkingDuplicate, setCheckingDuplicate] = useState(false);
+  const eventSourceRef = useRef(null);
 
   useEffect(() => {
     checkScannerStatus();
+    return () => {
+      if (eventSourceRef.current) {
+        eventSourceRef.current.close();
+      }
+    };
   }, []);
 
   const checkScannerStatus = async () => {
@@ -88,48 +94,62 @@ const FingerprintEnroll = ({ onFingerprintCaptured, styles }) => {
 
       setStatus('👆 Step 1/3: Place finger...');
 
-      let attempts = 0;
-      const maxAttempts = 120;
-
-      const pollInterval = setInterval(async () => {
-        attempts++;
-
-        try {
-          const statusResponse = await fetch('http://localhost:5000/api/fingerprint/enroll_status');
-          const statusResult = await statusResponse.json();
-
-          if (statusResult.message && statusResult.message !== status) {
-            setStatus(statusResult.message);
-            console.log('Status:', statusResult.message);
-          }
-
-          if (statusResult.enrolled && statusResult.template_data) {
-            clearInterval(pollInterval);
-            setFingerprintData(statusResult.template_data);
-            setStatus('✅ Fingerprint enrolled successfully!');
-            setEnrolling(false);
-
-            if (onFingerprintCaptured) {
-              onFingerprintCaptured(statusResult.template_data);
-            }
-          } else if (!statusResult.success && !statusResult.waiting) {
-            clearInterval(pollInterval);
-            setStatus(`❌ ${statusResult.error || 'Enrollment failed'}`);
-            setEnrolling(false);
-          }
-
-          if (attempts >= maxAttempts) {
-            clearInterval(pollInterval);
-            setStatus('⏱️ Timeout - restart enrollment');
-            setEnrolling(false);
-          }
-        } catch (error) {
-          clearInterval(pollInterval);
-          setStatus('❌ Connection error');
-          setEnrolling(false);
-          console.error('Polling error:', error);
+      // Server pushes each enrollment step as it arrives from the sensor
+      const events = new EventSource(
+        `http://localhost:5000/api/fingerprint/events?cursor=${startResult.cursor ?? ''}`
+      );
+      eventSourceRef.current = events;
+      let timeout = null;
+
+      const finish = (message) => {
+        clearTimeout(timeout);
+        events.close();
+        eventSourceRef.current = null;
+        if (message) setStatus(message);
+        setEnrolling(false);
+      };
+
+      timeout = setTimeout(() => finish('⏱️ Timeout - restart enrollment'), 60000);
+
+      events.addEventListener('enroll_step', (e) => {
+        const data = JSON.parse(e.data);
+        setStatus(data.message);
+        console.log('Status:', data.message);
+      });
+
+      events.addEventListener('enroll_complete', (e) => {
+        const data = JSON.parse(e.data);
+        setFingerprintData(data.template_data);
+        finish('✅ Fingerprint enrolled successfully!');
+
+        if (onFingerprintCaptured) {
+          onFingerprintCaptured(data.template_data);
+        }
+      });
+
+      events.addEventListener('enroll_failed', (e) => {
+        finish(`❌ ${JSON.parse(e.data).message || 'Enrollment failed'}`);
+      });
+
+      events.addEventListener('enroll_cancelled', () => finish('❌ Enrollment cancelled'));
+
+      events.addEventListener('reset', (e) => {
+        // The server restarted (its enrollment is gone) or events were dropped
+        const { reason } = JSON.parse(e.data);
+        if (reason === 'restarted') {
+          finish('❌ Scanner service restarted - restart enrollment');
+        } else {
+          console.warn('Fingerprint events skipped, continuing from', e.lastEventId);
+        }
+      });
+
+      events.onerror = () => {
+        // EventSource reconnects by itself (resuming from the last event id),
+        // only give up once the browser has closed the stream
+        if (events.readyState === EventSource.CLOSED) {
+          finish('❌ Connection error');
         }
-      }, 500);
+      };
 
     } catch (error) {
       setStatus(`❌ ${error.message}`);
@@ -0,0 +1,184 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from metrics import render_metric
+
+# ADMISSION_LIMITS='register=2,authenticate_face=4', concurrent requests per
+# endpoint; endpoints not listed get the controller's default limit
+ADMISSION_LIMITS = os.environ.get('ADMISSION_LIMITS', '')
+# Requests allowed to wait per endpoint (default: 4x its limit)
+ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', '0'))
+# Longest a request may wait for a slot before it is shed, in seconds
+ADMISSION_DEADLINE = float(os.environ.get('ADMISSION_DEADLINE', '5'))
+
+
+def parse_limits(spec):
+    """'register=2,authenticate_face=4' -> {'register': 2, 'authenticate_face': 4}"""
+    limits = {}
+    for entry in filter(None, (e.strip() for e in spec.split(','))):
+        name, _, limit = entry.partition('=')
+        limits[name.strip()] = int(limit)
+    return limits
+
+
+class Shed(Exception):
+    """Request rejected before running, carries the HTTP status and Retry-After"""
+
+    def __init__(self, lane, reason, status, retry_after):
+        super().__init__(f'{lane}: shed ({reason})')
+        self.lane = lane
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('admitted',)
+
+    def __init__(self):
+        self.admitted = False
+
+
+class AdmissionLane:
+    """Concurrency limit + bounded wait queue for one endpoint.
+
+    Waiting requests are queued per booth and slots are handed out round-robin
+    across booths, so one busy booth cannot starve the others. A request is
+    shed up front when the queue (or its booth's share of it) is full, or when
+    the estimated wait already exceeds the deadline, instead of timing out late.
+    """
+
+    def __init__(self, name, limit, queue_size, deadline):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.cond = threading.Condition()
+        self.running = 0
+        self.queued = 0
+        self.waiting = OrderedDict()
+        self.service_time = None
+        self.admitted_total = 0
+        self.shed_total = {}
+
+    def _estimated_wait(self, position):
+        if self.service_time is None:
+            return 0.0
+        return position * self.service_time / self.limit
+
+    def _shed(self, reason, status, position):
+        self.shed_total[reason] = self.shed_total.get(reason, 0) + 1
+        retry_after = max(1, math.ceil(self._estimated_wait(position)))
+        raise Shed(self.name, reason, status, retry_after)
+
+    def acquire(self, booth_id):
+        """Block until a slot is free, returns the seconds spent waiting"""
+        booth_id = booth_id or 'default'
+        started = time.perf_counter()
+        with self.cond:
+            if self.running < self.limit and not self.queued:
+                self.running += 1
+                self.admitted_total += 1
+                return 0.0
+            position = self.queued + 1
+            if self.queued >= self.queue_size:
+                self._shed('queue_full', 429, position)
+            booth_queue = self.waiting.get(booth_id)
+            booths = len(self.waiting) + (booth_queue is None)
+            if booth_queue is not None and len(booth_queue) >= max(1, self.queue_size // booths):
+                self._shed('booth_share', 429, position)
+            if self._estimated_wait(position) > self.deadline:
+                self._shed('deadline', 503, position)
+
+            waiter = _Waiter()
+            self.waiting.setdefault(booth_id, deque()).append(waiter)
+            self.queued += 1
+            remaining = self.deadline
+            while not waiter.admitted and remaining > 0:
+                self.cond.wait(remaining)
+                remaining = self.deadline - (time.perf_counter() - started)
+            if not waiter.admitted:
+                booth_queue = self.waiting[booth_id]
+                booth_queue.remove(waiter)
+                if not booth_queue:
+                    del self.waiting[booth_id]
+                self.queued -= 1
+                self._shed('timeout', 503, self.queued + 1)
+            self.admitted_total += 1
+        return time.perf_counter() - started
+
+    def release(self, service_seconds):
+        """Free a slot and hand it to the next booth in round-robin order"""
+        with self.cond:
+            # Moving average of how long an admitted request holds its slot
+            if self.service_time is None:
+                self.service_time = service_seconds
+            else:
+                self.service_time += 0.2 * (service_seconds - self.service_time)
+            if self.waiting:
+                booth_id, booth_queue = next(iter(self.waiting.items()))
+                booth_queue.popleft().admitted = True
+                self.queued -= 1
+                if booth_queue:
+                    self.waiting.move_to_end(booth_id)
+                else:
+                    del self.waiting[booth_id]
+                self.cond.notify_all()
+            else:
+                self.running -= 1
+
+
+class AdmissionController:
+    """Per-endpoint admission lanes for the CPU-heavy biometric requests"""
+
+    def __init__(self, default_limit, limits=None, queue_size=ADMISSION_QUEUE_SIZE,
+                 deadline=ADMISSION_DEADLINE):
+        if limits is None:
+            limits = parse_limits(ADMISSION_LIMITS)
+        self.default_limit = default_limit
+        self.limits = limits
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.lanes = {}
+        self.lock = threading.Lock()
+
+    def lane(self, name):
+        with self.lock:
+            lane = self.lanes.get(name)
+            if lane is None:
+                limit = max(self.limits.get(name, self.default_limit), 1)
+                lane = self.lanes[name] = AdmissionLane(
+                    name, limit, self.queue_size or limit * 4, self.deadline)
+            return lane
+
+    def status(self):
+        with self.lock:
+            lanes = list(self.lanes.values())
+        return {
+            lane.name: {
+                'limit': lane.limit,
+                'running': lane.running,
+                'queued': lane.queued,
+                'queue_size': lane.queue_size,
+                'admitted': lane.admitted_total,
+                'shed': dict(lane.shed_total),
+            }
+            for lane in lanes
+        }
+
+    def render(self):
+        lanes = sorted(self.status().items())
+        return (
+            render_metric('admission_in_flight', 'gauge', 'Admitted requests running per endpoint',
+                          [({'endpoint': n}, s['running']) for n, s in lanes])
+            + render_metric('admission_queue_depth', 'gauge', 'Requests waiting for a slot per endpoint',
+                            [({'endpoint': n}, s['queued']) for n, s in lanes])
+            + render_metric('admission_admitted_total', 'counter', 'Requests admitted per endpoint',
+                            [({'endpoint': n}, s['admitted']) for n, s in lanes])
+            + render_metric('admission_shed_total', 'counter', 'Requests shed per endpoint and reason',
+                            [({'endpoint': n, 'reason': r}, c)
+                             for n, s in lanes for r, c in sorted(s['shed'].items())])
+        )
@@ -0,0 +1,46 @@
+import os
+import secrets
+import threading
+import time
+
+# Seconds between a successful booth authentication and mark_voted
+VOTE_SESSION_TTL = float(os.environ.get('VOTE_SESSION_TTL', '300'))
+
+
+class SessionTokens:
+    """Short-lived, single-use tokens proving a voter passed authentication"""
+
+    def __init__(self, ttl=VOTE_SESSION_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.sessions = {}  # token -> (voter_id, expires_at)
+
+    def issue(self, voter_id):
+        token = secrets.token_urlsafe(24)
+        now = time.time()
+        with self.lock:
+            # Expired tokens are dropped here, there is no sweeper thread
+            self.sessions = {t: s for t, s in self.sessions.items() if s[1] > now}
+            self.sessions[token] = (voter_id, now + self.ttl)
+        return token
+
+    def owner(self, token):
+        """Voter ID of a valid token, without using it up; None otherwise"""
+        with self.lock:
+            session = self.sessions.get(token) if token else None
+        if session is None or session[1] < time.time():
+            return None
+        return session[0]
+
+    def redeem(self, token, voter_id):
+        """Use up a valid token of ``voter_id``, returns whether it was one.
+
+        A token presented for another voter is left alone, the voter it was
+        issued to can still use it.
+        """
+        with self.lock:
+            session = self.sessions.get(token) if token else None
+            if session is None or session[0] != voter_id:
+                return False
+            del self.sessions[token]
+        return session[1] >= time.time()
@@ -0,0 +1,122 @@
+"""Face authentication under overload, with and without admission control.
+
+    python benchmarks/bench_admission.py --capacity 2 --face-delay 0.2 \
+        --clients 32 --requests 320 --client-timeout 2
+
+Face encoding is replaced by a --face-delay sleep behind a semaphore of
+--capacity slots, standing in for a fixed number of HOG workers. Clients are
+split between a busy booth and a quiet one (--quiet-clients). A response only
+counts as good when it arrives within --client-timeout, the point at which a
+booth operator gives up; shed responses (429/503) are counted separately.
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+
+
+def capture():
+    buf = io.BytesIO()
+    Image.fromarray(np.zeros((32, 32, 3), dtype=np.uint8)).save(buf, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--capacity', type=int, default=2)
+    parser.add_argument('--face-delay', type=float, default=0.2)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--quiet-clients', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=320)
+    parser.add_argument('--client-timeout', type=float, default=2.0)
+    parser.add_argument('--deadline', type=float, default=1.0)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    os.environ.update(FINGERPRINT_PORTS='booth1=/dev/null-bench', FACE_WORKERS='0')
+    os.chdir(tempfile.mkdtemp())
+
+    import face_engine
+    import voter_auth_api
+    from admission import AdmissionController
+
+    encoding = np.random.default_rng(0).normal(0, 0.1, 128)
+    workers = threading.Semaphore(args.capacity)
+
+    def stub_encode(image):
+        with workers:
+            time.sleep(args.face_delay)
+        return encoding, 1, {}
+
+    face_engine._encode_job = stub_encode
+    voter_auth_api.store.add('A00001', {'name': 'Bench', 'constituency': 'beed',
+                                        'face_encoding': encoding.tolist(),
+                                        'fingerprint_id': '1'})
+    client = voter_auth_api.app.test_client()
+    payload = {'voter_id': 'A00001', 'face_data': capture()}
+
+    cases = {
+        'unlimited': AdmissionController(default_limit=10 ** 6, limits={}),
+        'admission': AdmissionController(default_limit=args.capacity, limits={},
+                                         deadline=args.deadline),
+    }
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name, controller in cases.items():
+        voter_auth_api.admission = controller
+        lock = threading.Lock()
+        good = {'busy': [], 'quiet': []}
+        counts = {'late': 0, 'shed': 0, 'error': 0}
+        counter = iter(range(args.requests))
+
+        def worker(booth):
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                t0 = time.perf_counter()
+                r = client.post('/api/authenticate/face', json=payload,
+                                headers={'X-Booth-Id': booth})
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    if r.status_code in (429, 503):
+                        counts['shed'] += 1
+                    elif r.status_code != 200:
+                        counts['error'] += 1
+                    elif elapsed > args.client_timeout:
+                        counts['late'] += 1
+                    else:
+                        good[booth].append(elapsed * 1000)
+                # Shed clients back off before retrying, as the booth UI does
+                if r.status_code in (429, 503):
+                    time.sleep(min(float(r.headers.get('Retry-After', 1)), 1.0))
+
+        booths = ['quiet'] * args.quiet_clients + ['busy'] * (args.clients - args.quiet_clients)
+        threads = [threading.Thread(target=worker, args=(b,)) for b in booths]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        case = {'elapsed_s': round(elapsed, 2), **counts}
+        for booth, samples in good.items():
+            case[booth] = summarize(samples, elapsed)
+            print_row(f'{name} ({booth} booth)', case[booth])
+        print(f"{'':<28}late={counts['late']} shed={counts['shed']} error={counts['error']}")
+        results['results'][name] = case
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Concurrent API load test against a synthetic voter population.
+
+    python benchmarks/bench_api.py --voters 10000 --clients 8 --requests 400 \
+        --stub-faces --json results.json
+
+Drives check_voter_id, authenticate/face, authenticate/fingerprint,
+mark_voted, register and health concurrently through the Flask test client,
+or through a running server with --url. --stub-faces replaces HOG detection
+and encoding with a lookup so the numbers isolate store and I/O costs
+(test client only). Results include the environment and config so runs from
+different releases can be compared.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import random
+import time
+
+import numpy as np
+from PIL import Image
+
+from bench_utils import environment, print_header, print_row, run_clients, write_results
+from synth_voters import generate, voter_id
+
+SCENARIOS = ('check_voter_id', 'authenticate_face', 'authenticate_fingerprint',
+             'mark_voted', 'register', 'health')
+
+
+def unique_image(i):
+    """Small lossless PNG whose decoded pixels are unique to ``i``"""
+    pixels = np.random.default_rng(i).integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, 'PNG')
+    return pixels, 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+class HttpClient:
+    """Minimal stand-in for the Flask test client over real HTTP"""
+
+    def __init__(self, base_url):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+
+    def get(self, path):
+        return _HttpResponse(self.session.get(self.base_url + path))
+
+    def post(self, path, json=None):
+        return _HttpResponse(self.session.post(self.base_url + path, json=json))
+
+
+class _HttpResponse:
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.json = response.json() if response.content else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--backend', choices=('sqlite', 'json'), default='sqlite')
+    parser.add_argument('--workdir', help='Reuse/generate the population here')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--stub-faces', action='store_true')
+    parser.add_argument('--url', help='Benchmark a running server instead of the test client')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or f'bench_data/{args.backend}_{args.voters}')
+    marker = os.path.join(workdir, 'voters.db' if args.backend == 'sqlite' else 'voters_db.json')
+    if not os.path.exists(marker):
+        generate(args.voters, workdir, args.backend, args.seed)
+
+    face_payloads = {}
+    voter_auth_api = None
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        os.environ.update({
+            'VOTER_STORE': args.backend,
+            'VOTERS_DB': os.path.join(workdir, 'voters.db'),
+            'FACE_INDEX_PATH': os.path.join(workdir, 'face_index'),
+            'FINGERPRINT_PORTS': os.environ.get('FINGERPRINT_PORTS', 'bench=/dev/null-scanner'),
+        })
+        if args.stub_faces:
+            os.environ['FACE_WORKERS'] = '0'
+        os.chdir(workdir)
+        import voter_auth_api
+        client = voter_auth_api.app.test_client()
+
+        if args.stub_faces:
+            import face_engine
+            known = {}
+
+            def stub_encode(image):
+                digest = hashlib.sha1(np.ascontiguousarray(image).tobytes()).hexdigest()
+                encoding = known.get(digest)
+                if encoding is None:
+                    encoding = np.random.default_rng(int(digest[:8], 16)).normal(0, 0.1, 128)
+                return encoding, 1, {}
+
+            face_engine._encode_job = stub_encode
+            # Face auth targets the first quarter of the roll, give each a matching capture
+            for i in range(min(args.requests, args.voters // 4)):
+                pixels, payload = unique_image(i)
+                stored = voter_auth_api.store.get(voter_id(i))['face_encoding']
+                known[hashlib.sha1(pixels.tobytes()).hexdigest()] = np.array(stored)
+                face_payloads[i] = payload
+
+    rng = random.Random(args.seed)
+    quarter = max(args.voters // 4, 1)
+    run_tag = int(time.time())
+
+    def check(i):
+        r = client.post('/api/check_voter_id', json={'voter_id': voter_id(rng.randrange(args.voters))})
+        return r.status_code == 200
+
+    def face(i):
+        n = i % quarter
+        payload = face_payloads.get(n) or unique_image(n)[1]
+        r = client.post('/api/authenticate/face', json={'voter_id': voter_id(n), 'face_data': payload})
+        return r.status_code == 200
+
+    def fingerprint(i):
+        n = rng.randrange(quarter)
+        r = client.post('/api/authenticate/fingerprint', json={
+            'voter_id': voter_id(n), 'fingerprint_template': f'FP_TEMPLATE_{n + 1}_{run_tag}'})
+        return r.status_code == 200
+
+    def mark(i):
+        # Second half of the roll, one voter per request. mark_voted needs a
+        # booth session token, only the test client can mint those directly
+        n = quarter * 2 + (i % (args.voters - quarter * 2))
+        token = voter_auth_api.sessions.issue(voter_id(n)) if not args.url else None
+        return client.post('/api/mark_voted', json={
+            'voter_id': voter_id(n), 'session_token': token}).status_code == 200
+
+    def register(i):
+        n = args.voters + run_tag % 100000 * 1000 + i
+        r = client.post('/api/register', json={
+            'voter_id': f'R{n}', 'name': 'Bench Voter', 'constituency': 'beed',
+            'face_data': unique_image(10 ** 9 + n)[1],
+            'fingerprint_template': f'FP_TEMPLATE_{10 ** 7 + n}_{run_tag}'})
+        return r.status_code == 200
+
+    def health(i):
+        return client.get('/api/health').status_code == 200
+
+    jobs = dict(zip(SCENARIOS, (check, face, fingerprint, mark, register, health)))
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name in args.scenarios.split(','):
+        summary = run_clients(args.clients, args.requests, jobs[name])
+        results['results'][name] = summary
+        print_row(name, summary)
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
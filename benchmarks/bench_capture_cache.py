@@ -0,0 +1,76 @@
+"""Booth resends of the same capture, with and without the capture cache.
+
+    python benchmarks/bench_capture_cache.py --voters 30 --resends 2 --face-delay 0.2
+
+Each voter authenticates once and the booth then resends the identical
+capture --resends times (a retry after a fingerprint miss or a dropped
+response). Encoding is replaced by a --face-delay sleep; "uncached" runs the
+same requests with the cache disabled.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_api import unique_image
+from bench_utils import environment, print_header, print_row, summarize, write_results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=30)
+    parser.add_argument('--resends', type=int, default=2)
+    parser.add_argument('--face-delay', type=float, default=0.2)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    os.environ.update(FINGERPRINT_PORTS='booth1=/dev/null-bench', FACE_WORKERS='0')
+    os.chdir(tempfile.mkdtemp())
+
+    import face_engine
+    import voter_auth_api
+    from capture_cache import CaptureCache
+
+    encoding = np.random.default_rng(0).normal(0, 0.1, 128)
+
+    def stub_encode(image):
+        time.sleep(args.face_delay)
+        return encoding, 1, {}
+
+    face_engine._encode_job = stub_encode
+    client = voter_auth_api.app.test_client()
+    ids = [f'C{i:05d}' for i in range(args.voters)]
+    for voter_id in ids:
+        voter_auth_api.store.add(voter_id, {'name': 'Bench', 'constituency': 'beed',
+                                            'face_encoding': encoding.tolist(),
+                                            'fingerprint_id': voter_id})
+    captures = {voter_id: unique_image(i)[1] for i, voter_id in enumerate(ids)}
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name, cache in (('uncached', CaptureCache(max_bytes=0)), ('cached', CaptureCache())):
+        voter_auth_api.capture_cache = cache
+        first, resends, failures = [], [], 0
+        started = time.perf_counter()
+        for voter_id in ids:
+            for attempt in range(args.resends + 1):
+                t0 = time.perf_counter()
+                r = client.post('/api/authenticate/face', json={'voter_id': voter_id,
+                                                                'face_data': captures[voter_id]})
+                (resends if attempt else first).append((time.perf_counter() - t0) * 1000)
+                failures += r.status_code != 200
+        elapsed = time.perf_counter() - started
+        case = {'first': summarize(first), 'resend': summarize(resends, elapsed),
+                'failures': failures, 'hits': cache.hits, 'misses': cache.misses}
+        results['results'][name] = case
+        print_row(f'{name} (first attempt)', case['first'])
+        print_row(f'{name} (resend)', case['resend'])
+        print(f"{'':<28}hits={cache.hits} misses={cache.misses} failures={failures}")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
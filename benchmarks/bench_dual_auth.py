@@ -0,0 +1,103 @@
+"""Booth wall-clock per voter: separate round trips vs /api/authenticate/dual.
+
+    python benchmarks/bench_dual_auth.py --voters 10 --scan-delay 0.8 --face-delay 0.5
+
+Sequential is the old booth flow (face auth, then scan, then fingerprint
+auth). Face encoding is replaced by a fixed --face-delay sleep so only the
+overlap is measured; the sensor is a FingerprintSimulator (POSIX only).
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+from fingerprint_simulator import FingerprintSimulator
+
+
+def capture(i):
+    buf = io.BytesIO()
+    Image.fromarray(np.full((32, 32, 3), i % 256, dtype=np.uint8)).save(buf, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=10)
+    parser.add_argument('--scan-delay', type=float, default=0.8)
+    parser.add_argument('--face-delay', type=float, default=0.5)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    sim = FingerprintSimulator(boot_delay=0.2, scan_delay=args.scan_delay, enrolled_slots=[1])
+    os.environ.update(FINGERPRINT_PORTS=f'booth1={sim.port}', FACE_WORKERS='0')
+    os.chdir(tempfile.mkdtemp())
+
+    import face_engine
+    import voter_auth_api
+    from capture_cache import CaptureCache
+    encoding = np.random.default_rng(0).normal(0, 0.1, 128)
+
+    def stub_encode(image):
+        time.sleep(args.face_delay)
+        return encoding, 1, {}
+
+    face_engine._encode_job = stub_encode
+    # Every voter sends the same capture, keep the cache from answering it
+    voter_auth_api.capture_cache = CaptureCache(max_bytes=0)
+    voter_auth_api.scanner_pool.wait_connected(timeout=10)
+    client = voter_auth_api.app.test_client()
+    ids = [f'D{i:05d}' for i in range(args.voters * 2)]
+    for voter_id in ids:
+        # Every simulated scan matches slot 1, the fingerprint check only needs
+        # the slot to agree, so the slot is reassigned per voter below
+        voter_auth_api.store.add(voter_id, {'name': 'Bench', 'constituency': 'beed',
+                                            'face_encoding': encoding.tolist(),
+                                            'fingerprint_id': f'{voter_id}-slot'})
+
+    def set_slot(voter_id):
+        store = voter_auth_api.store
+        if hasattr(store, 'conn'):
+            store.conn.execute('UPDATE voters SET fingerprint_id = NULL WHERE fingerprint_id = ?', ('1',))
+            store.conn.execute('UPDATE voters SET fingerprint_id = ? WHERE voter_id = ?', ('1', voter_id))
+        else:
+            store.voters[voter_id]['fingerprint_id'] = '1'
+
+    def sequential(voter_id):
+        face = client.post('/api/authenticate/face', json={'voter_id': voter_id, 'face_data': capture(1)})
+        scan = client.get('/api/fingerprint/scan').json
+        fp = client.post('/api/authenticate/fingerprint', json={
+            'voter_id': voter_id, 'fingerprint_template': scan.get('template_data')})
+        return face.status_code == 200 and fp.status_code == 200
+
+    def dual(voter_id):
+        r = client.post('/api/authenticate/dual', json={'voter_id': voter_id, 'face_data': capture(1)})
+        return r.status_code == 200
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name, flow, voters in (('sequential', sequential, ids[:args.voters]),
+                               ('dual', dual, ids[args.voters:])):
+        samples, failures = [], 0
+        started = time.perf_counter()
+        for voter_id in voters:
+            set_slot(voter_id)
+            t0 = time.perf_counter()
+            failures += not flow(voter_id)
+            samples.append((time.perf_counter() - t0) * 1000)
+        summary = summarize(samples, time.perf_counter() - started)
+        summary['failures'] = failures
+        results['results'][name] = summary
+        print_row(name, summary)
+    sim.close()
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
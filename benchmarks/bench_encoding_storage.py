@@ -0,0 +1,91 @@
+"""Load time, memory and size of face encodings: JSON lists vs float32.
+
+    python benchmarks/bench_encoding_storage.py --voters 100000
+
+Builds the same synthetic roll as a legacy voters_db.json (inline float
+lists) and in the current JSON and SQLite stores, then times opening each
+store and reading every encoding.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from bench_utils import environment, write_results
+from synth_voters import synthetic_records
+from voter_store import JsonVoterStore, SqliteVoterStore
+
+
+def measure(label, open_fn, read_all=None):
+    tracemalloc.start()
+    started = time.perf_counter()
+    opened = open_fn()
+    load_s = time.perf_counter() - started
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    read_s = None
+    if read_all is not None:
+        started = time.perf_counter()
+        read_all(opened)
+        read_s = time.perf_counter() - started
+    return {'label': label, 'load_s': round(load_s, 3), 'memory_mb': round(memory_mb, 1),
+            'read_all_s': round(read_s, 3) if read_s is not None else None}
+
+
+def sizes(*paths):
+    return round(sum(os.path.getsize(p) for p in paths if os.path.exists(p)) / 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=100000)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+    workdir = tempfile.mkdtemp()
+
+    legacy_path = os.path.join(workdir, 'legacy.json')
+    with open(legacy_path, 'w') as f:
+        json.dump(dict(synthetic_records(args.voters)), f, indent=2)
+
+    json_path = os.path.join(workdir, 'voters_db.json')
+    store = JsonVoterStore(json_path)
+    store.add_many(synthetic_records(args.voters))
+    store.close()
+    db_path = os.path.join(workdir, 'voters.db')
+    store = SqliteVoterStore(db_path)
+    store.add_many(synthetic_records(args.voters))
+    store.close()
+
+    def read_legacy(voters):
+        for v in voters.values():
+            np.array(v['face_encoding'])
+
+    def read_store(s):
+        for _, v in s.iter_voters(include_encoding=True):
+            np.asarray(v['face_encoding'])
+
+    def load_legacy():
+        with open(legacy_path) as f:
+            return json.load(f)
+
+    rows = [
+        dict(measure('legacy json lists', load_legacy, read_legacy),
+             size_mb=sizes(legacy_path)),
+        dict(measure('json + float32 file', lambda: JsonVoterStore(json_path), read_store),
+             size_mb=sizes(json_path, json_path + '.encodings')),
+        dict(measure('sqlite float32 blob', lambda: SqliteVoterStore(db_path), read_store),
+             size_mb=sizes(db_path, db_path + '-wal')),
+    ]
+    print(f"{'store':<22} {'load s':>8} {'mem MB':>8} {'read all s':>11} {'disk MB':>8}")
+    for r in rows:
+        print(f"{r['label']:<22} {r['load_s']:>8} {r['memory_mb']:>8} {r['read_all_s']:>11} {r['size_mb']:>8}")
+    if args.json:
+        write_results(args.json, {'environment': environment(), 'config': vars(args), 'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Paging through the whole roll with /api/export/voters.
+
+    python benchmarks/bench_export.py --voters 100000 --page 10000
+
+Reads every page of the synthetic roll (from bench_data/) through the test
+client for each format, with and without gzip, and reports rows/s, bytes on
+the wire and the peak Python heap while streaming (tracemalloc). A concurrent
+check_voter_id loop measures what the export costs the booth path.
+"""
+import argparse
+import os
+import threading
+import time
+import tracemalloc
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+from synth_voters import generate, voter_id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=100000)
+    parser.add_argument('--page', type=int, default=10000)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(f'bench_data/sqlite_{args.voters}')
+    if not os.path.exists(os.path.join(workdir, 'voters.db')):
+        generate(args.voters, workdir, 'sqlite')
+    os.environ.update(FINGERPRINT_PORTS='booth1=/dev/null-bench', FACE_WORKERS='0',
+                      VOTERS_DB=os.path.join(workdir, 'voters.db'),
+                      FACE_INDEX_PATH=os.path.join(workdir, 'face_index'))
+    os.chdir(workdir)
+    import voter_auth_api
+    client = voter_auth_api.app.test_client()
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print(f"{'case':<28}{'rows':>9}{'MB':>9}{'rows/s':>10}{'peak heap MB':>14}")
+    for fmt in ('ndjson', 'csv'):
+        for gzip in (False, True):
+            name = f"{fmt}{' + gzip' if gzip else ''}"
+            headers = {'Accept-Encoding': 'gzip'} if gzip else {}
+            tracemalloc.start()
+            started = time.perf_counter()
+            rows = size = 0
+            cursor = ''
+            while True:
+                r = client.get(f'/api/export/voters?format={fmt}&limit={args.page}&cursor={cursor}',
+                               headers=headers, buffered=False)
+                body = b''.join(r.iter_encoded())
+                r.close()
+                size += len(body)
+                if gzip:
+                    import zlib
+                    body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+                lines = body.splitlines()[1:] if fmt == 'csv' else body.splitlines()
+                rows += len(lines)
+                if len(lines) < args.page:
+                    break
+                last = lines[-1]
+                cursor = (last.split(b',')[0] if fmt == 'csv'
+                          else last.split(b'"voter_id":"')[1].split(b'"')[0]).decode()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            case = {'rows': rows, 'bytes': size, 'seconds': round(elapsed, 2),
+                    'rows_per_s': round(rows / elapsed), 'peak_heap_mb': round(peak / 2 ** 20, 2)}
+            results['results'][name] = case
+            print(f"{name:<28}{rows:>9}{size / 2 ** 20:>9.1f}{case['rows_per_s']:>10}"
+                  f"{case['peak_heap_mb']:>14}")
+
+    # Booth lookups while a full export streams
+    def lookups(samples, stop):
+        i = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            client.post('/api/check_voter_id', json={'voter_id': voter_id(i % args.voters)})
+            samples.append((time.perf_counter() - t0) * 1000)
+            i += 7919
+    print_header()
+    for name, export in (('check_voter_id (idle)', False), ('check_voter_id (exporting)', True)):
+        samples, stop = [], threading.Event()
+        thread = threading.Thread(target=lookups, args=(samples, stop))
+        thread.start()
+        if export:
+            r = client.get(f'/api/export/voters?limit={args.voters}', buffered=False)
+            for _ in r.iter_encoded():
+                pass
+            r.close()
+        else:
+            time.sleep(2)
+        stop.set()
+        thread.join()
+        results['results'][name] = summarize(samples)
+        print_row(name, results['results'][name])
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
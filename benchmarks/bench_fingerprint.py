@@ -0,0 +1,82 @@
+"""Scan / enrollment / slot reconciliation latency against simulated sensors.
+
+    python benchmarks/bench_fingerprint.py --booths 2 --clients 4 --requests 40
+
+Starts one FingerprintSimulator per booth, points FINGERPRINT_PORTS at them
+and drives the Flask endpoints through the test client (POSIX only).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_utils import environment, print_header, print_row, run_clients, write_results
+from fingerprint_simulator import FingerprintSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--booths', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--scan-delay', type=float, default=0.3)
+    parser.add_argument('--enroll-step-delay', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    sims = {f'booth{i + 1}': FingerprintSimulator(
+        boot_delay=0.2, scan_delay=args.scan_delay,
+        enroll_step_delay=args.enroll_step_delay, error_rate=args.error_rate, seed=i)
+        for i in range(args.booths)}
+    os.environ['FINGERPRINT_PORTS'] = ','.join(f'{b}={s.port}' for b, s in sims.items())
+    os.chdir(tempfile.mkdtemp())
+
+    import voter_auth_api
+    client = voter_auth_api.app.test_client()
+    booth_ids = list(sims)
+    for booth_id in booth_ids:
+        voter_auth_api.scanner_pool.wait_connected(timeout=10, booth_id=booth_id)
+
+    def scan(i):
+        r = client.get(f'/api/fingerprint/scan?booth_id={booth_ids[i % len(booth_ids)]}')
+        return r.status_code == 200 and r.json.get('scanned')
+
+    def enroll(i):
+        booth = booth_ids[i % len(booth_ids)]
+        if not client.post(f'/api/fingerprint/start_enroll?booth_id={booth}').json.get('success'):
+            return False
+        while True:
+            status = client.get(f'/api/fingerprint/enroll_status?booth_id={booth}').json
+            if status.get('enrolled'):
+                return True
+            if not status.get('waiting'):
+                return False
+            time.sleep(args.poll_interval)
+
+    def reconcile(i):
+        r = client.post(f'/api/fingerprint/reconcile?booth_id={booth_ids[i % len(booth_ids)]}')
+        return r.status_code == 200 and 'error' not in r.json['booths'][0]
+
+    results = {
+        'environment': environment(),
+        'config': vars(args),
+        # one client per booth, enrollment state is per device
+        'scan': run_clients(args.clients, args.requests, scan),
+        'enroll': run_clients(len(booth_ids), max(len(booth_ids), args.requests // 4), enroll),
+        'reconcile': run_clients(len(booth_ids), args.requests, reconcile),
+    }
+    print_header()
+    print_row(f'scan x{args.clients} clients', results['scan'])
+    print_row(f'enroll x{len(booth_ids)} booths', results['enroll'])
+    print_row(f'reconcile x{len(booth_ids)} booths', results['reconcile'])
+    if args.json:
+        write_results(args.json, results)
+
+    for sim in sims.values():
+        sim.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Per-request latency of the face auth image path: temp JPEG vs in-memory.
+
+Usage: python benchmarks/bench_image_pipeline.py [images...] [--repeat N]
+"""
+import argparse
+import base64
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import face_pipeline  # noqa: E402
+
+
+def legacy_path(payload):
+    """Decode, re-encode as JPEG q95 to disk, read back, detect + encode"""
+    temp_path = face_pipeline.base64_to_image_file(payload, 'temp_auth')
+    encoding, _ = face_pipeline.get_face_encodings(temp_path)
+    os.remove(temp_path)
+    return encoding
+
+
+def in_memory_path(payload, max_size):
+    image = face_pipeline.base64_to_image_array(payload, max_size)
+    encoding, _ = face_pipeline.get_face_encodings_from_array(image)
+    return encoding
+
+
+def timed(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.array(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('images', nargs='*')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-size', type=int, default=face_pipeline.MAX_IMAGE_SIZE)
+    parser.add_argument('--threshold', type=float, default=0.4)
+    args = parser.parse_args()
+
+    images = args.images or sorted(glob.glob(os.path.join(
+        os.path.dirname(__file__), '..', 'voter_faces', '*.jpg')))
+    face_pipeline.FACE_IMAGES_DIR = tempfile.mkdtemp()
+
+    print(f"{'image':<20}{'path':<12}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for image_file in images:
+        with open(image_file, 'rb') as f:
+            payload = 'data:image/jpeg;base64,' + base64.b64encode(f.read()).decode()
+
+        legacy_ms, legacy_enc = timed(lambda: legacy_path(payload), args.repeat)
+        memory_ms, memory_enc = timed(lambda: in_memory_path(payload, args.max_size), args.repeat)
+
+        name = os.path.basename(image_file)
+        for label, samples in (('legacy', legacy_ms), ('in-memory', memory_ms)):
+            print(f"{name:<20}{label:<12}{samples.mean():>10.1f}"
+                  f"{np.percentile(samples, 50):>10.1f}{np.percentile(samples, 99):>10.1f}")
+
+        if legacy_enc is None or memory_enc is None:
+            print(f"{name:<20}face detected: legacy={legacy_enc is not None} "
+                  f"in-memory={memory_enc is not None}")
+            continue
+        drift = float(np.linalg.norm(legacy_enc - memory_enc))
+        same = drift < args.threshold
+        print(f"{name:<20}encoding drift={drift:.4f} within match threshold={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Registration latency with the enrollment photo written inline vs in the background.
+
+    python benchmarks/bench_image_store.py --voters 200 --size 1280 --dir /mnt/sdcard/bench
+
+Registers --voters voters with --size px JPEG captures (as a webcam sends
+them) against a database and photo directory under --dir, so the disk the
+booth server really uses can be measured, --disk-delay adds a sleep to every
+file written to stand in for a slow SD card or network share. "inline"
+writes the photo and its thumbnail on the request thread, the way every
+registration did before; "background" queues it. Encoding is replaced by a
+--face-delay sleep. The save_image column is the time the request itself
+spent on the photo.
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+
+
+def capture(seed, size):
+    """Noisy gradient JPEG, about the size of a real webcam frame"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size * 3 // 4, 0:size]
+    pixels = (x[..., None] * rng.uniform(0.05, 0.2, 3) + y[..., None] * rng.uniform(0.05, 0.2, 3)
+              + rng.normal(0, 12, (size * 3 // 4, size, 3)))
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buf, 'JPEG', quality=92)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=200)
+    parser.add_argument('--size', type=int, default=1280)
+    parser.add_argument('--face-delay', type=float, default=0.0)
+    parser.add_argument('--disk-delay', type=float, default=0.0)
+    parser.add_argument('--dir', help='Working directory (default: a new temp dir)')
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    workdir = args.dir or tempfile.mkdtemp()
+    os.makedirs(workdir, exist_ok=True)
+    os.environ.update(FINGERPRINT_PORTS='booth1=/dev/null-bench', FACE_WORKERS='0',
+                      CAPTURE_CACHE_MB='0')
+    os.chdir(workdir)
+
+    import face_engine
+    import tracing
+    import voter_auth_api
+
+    encoded = [0]
+
+    def stub_encode(image):
+        time.sleep(args.face_delay)
+        # A new face every time so the duplicate-face check passes
+        encoded[0] += 1
+        return np.random.default_rng(encoded[0]).normal(0, 1, 128), 1, {}
+
+    face_engine._encode_job = stub_encode
+    client = voter_auth_api.app.test_client()
+    images = voter_auth_api.face_images
+    queue_save = images.save
+    captures = [capture(i, args.size) for i in range(args.voters)]
+
+    write_file = images._write_file
+
+    def slow_write_file(path, data):
+        time.sleep(args.disk_delay)
+        write_file(path, data)
+
+    def inline_save(image_path, payload):
+        images._write(image_path, payload)
+
+    def save_stage():
+        series = tracing.STAGE_SECONDS.series.get(('register', 'save_image'), {})
+        return series.get('sum', 0.0), series.get('count', 0)
+
+    def register(voter_id, face_data):
+        return client.post('/api/register', json={
+            'voter_id': voter_id, 'name': 'Bench', 'constituency': 'beed',
+            'face_data': face_data, 'fingerprint_template': f'FP_{voter_id}_{voter_id}'})
+
+    images._write_file = slow_write_file
+    for i in range(5):
+        register(f'W{i:05d}', capture(args.voters + i, args.size))
+    images.flush()
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name, save in (('inline', inline_save), ('background', queue_save)):
+        images.save = save
+        # Both runs upload the same captures, each gets its own photo
+        # directory so the second one is not deduplicated against the first
+        images.root = os.path.join('voter_faces', name)
+        samples, failures = [], 0
+        stage_before = save_stage()
+        started = time.perf_counter()
+        for i, face_data in enumerate(captures):
+            t0 = time.perf_counter()
+            r = register(f'{name[0].upper()}{i:05d}', face_data)
+            samples.append((time.perf_counter() - t0) * 1000)
+            failures += r.status_code != 200
+        elapsed = time.perf_counter() - started
+        t0 = time.perf_counter()
+        images.flush()
+        drain = time.perf_counter() - t0
+        stage_sum, stage_count = (a - b for a, b in zip(save_stage(), stage_before))
+        summary = summarize(samples, elapsed)
+        summary.update(failures=failures, drain_s=round(drain, 3),
+                       save_image_ms=round(stage_sum * 1000 / max(stage_count, 1), 2))
+        results['results'][name] = summary
+        print_row(name, summary)
+        print(f"{'':<28}save_image={summary['save_image_ms']} ms/request failures={failures} "
+              f"queue drained {drain:.3f}s after the last response")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Face authentication of a hard capture: client retries vs one multi-frame request.
+
+    python benchmarks/bench_multiframe.py --voters 20 --frames 3 --face-delay 0.2
+
+Each voter's capture has --frames frames of which only the last is sharp
+enough to match, the others are blurred. "retry" sends one frame per request
+and moves on to the next frame after a failure, as the booth did before;
+"burst" sends all frames in one request and lets the server rank them.
+Encoding is replaced by a --face-delay sleep that matches only sharp frames.
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+
+
+def frame(seed, blurred):
+    pixels = np.random.default_rng(seed).integers(40, 216, size=(96, 96, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    if blurred:
+        image = image.filter(ImageFilter.GaussianBlur(4))
+    buf = io.BytesIO()
+    image.save(buf, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=3)
+    parser.add_argument('--face-delay', type=float, default=0.2)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    os.environ.update(FINGERPRINT_PORTS='booth1=/dev/null-bench', FACE_WORKERS='0')
+    os.chdir(tempfile.mkdtemp())
+
+    import face_engine
+    import voter_auth_api
+    from face_pipeline import frame_sharpness
+
+    encoding = np.random.default_rng(0).normal(0, 0.1, 128)
+    encodings = [0]
+
+    def stub_encode(image):
+        time.sleep(args.face_delay)
+        encodings[0] += 1
+        sharp = frame_sharpness(image.mean(axis=2)) > 100
+        return (encoding if sharp else encoding + 0.1), 1, {}
+
+    face_engine._encode_job = stub_encode
+    client = voter_auth_api.app.test_client()
+    ids = [f'M{i:05d}' for i in range(args.voters)]
+    for voter_id in ids:
+        voter_auth_api.store.add(voter_id, {'name': 'Bench', 'constituency': 'beed',
+                                            'face_encoding': encoding.tolist(),
+                                            'fingerprint_id': voter_id})
+    captures = {voter_id: [frame(i * 10 + f, blurred=f < args.frames - 1)
+                           for f in range(args.frames)]
+                for i, voter_id in enumerate(ids)}
+
+    def retry(voter_id):
+        requests = 0
+        for face_data in captures[voter_id]:
+            requests += 1
+            r = client.post('/api/authenticate/face', json={'voter_id': voter_id, 'face_data': face_data})
+            if r.status_code == 200:
+                return True, requests
+        return False, requests
+
+    def burst(voter_id):
+        r = client.post('/api/authenticate/face', json={'voter_id': voter_id,
+                                                        'face_frames': captures[voter_id]})
+        return r.status_code == 200, 1
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    for name, flow in (('retry', retry), ('burst', burst)):
+        samples, failures, requests = [], 0, 0
+        encodings[0] = 0
+        voter_auth_api.capture_cache.clear()
+        started = time.perf_counter()
+        for voter_id in ids:
+            t0 = time.perf_counter()
+            ok, sent = flow(voter_id)
+            samples.append((time.perf_counter() - t0) * 1000)
+            failures += not ok
+            requests += sent
+        summary = summarize(samples, time.perf_counter() - started)
+        summary.update(failures=failures, requests_per_voter=round(requests / len(ids), 2),
+                       encodings_per_voter=round(encodings[0] / len(ids), 2))
+        results['results'][name] = summary
+        print_row(name, summary)
+        print(f"{'':<28}requests/voter={summary['requests_per_voter']} "
+              f"encodings/voter={summary['encodings_per_voter']} failures={failures}")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
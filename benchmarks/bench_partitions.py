@@ -0,0 +1,79 @@
+"""What one regional node holds and scans: the full roll vs its own partition.
+
+    python benchmarks/bench_partitions.py --voters 100000 --searches 200
+
+Generates a synthetic roll (reused from bench_data/), splits it into
+per-constituency partitions with voter_store.split_into_partitions, then
+compares opening the store, rebuilding the face index and the registration
+duplicate search on the full roll against a single partition.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bench_utils import environment, print_header, print_row, summarize, write_results
+from face_index import FaceIndex
+from synth_voters import generate
+from voter_store import SqliteVoterStore, PartitionedVoterStore, split_into_partitions
+
+
+def measure(label, open_store, index_path, queries):
+    started = time.perf_counter()
+    store = open_store()
+    open_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = FaceIndex(index_path)
+    index.rebuild((v_id, v['face_encoding'])
+                  for v_id, v in store.iter_voters(include_encoding=True))
+    rebuild_s = time.perf_counter() - started
+
+    samples = []
+    for query in queries:
+        t0 = time.perf_counter()
+        index.nearest(query, k=3)
+        samples.append((time.perf_counter() - t0) * 1000)
+    summary = summarize(samples)
+    summary.update(voters=store.count(), open_s=round(open_s, 3), index_rebuild_s=round(rebuild_s, 3),
+                   index_mb=round(len(index) * 128 * 4 / 2 ** 20, 2))
+    store.close()
+    print_row(label, summary)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--voters', type=int, default=100000)
+    parser.add_argument('--searches', type=int, default=200)
+    parser.add_argument('--partition', default='jalna', help='Partition the node serves')
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(f'bench_data/sqlite_{args.voters}')
+    if not os.path.exists(os.path.join(workdir, 'voters.db')):
+        generate(args.voters, workdir, 'sqlite')
+    partition_dir = os.path.join(workdir, 'partitions')
+    if not os.path.exists(partition_dir):
+        split_into_partitions(SqliteVoterStore(os.path.join(workdir, 'voters.db')), partition_dir)
+
+    queries = np.random.default_rng(1).normal(0, 0.1, size=(args.searches, 128))
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print_header()
+    results['results']['full_roll'] = measure(
+        'full roll (dedup search)', lambda: SqliteVoterStore(os.path.join(workdir, 'voters.db')),
+        os.path.join(workdir, 'bench_index_full'), queries)
+    results['results']['partition'] = measure(
+        f'{args.partition} (dedup search)',
+        lambda: PartitionedVoterStore([args.partition], partition_dir),
+        os.path.join(workdir, 'bench_index_partition'), queries)
+    for name, summary in results['results'].items():
+        print(f"{name:<28}voters={summary['voters']} open={summary['open_s']}s "
+              f"index rebuild={summary['index_rebuild_s']}s index={summary['index_mb']} MB")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""On-chain registration throughput and gas per voter by batch size.
+
+    cd contract && npx hardhat node
+    npx hardhat run scripts/deploy.js --network localhost
+    ETH_RPC_URL=http://127.0.0.1:8545 VOTING_CONTRACT_ADDRESS=0x... \
+        python benchmarks/bench_relayer.py --voters 2000 --batch-sizes 1,50,200
+
+Each batch size registers a fresh set of synthetic voters through
+RegistrationRelayer until every one is confirmed. The sender defaults to the
+node's first (unlocked) account, which deployed the contract.
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+from bench_utils import environment, write_results
+from eth_rpc import RpcClient
+from registration_relayer import RegistrationRelayer
+from results_indexer import CONSTITUENCIES, ETH_RPC_URL, VOTING_CONTRACT_ADDRESS
+
+
+def run(rpc, contract, sender, voters, batch_size, max_in_flight, confirmations):
+    relayer = RegistrationRelayer(
+        rpc, contract, sender, path=os.path.join(tempfile.mkdtemp(), 'relayer.db'),
+        batch_size=batch_size, max_in_flight=max_in_flight, confirmations=confirmations)
+    run_id = uuid.uuid4().hex[:8]
+    relayer.enqueue_many((f'B{run_id}{i:07d}', CONSTITUENCIES[i % len(CONSTITUENCIES)])
+                         for i in range(voters))
+    started = time.perf_counter()
+    while relayer.counts()['pending'] or relayer.in_flight:
+        relayer.poll_once()
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    stats = relayer.status()
+    relayer.close()
+    confirmed = stats['counts']['confirmed']
+    return {
+        'batch_size': batch_size,
+        'voters': voters,
+        'confirmed': confirmed,
+        'failed': stats['counts']['failed'],
+        'transactions': stats['transactions'],
+        'seconds': round(elapsed, 2),
+        'voters_per_s': round(confirmed / elapsed, 1) if elapsed else None,
+        'gas_per_voter': round(stats['gas_used'] / confirmed) if confirmed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rpc', default=ETH_RPC_URL or 'http://127.0.0.1:8545')
+    parser.add_argument('--contract', default=VOTING_CONTRACT_ADDRESS)
+    parser.add_argument('--sender', help='Default: first account of the node')
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--batch-sizes', default='1,50,200')
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    parser.add_argument('--confirmations', type=int, default=1)
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+    if not args.contract:
+        parser.error('--contract or VOTING_CONTRACT_ADDRESS is required')
+
+    rpc = RpcClient(args.rpc)
+    sender = args.sender or rpc.call('eth_accounts')[0]
+    results = {'environment': environment(), 'config': vars(args), 'results': []}
+
+    print(f"{'batch':>6} {'voters':>8} {'txs':>6} {'seconds':>9} {'voters/s':>9} {'gas/voter':>10}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(',')):
+        row = run(rpc, args.contract, sender, args.voters, batch_size,
+                  args.max_in_flight, args.confirmations)
+        results['results'].append(row)
+        print(f"{batch_size:>6} {row['confirmed']:>8} {row['transactions']:>6} "
+              f"{row['seconds']:>9.2f} {row['voters_per_s']:>9} {row['gas_per_voter']:>10}")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Time from process start until the API answers /api/health.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --repo ../old-checkout   # compare releases
+
+Each run starts a fresh interpreter in an empty working directory, imports
+voter_auth_api and calls /api/health through the test client. Scenarios:
+no scanner attached, a simulated scanner, and FACE_WARMUP=1.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from bench_utils import REPO_ROOT, environment, write_results
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import voter_auth_api
+imported = time.perf_counter()
+status = voter_auth_api.app.test_client().get('/api/health').status_code
+ready = time.perf_counter()
+connected = None
+pool = voter_auth_api.scanner_pool
+if pool is not None and hasattr(pool, 'wait_connected'):
+    if pool.wait_connected(timeout=15):
+        connected = time.perf_counter() - started
+print(json.dumps({'import_s': imported - started, 'first_health_s': ready - started,
+                  'status': status, 'scanner_connected_s': connected}))
+'''
+
+
+def run_once(repo, env):
+    workdir = tempfile.mkdtemp()
+    out = subprocess.run([sys.executable, '-c', CHILD, repo], cwd=workdir, env=env,
+                         capture_output=True, text=True, timeout=120)
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(out.stderr[-2000:])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--repo', default=REPO_ROOT, help='Checkout to benchmark')
+    parser.add_argument('--json', help='Write machine-readable results here')
+    args = parser.parse_args()
+    repo = os.path.abspath(args.repo)
+
+    from fingerprint_simulator import FingerprintSimulator
+    base = dict(os.environ, FACE_WORKERS=os.environ.get('FACE_WORKERS', '1'))
+    scenarios = {
+        'no scanner': dict(base, FINGERPRINT_PORTS='booth1=/dev/no-such-scanner'),
+        'simulated scanner': None,
+        'FACE_WARMUP=1': dict(base, FINGERPRINT_PORTS='booth1=/dev/no-such-scanner',
+                              FACE_WARMUP='1'),
+    }
+
+    results = {'environment': environment(), 'config': vars(args), 'results': {}}
+    print(f"{'scenario':<20} {'import s':>9} {'health s':>9} {'scanner s':>10}")
+    for name, env in scenarios.items():
+        samples = []
+        for _ in range(args.runs):
+            sim = None
+            if env is None:
+                # The real sketch boots about 2 s after the port opens
+                sim = FingerprintSimulator(boot_delay=2.0)
+                run_env = dict(base, FINGERPRINT_PORTS=f'booth1={sim.port}')
+            else:
+                run_env = env
+            try:
+                samples.append(run_once(repo, run_env))
+            finally:
+                if sim:
+                    sim.close()
+        row = {key: float(np.median([s[key] for s in samples]))
+               for key in ('import_s', 'first_health_s')}
+        connected = [s['scanner_connected_s'] for s in samples if s['scanner_connected_s']]
+        row['scanner_connected_s'] = float(np.median(connected)) if connected else None
+        results['results'][name] = row
+        scanner = f"{row['scanner_connected_s']:.2f}" if row['scanner_connected_s'] else '-'
+        print(f"{name:<20} {row['import_s']:>9.2f} {row['first_health_s']:>9.2f} {scanner:>10}")
+    if args.json:
+        write_results(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Shared helpers for the benchmark scripts"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def summarize(samples_ms, elapsed_s=None):
+    """Latency summary in milliseconds, plus throughput when elapsed is known"""
+    samples = np.asarray(samples_ms, dtype=float)
+    if len(samples) == 0:
+        return {'count': 0}
+    summary = {
+        'count': int(len(samples)),
+        'mean_ms': round(float(samples.mean()), 2),
+        'p50_ms': round(float(np.percentile(samples, 50)), 2),
+        'p99_ms': round(float(np.percentile(samples, 99)), 2),
+        'max_ms': round(float(samples.max()), 2),
+    }
+    if elapsed_s:
+        summary['throughput_rps'] = round(len(samples) / elapsed_s, 2)
+    return summary
+
+
+def print_row(label, summary):
+    print(f"{label:<28}{summary.get('count', 0):>7}{summary.get('p50_ms', 0):>10.1f}"
+          f"{summary.get('p99_ms', 0):>10.1f}{summary.get('throughput_rps', 0):>10.2f}")
+
+
+def print_header():
+    print(f"{'case':<28}{'n':>7}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+
+
+def write_results(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📝 Results written to {path}")
+
+
+def run_clients(clients, requests, job):
+    """Run ``requests`` calls of ``job(i)`` over ``clients`` threads.
+
+    ``job`` returns True when the call succeeded; only successful calls count
+    towards the latency summary, failures are reported separately.
+    """
+    samples, failures, lock = [], [0], threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            ok = job(i)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    samples.append(elapsed)
+                else:
+                    failures[0] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    summary = summarize(samples, time.perf_counter() - started)
+    summary['failures'] = failures[0]
+    return summary
+
+
+def environment():
+    """Where the numbers came from, stored alongside the results"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                         cwd=REPO_ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
@@ -0,0 +1,78 @@
+"""Synthetic voter populations for benchmarks.
+
+    python benchmarks/synth_voters.py --voters 100000 --out /tmp/synth_100k
+
+Writes a voter store (SQLite or JSON) and a matching face index with random
+128-d encodings, unique fingerprint slots and voters spread over the four
+constituencies. The same --seed always produces the same population.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import bench_utils  # noqa: F401  (puts the repo root on sys.path)
+from face_index import FaceIndex
+from voter_store import JsonVoterStore, SqliteVoterStore
+
+CONSTITUENCIES = ('jalna', 'aurangabad', 'beed', 'ahmednagar')
+CHUNK = 10000
+
+
+def voter_id(i):
+    return f"S{i:07d}"
+
+
+def synthetic_records(count, seed=0):
+    """Yield (voter_id, record) pairs, encodings drawn chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, CHUNK):
+        encodings = rng.normal(0, 0.1, size=(min(CHUNK, count - start), 128))
+        for offset, encoding in enumerate(encodings):
+            i = start + offset
+            yield voter_id(i), {
+                'name': f"Synthetic Voter {i}",
+                'constituency': CONSTITUENCIES[i % len(CONSTITUENCIES)],
+                'image_path': None,
+                'face_encoding': encoding.tolist(),
+                'fingerprint_id': str(i + 1),
+                'has_voted': False,
+                'registered_at': '2026-01-01 00:00:00'
+            }
+
+
+def generate(count, out_dir, backend='sqlite', seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.time()
+    if backend == 'sqlite':
+        store = SqliteVoterStore(os.path.join(out_dir, 'voters.db'))
+    else:
+        store = JsonVoterStore(os.path.join(out_dir, 'voters_db.json'))
+
+    batch = []
+    for item in synthetic_records(count, seed):
+        batch.append(item)
+        if len(batch) >= CHUNK:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+
+    FaceIndex(os.path.join(out_dir, 'face_index')).rebuild(
+        (v_id, rec['face_encoding']) for v_id, rec in synthetic_records(count, seed))
+    store.close()
+    print(f"✅ {count} synthetic voters in {out_dir} ({backend}, {time.time() - started:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic voter population')
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--backend', choices=('sqlite', 'json'), default='sqlite')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.voters, args.out, args.backend, args.seed)
+
+
+if __name__ == '__main__':
+    main()
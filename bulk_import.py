@@ -0,0 +1,239 @@
+"""Bulk voter roll import.
+
+    python bulk_import.py roll.csv --photos roll_photos/
+
+The roll is CSV (header row) or NDJSON with ``voter_id``, ``name``,
+``constituency`` and optionally ``photo`` (defaults to ``<voter_id>.jpg``)
+and ``fingerprint_id`` or ``fingerprint_template`` with the ``fingerprint_booth``
+whose sensor holds it (left out: the first booth of FINGERPRINT_PORTS, as for
+register_voter). Progress is checkpointed
+after every committed batch, re-running the same command resumes from there.
+Stop the API server first, both processes append to the same face index.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from face_engine import FACE_WORKERS, _warm_worker
+from face_index import FaceIndex
+from fingerprint_service import configured_booth_ports
+from voter_store import assign_legacy_fingerprints, fingerprint_key, open_store
+
+
+def read_roll(path):
+    """Stream roll records from a CSV or NDJSON file"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if path.lower().endswith(('.ndjson', '.jsonl')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def parse_fingerprint_id(record):
+    """Same template format register_voter accepts: FP_TEMPLATE_<id>_<ts>"""
+    fp_id = str(record.get('fingerprint_id') or '').strip()
+    if fp_id:
+        return fp_id
+    template = str(record.get('fingerprint_template') or '').strip()
+    if template:
+        return template.split('_')[2]
+    return None
+
+
+def resumed_row(existing, name, constituency, fingerprint_id, fingerprint_booth):
+    """Whether a stored voter is this very roll record (imported before a crash)"""
+    return (existing.get('name') == name
+            and existing.get('constituency') == constituency.lower()
+            and str(existing.get('fingerprint_id') or '') == str(fingerprint_id or '')
+            and (existing.get('fingerprint_booth') or '') == fingerprint_booth)
+
+
+def encode_photo(photo_path):
+    """Worker job: returns (encoding list or None, error or None)"""
+    from PIL import Image
+    from face_pipeline import image_to_array, get_face_encodings_from_array
+    try:
+        with Image.open(photo_path) as image:
+            image = image.convert('RGB')
+            encoding, _ = get_face_encodings_from_array(image_to_array(image))
+    except Exception as e:
+        return None, f'Cannot read photo: {e}'
+    if encoding is None:
+        return None, 'No face detected'
+    return encoding.tolist(), None
+
+
+class Checkpoint:
+    """Number of roll records already committed, stored next to the roll"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.done = json.load(f).get('records_done', 0)
+
+    def save(self, done):
+        self.done = done
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'records_done': done,
+                       'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f)
+        os.replace(tmp_path, self.path)
+
+
+def import_roll(roll_path, photos_dir, store, face_index, workers=FACE_WORKERS,
+                batch_size=500, checkpoint_path=None, failures_path=None, default_booth=None):
+    default_booth = default_booth or next(iter(configured_booth_ports()))
+    assign_legacy_fingerprints(store, default_booth)
+    checkpoint = Checkpoint(checkpoint_path or roll_path + '.checkpoint.json')
+    failures_path = failures_path or roll_path + '.failures.ndjson'
+    if checkpoint.done:
+        print(f"↩️ Resuming after {checkpoint.done} record(s)")
+    # A crash between the store commit and the index append leaves it short
+    if len(face_index) != store.count():
+        face_index.rebuild(
+            (v_id, v['face_encoding'])
+            for v_id, v in store.iter_voters(include_encoding=True)
+            if v.get('face_encoding') is not None
+        )
+
+    records = islice(read_roll(roll_path), checkpoint.done, None)
+    position = resumed_at = checkpoint.done
+    imported = failed = 0
+    claimed_ids = set()
+    claimed_fingerprints = {}
+    started = time.time()
+
+    with ProcessPoolExecutor(max_workers=max(workers, 1), initializer=_warm_worker) as executor, \
+            open(failures_path, 'a') as failures:
+
+        def fail(line, voter_id, error):
+            failures.write(json.dumps({'record': line, 'voter_id': voter_id, 'error': error}) + '\n')
+
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+
+            # Validate cheaply before spending CPU on the photos
+            jobs = []
+            resumed = 0
+            for offset, record in enumerate(batch):
+                line = position + offset + 1
+                voter_id = str(record.get('voter_id', '')).strip().upper()
+                name = record.get('name', '')
+                constituency = record.get('constituency', '')
+                if not all([voter_id, name, constituency]):
+                    fail(line, voter_id, 'voter_id, name and constituency required')
+                    continue
+                if not store.owns(constituency.lower()):
+                    fail(line, voter_id, 'Constituency not served by this node')
+                    continue
+                if voter_id in claimed_ids:
+                    fail(line, voter_id, 'Duplicate voter_id in roll')
+                    continue
+                try:
+                    fingerprint_id = parse_fingerprint_id(record)
+                except IndexError:
+                    fail(line, voter_id, 'Invalid fingerprint template format')
+                    continue
+                fingerprint_booth = str(record.get('fingerprint_booth') or '').strip() or default_booth
+                existing = store.get(voter_id, include_encoding=False)
+                if existing:
+                    # Only the batch after the checkpoint can have been committed
+                    # by a run that crashed before saving the checkpoint
+                    if position == resumed_at and resumed_row(existing, name, constituency,
+                                                              fingerprint_id, fingerprint_booth):
+                        claimed_ids.add(voter_id)
+                        resumed += 1
+                    else:
+                        fail(line, voter_id, 'Voter already registered')
+                    continue
+                fp_key = fingerprint_key(fingerprint_id, fingerprint_booth)
+                if fingerprint_id:
+                    owner_id = store.find_by_fingerprint(fingerprint_id, fingerprint_booth) \
+                        or claimed_fingerprints.get(fp_key)
+                    if owner_id:
+                        fail(line, voter_id, f'Fingerprint already registered to {owner_id}')
+                        continue
+                    claimed_fingerprints[fp_key] = voter_id
+                claimed_ids.add(voter_id)
+                photo = record.get('photo') or f'{voter_id}.jpg'
+                jobs.append((line, voter_id, name, constituency.lower(), fingerprint_id,
+                             fingerprint_booth, os.path.join(photos_dir, photo)))
+
+            results = executor.map(encode_photo, [job[-1] for job in jobs], chunksize=8)
+
+            rows, row_lines = [], {}
+            registered_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for job, (encoding, error) in zip(jobs, results):
+                line, voter_id, name, constituency, fingerprint_id, fingerprint_booth, photo_path = job
+                if error:
+                    fail(line, voter_id, error)
+                    claimed_fingerprints.pop(fingerprint_key(fingerprint_id, fingerprint_booth), None)
+                    continue
+                row_lines[voter_id] = line
+                rows.append((voter_id, {
+                    'name': name,
+                    'constituency': constituency,
+                    'image_path': photo_path,
+                    'face_encoding': encoding,
+                    'fingerprint_id': fingerprint_id,
+                    'fingerprint_booth': fingerprint_booth,
+                    'has_voted': False,
+                    'registered_at': registered_at
+                }))
+
+            # Only rows the store actually took go into the face index
+            inserted = set(store.add_many(rows))
+            for voter_id, _ in rows:
+                if voter_id not in inserted:
+                    fail(row_lines[voter_id], voter_id, 'Voter or fingerprint already registered')
+            face_index.add_many((v_id, rec['face_encoding']) for v_id, rec in rows
+                                if v_id in inserted)
+            failures.flush()
+            claimed_ids.clear()
+            claimed_fingerprints.clear()
+
+            position += len(batch)
+            imported += len(inserted) + resumed
+            failed += len(batch) - len(inserted) - resumed
+            checkpoint.save(position)
+            rate = (position - resumed_at) / max(time.time() - started, 1e-6)
+            print(f"📦 {position} processed | {imported} imported | {failed} failed | {rate:.0f}/s")
+
+    print(f"✅ Import finished: {imported} imported, {failed} failed (see {failures_path})")
+    return imported, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import a voter roll')
+    parser.add_argument('roll', help='CSV or NDJSON voter roll')
+    parser.add_argument('--photos', required=True, help='Directory of face photos')
+    parser.add_argument('--workers', type=int, default=FACE_WORKERS)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--checkpoint', help='Default: <roll>.checkpoint.json')
+    parser.add_argument('--failures', help='Default: <roll>.failures.ndjson')
+    parser.add_argument('--backend', help='sqlite or json (default: $VOTER_STORE)')
+    parser.add_argument('--db', default=os.environ.get('VOTERS_DB', 'voters.db'))
+    parser.add_argument('--json', default='voters_db.json')
+    parser.add_argument('--face-index', default=os.environ.get('FACE_INDEX_PATH', 'face_index'))
+    args = parser.parse_args()
+
+    store = open_store(args.backend, json_path=args.json, db_path=args.db)
+    face_index = FaceIndex(args.face_index)
+    import_roll(args.roll, args.photos, store, face_index, workers=args.workers,
+                batch_size=args.batch_size, checkpoint_path=args.checkpoint,
+                failures_path=args.failures)
+
+
+if __name__ == '__main__':
+    main()
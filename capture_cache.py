@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from auth_sessions import VOTE_SESSION_TTL
+from face_pipeline import decode_base64_payload
+from metrics import render_metric
+
+# Memory bound for cached capture encodings, 0 disables the cache
+CAPTURE_CACHE_MB = float(os.environ.get('CAPTURE_CACHE_MB', '16'))
+# Entries never outlive the vote session window
+CAPTURE_CACHE_TTL = min(float(os.environ.get('CAPTURE_CACHE_TTL', '120')), VOTE_SESSION_TTL)
+
+# Rough per-entry cost on top of the encoding itself (key, tuple, dict slot)
+ENTRY_OVERHEAD = 200
+
+MISS = object()
+
+
+def capture_key(base64_string):
+    """Hash of a capture's decoded image bytes (a data URL prefix is ignored)"""
+    try:
+        payload = decode_base64_payload(base64_string)
+    except ValueError:
+        return None
+    return payload_key(payload)
+
+
+def payload_key(payload):
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class CaptureCache:
+    """Encodings of recent captures, so a booth resending a frame skips HOG.
+
+    Keyed by capture_key(), LRU-evicted once ``max_bytes`` is reached and
+    expired after ``ttl`` seconds. A cached None means no face was found.
+    Hits reorder the LRU, so expiry times are also queued in insertion order
+    (the TTL is fixed) and every get/put drops whatever has expired.
+    """
+
+    def __init__(self, max_bytes=CAPTURE_CACHE_MB * 2 ** 20, ttl=CAPTURE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (encoding, expires_at, size)
+        self.expiry = deque()  # (expires_at, key), oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached encoding (or None for 'no face'), MISS if absent or expired"""
+        if key is None or self.max_bytes <= 0:
+            return MISS
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, encoding):
+        if key is None or self.max_bytes <= 0:
+            return
+        size = ENTRY_OVERHEAD + (encoding.nbytes if encoding is not None else 0)
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (encoding, now + self.ttl, size)
+            self.expiry.append((now + self.ttl, key))
+            self.bytes += size
+            # Least recently used first
+            while self.entries and self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _expire(self, now):
+        """Drop expired entries, call with the lock held"""
+        while self.expiry and self.expiry[0][0] <= now:
+            expires_at, key = self.expiry.popleft()
+            entry = self.entries.get(key)
+            # Skip keys already dropped, or put again since (a later expiry)
+            if entry is not None and entry[1] == expires_at:
+                self._drop(key)
+                self.evictions += 1
+
+    def _drop(self, key):
+        self.bytes -= self.entries.pop(key)[2]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.expiry.clear()
+            self.bytes = 0
+
+    def render(self):
+        with self.lock:
+            stats = (len(self.entries), self.bytes, self.hits, self.misses, self.evictions)
+        entries, size, hits, misses, evictions = stats
+        return (
+            render_metric('capture_cache_requests_total', 'counter',
+                          'Capture encoding cache lookups by result',
+                          [({'result': 'hit'}, hits), ({'result': 'miss'}, misses)])
+            + render_metric('capture_cache_evictions_total', 'counter',
+                            'Capture encodings evicted for memory or age', [({}, evictions)])
+            + render_metric('capture_cache_entries', 'gauge', 'Cached capture encodings',
+                            [({}, entries)])
+            + render_metric('capture_cache_bytes', 'gauge', 'Approximate cache memory',
+                            [({}, size)])
+        )
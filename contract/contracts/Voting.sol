@@ -67,6 +67,23 @@ contract Voting {
         emit VoterRegistered(voterHash, constituency);
     }
     
+    // Batch entry point for the registration relayer. Voters who already voted
+    // are skipped instead of reverting so a retried batch cannot get stuck.
+    function registerVoters(bytes32[] calldata voterHashes, uint256[] calldata constituencies) external onlyOwner {
+        require(voterHashes.length == constituencies.length, "Length mismatch");
+        
+        for (uint256 i = 0; i < voterHashes.length; i++) {
+            require(constituencies[i] < totalConstituencies, "Invalid constituency");
+            if (voters[voterHashes[i]].hasVoted) {
+                continue;
+            }
+            
+            voters[voterHashes[i]].constituency = constituencies[i];
+            
+            emit VoterRegistered(voterHashes[i], constituencies[i]);
+        }
+    }
+    
     function vote(uint256 constituency, uint256 candidateIndex) public {
         bytes32 voterHash = keccak256(abi.encodePacked(msg.sender, block.timestamp));
         _vote(voterHash, constituency, candidateIndex);
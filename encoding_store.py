@@ -0,0 +1,90 @@
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+from face_index import ENCODING_DIM
+
+# Version 1: little-endian float32, ENCODING_DIM values per encoding
+FORMAT_VERSION = 1
+BLOB_HEADER = b'FE' + bytes([FORMAT_VERSION, 0])
+
+
+def pack_encoding(encoding):
+    """Encoding as a versioned float32 BLOB (516 bytes instead of ~3 KB of JSON)"""
+    if encoding is None or len(encoding) == 0:
+        return None
+    return BLOB_HEADER + np.asarray(encoding, dtype='<f4').tobytes()
+
+
+def unpack_encoding(value):
+    """Read-only float32 view of a stored encoding, legacy JSON text still accepted"""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, memoryview)):
+        version = value[2]
+        if bytes(value[:2]) != BLOB_HEADER[:2] or version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported face encoding format (version {version})')
+        return np.frombuffer(value, dtype='<f4', offset=len(BLOB_HEADER))
+    if isinstance(value, str):
+        value = json.loads(value or '[]')
+    return np.asarray(value, dtype=np.float32) if len(value) else None
+
+
+class EncodingFile:
+    """Fixed-stride float32 encodings behind a versioned header, memory-mapped.
+
+    Records refer to their encoding by ``encoding_offset``, the row number in
+    this file. Rows are only ever appended; the row count follows from the
+    file size so a torn append is simply ignored.
+    """
+
+    MAGIC = b'VENC'
+    HEADER_LEN = 64
+    STRIDE = ENCODING_DIM * 4
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(struct.pack('<4sHH', self.MAGIC, FORMAT_VERSION, ENCODING_DIM)
+                        .ljust(self.HEADER_LEN, b'\x00'))
+        with open(path, 'rb') as f:
+            magic, version, dim = struct.unpack('<4sHH', f.read(8))
+        if magic != self.MAGIC or version != FORMAT_VERSION or dim != ENCODING_DIM:
+            raise ValueError(f'{path}: unsupported encoding file '
+                             f'(magic {magic!r}, version {version}, dim {dim})')
+        self._map()
+
+    def _map(self):
+        rows = (os.path.getsize(self.path) - self.HEADER_LEN) // self.STRIDE
+        if rows == 0:
+            self.matrix = np.empty((0, ENCODING_DIM), dtype='<f4')
+        else:
+            self.matrix = np.memmap(self.path, dtype='<f4', mode='r', offset=self.HEADER_LEN,
+                                    shape=(rows, ENCODING_DIM))
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def read(self, offset):
+        """Read-only view of one encoding, no copy"""
+        return self.matrix[offset]
+
+    def append_many(self, encodings):
+        """Append encodings with one write + fsync, returns their offsets"""
+        rows = np.asarray(encodings, dtype='<f4').reshape(-1, ENCODING_DIM)
+        with self.lock:
+            start = len(self.matrix)
+            # Drop a torn row left by a crash so the stride stays aligned
+            with open(self.path, 'r+b') as f:
+                f.seek(self.HEADER_LEN + start * self.STRIDE)
+                f.truncate()
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._map()
+        return list(range(start, start + len(rows)))
@@ -0,0 +1,143 @@
+"""Minimal Ethereum JSON-RPC client and ABI helpers (no web3 dependency)."""
+import itertools
+import json
+import urllib.request
+
+# ==================== KECCAK-256 ====================
+# Pure Python, only used for event topics and function selectors
+
+_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_ROT = [[0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+        [28, 55, 25, 21, 56], [27, 20, 39, 8, 14]]
+_MASK = (1 << 64) - 1
+
+
+def _rol(x, n):
+    return ((x << n) | (x >> (64 - n))) & _MASK if n else x
+
+
+def _keccak_f(a):
+    for rc in _RC:
+        c = [a[x][0] ^ a[x][1] ^ a[x][2] ^ a[x][3] ^ a[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rol(c[(x + 1) % 5], 1) for x in range(5)]
+        a = [[a[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rol(a[x][y], _ROT[x][y])
+        a = [[b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y]) for y in range(5)]
+             for x in range(5)]
+        a[0][0] ^= rc
+    return a
+
+
+def keccak256(data):
+    """Ethereum's Keccak-256 (original padding, not NIST SHA3-256)"""
+    rate = 136
+    data = bytearray(data) + b'\x01' + b'\x00' * ((-len(data) - 1) % rate)
+    data[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(data), rate):
+        block = data[offset:offset + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[i * 8:i * 8 + 8], 'little')
+        state = _keccak_f(state)
+    return b''.join(state[i % 5][i // 5].to_bytes(8, 'little') for i in range(4))
+
+
+def event_topic(signature):
+    return '0x' + keccak256(signature.encode()).hex()
+
+
+def function_selector(signature):
+    return keccak256(signature.encode())[:4]
+
+
+# ==================== ABI ====================
+
+def decode_words(data):
+    """Raw bytes and 32-byte big-endian words of hex ABI data"""
+    raw = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+    return raw, [int.from_bytes(raw[i:i + 32], 'big') for i in range(0, len(raw), 32)]
+
+
+def encode_word(value):
+    """One ABI word from an int or a 32-byte value"""
+    if isinstance(value, int):
+        return value.to_bytes(32, 'big')
+    return bytes(value).rjust(32, b'\x00')
+
+
+def decode_string(raw, offset):
+    length = int.from_bytes(raw[offset:offset + 32], 'big')
+    return raw[offset + 32:offset + 32 + length].decode('utf-8', errors='replace')
+
+
+# ==================== JSON-RPC ====================
+
+class RpcError(Exception):
+    pass
+
+
+class ExecutionReverted(RpcError):
+    """The node reports the call or transaction would revert"""
+
+
+class RpcClient:
+    """Blocking JSON-RPC over HTTP"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.ids = itertools.count(1)
+
+    def call(self, method, *params):
+        body = json.dumps({'jsonrpc': '2.0', 'id': next(self.ids),
+                           'method': method, 'params': list(params)}).encode()
+        req = urllib.request.Request(self.url, data=body,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                reply = json.loads(resp.read())
+        except (OSError, ValueError) as e:
+            raise RpcError(f'{method}: {e}') from e
+        if reply.get('error'):
+            message = f"{method}: {reply['error'].get('message', reply['error'])}"
+            if 'revert' in message.lower():
+                raise ExecutionReverted(message)
+            raise RpcError(message)
+        return reply.get('result')
+
+    def block_number(self):
+        return int(self.call('eth_blockNumber'), 16)
+
+    def block_hash(self, number):
+        block = self.call('eth_getBlockByNumber', hex(number), False)
+        return block['hash'] if block else None
+
+    def get_logs(self, address, topics, from_block, to_block):
+        return self.call('eth_getLogs', {'address': address, 'topics': topics,
+                                         'fromBlock': hex(from_block), 'toBlock': hex(to_block)})
+
+    def transaction_count(self, address, block='pending'):
+        return int(self.call('eth_getTransactionCount', address, block), 16)
+
+    def gas_price(self):
+        return int(self.call('eth_gasPrice'), 16)
+
+    def estimate_gas(self, tx):
+        return int(self.call('eth_estimateGas', tx), 16)
+
+    def send_transaction(self, tx):
+        """Submit via the node's own signer (dev chains, Clef), returns the tx hash"""
+        return self.call('eth_sendTransaction', tx)
+
+    def receipt(self, tx_hash):
+        return self.call('eth_getTransactionReceipt', tx_hash)
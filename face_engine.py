@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import tracing
+
+FACE_WORKERS = int(os.environ.get('FACE_WORKERS', os.cpu_count() or 1))
+FACE_QUEUE_SIZE = int(os.environ.get('FACE_QUEUE_SIZE', FACE_WORKERS * 4))
+FACE_JOB_TIMEOUT = float(os.environ.get('FACE_JOB_TIMEOUT', '10'))
+# Load the models in the background at startup instead of on the first request
+FACE_WARMUP = os.environ.get('FACE_WARMUP', '0') == '1'
+
+
+class PoolBusy(Exception):
+    """Raised when the submission queue is full"""
+
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+def _warm_worker():
+    """Load the dlib models once per worker process"""
+    import face_recognition
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(blank, model='hog')
+    face_recognition.face_encodings(blank, [(0, 63, 63, 0)])
+
+
+def _encode_job(image):
+    """Returns (encoding, count, stage timings)"""
+    from face_pipeline import get_face_encodings_from_array
+    timings = {}
+    encoding, count = get_face_encodings_from_array(image, timings)
+    return encoding, count, timings
+
+
+def _match_job(images, reference, threshold):
+    """Encode frames best-ranked first until one is within ``threshold``.
+
+    Returns ({encoding, distance, frame, tried} of the closest frame, or None
+    when no frame had a face, [(frame, encoding or None)] for every frame
+    encoded, stage timings).
+    """
+    from face_pipeline import rank_frames
+    timings = {}
+    order = rank_frames(images, timings) if len(images) > 1 else [0]
+    reference = np.asarray(reference, dtype=np.float32)
+    best = None
+    encoded = []
+    for index in order:
+        encoding, _, frame_timings = _encode_job(images[index])
+        encoded.append((index, encoding))
+        for stage_name, seconds in frame_timings.items():
+            timings[stage_name] = timings.get(stage_name, 0) + seconds
+        if encoding is None:
+            continue
+        distance = float(np.linalg.norm(reference - encoding))
+        if best is None or distance < best['distance']:
+            best = {'encoding': encoding, 'distance': distance, 'frame': index}
+        if distance < threshold:
+            break
+    if best is not None:
+        best['tried'] = len(encoded)
+    return best, encoded, timings
+
+
+class FaceEncodingPool:
+    """Runs HOG detection + 128-d encoding in worker processes.
+
+    At most ``queue_size`` jobs are accepted at a time (running or waiting),
+    anything beyond that is rejected with PoolBusy instead of piling up.
+    ``workers=0`` runs jobs inline in the calling thread. A worker that dies
+    (dlib crash, OOM kill) breaks the executor, it is replaced and the job
+    retried once.
+    """
+
+    def __init__(self, workers=FACE_WORKERS, queue_size=FACE_QUEUE_SIZE,
+                 timeout=FACE_JOB_TIMEOUT):
+        self.workers = workers
+        self.queue_size = max(queue_size, workers, 1)
+        self.timeout = timeout
+        self.in_flight = 0
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    initializer=_warm_worker)
+                print(f"⚙️ Face encoding pool started: {self.workers} worker(s), "
+                      f"queue {self.queue_size}")
+            return self.executor
+
+    def submit(self, image, *args, job=None):
+        """Queue one encoding job (``job`` defaults to _encode_job), returns a Future"""
+        with self.lock:
+            if self.in_flight >= self.queue_size:
+                raise PoolBusy('Face encoding queue is full')
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(job or _encode_job, image, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def _restart(self, broken):
+        """Replace ``broken`` with a fresh executor on next use (once, if several jobs saw it)"""
+        with self.lock:
+            if self.executor is not broken:
+                return
+            self.executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("💥 Face encoding worker died, restarting the pool")
+
+    def _run(self, job, timeout, *args):
+        """Run ``job`` in the pool (or inline), returns its result without timings"""
+        started = time.perf_counter()
+        timeout = timeout or self.timeout
+        if self.workers <= 0:
+            *result, timings = job(*args)
+        else:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = self.submit(*args, job=job)
+                    *result, timings = future.result(timeout=timeout)
+                    break
+                except BrokenProcessPool:
+                    self._restart(executor)
+                    if attempt:
+                        raise
+                except TimeoutError:
+                    # A job that already started keeps its worker until it finishes
+                    future.cancel()
+                    raise JobTimeout(f'Face encoding took longer than {timeout}s')
+        # Worker-side stages, the rest is queueing and pickling
+        for stage_name, seconds in timings.items():
+            tracing.record(stage_name, seconds)
+        tracing.record('pool_wait', time.perf_counter() - started - sum(timings.values()))
+        return result
+
+    def encode(self, image, timeout=None):
+        """Encode ``image`` in the pool and wait for the result"""
+        encoding, count = self._run(_encode_job, timeout, image)
+        return encoding, count
+
+    def match(self, images, reference, threshold, timeout=None):
+        """Best frame of a multi-frame capture against ``reference`` and every
+        frame's encoding, see _match_job. The timeout is per frame."""
+        timeout = timeout or self.timeout * max(len(images), 1)
+        best, encoded = self._run(_match_job, timeout, images, reference, threshold)
+        return best, encoded
+
+    def warm_up(self):
+        """Start every worker (or load the models inline) ahead of traffic"""
+        started = time.perf_counter()
+        if self.workers <= 0:
+            _warm_worker()
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(time.sleep, 0) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        print(f"🔥 Face models warmed up in {time.perf_counter() - started:.1f}s")
+
+    def pending(self):
+        """Number of accepted jobs that have not finished yet"""
+        return self.in_flight
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
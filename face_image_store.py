@@ -0,0 +1,134 @@
+import atexit
+import hashlib
+import os
+import queue
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from metrics import render_metric
+
+FACE_THUMB_SIZE = int(os.environ.get('FACE_THUMB_SIZE', '96'))
+# Uploads waiting to be written before register_voter blocks on the queue
+FACE_IMAGE_QUEUE = int(os.environ.get('FACE_IMAGE_QUEUE', '256'))
+
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'BMP': 'bmp', 'GIF': 'gif'}
+
+
+class FaceImageStore:
+    """Enrollment photos on disk, content-addressed and written in the background.
+
+    An upload is stored byte for byte as ``<root>/ab/cd/<sha256>.<ext>`` next
+    to a ``_thumb.jpg`` for admin views; identical uploads share one file and
+    two levels of 256 directories keep each one small. path_for() is cheap and
+    the record can be saved with the path straight away, save() only queues
+    the write. Queued photos are served from memory until they are on disk,
+    and the queue is drained at exit.
+    """
+
+    def __init__(self, root, thumb_size=FACE_THUMB_SIZE, queue_size=FACE_IMAGE_QUEUE):
+        self.root = root
+        self.thumb_size = thumb_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.pending = {}  # path -> payload, until written
+        self.counts = {'written': 0, 'deduplicated': 0, 'failed': 0}
+        os.makedirs(root, exist_ok=True)
+        threading.Thread(target=self._write_loop, daemon=True, name='face-images').start()
+        atexit.register(self.close)
+
+    def path_for(self, payload, image_format=None):
+        digest = hashlib.sha256(payload).hexdigest()
+        extension = EXTENSIONS.get((image_format or '').upper(), 'img')
+        return os.path.join(self.root, digest[:2], digest[2:4], f'{digest}.{extension}')
+
+    @staticmethod
+    def thumbnail_path(image_path):
+        return os.path.splitext(image_path)[0] + '_thumb.jpg'
+
+    def save(self, image_path, payload):
+        """Queue ``payload`` to be written at ``image_path`` (from path_for)"""
+        with self.lock:
+            if image_path in self.pending:
+                return
+            self.pending[image_path] = payload
+        self.queue.put((image_path, payload))
+
+    def _write_loop(self):
+        while True:
+            image_path, payload = self.queue.get()
+            try:
+                self._write(image_path, payload)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, image_path, payload):
+        try:
+            if os.path.exists(image_path):
+                result = 'deduplicated'
+            else:
+                os.makedirs(os.path.dirname(image_path), exist_ok=True)
+                self._write_file(self.thumbnail_path(image_path), self._thumbnail(payload))
+                self._write_file(image_path, payload)
+                result = 'written'
+        except (OSError, ValueError) as e:
+            print(f"❌ Face image write failed ({image_path}): {e}")
+            result = 'failed'
+        with self.lock:
+            self.pending.pop(image_path, None)
+            self.counts[result] += 1
+
+    @staticmethod
+    def _write_file(path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _thumbnail(self, payload):
+        image = Image.open(BytesIO(payload))
+        # JPEGs are decoded at 1/2..1/8 scale straight away, a fraction of a full decode
+        image.draft('RGB', (self.thumb_size, self.thumb_size))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.thumbnail((self.thumb_size, self.thumb_size), Image.LANCZOS)
+        buf = BytesIO()
+        image.save(buf, 'JPEG', quality=80)
+        return buf.getvalue()
+
+    def read(self, image_path, thumbnail=False):
+        """Photo (or its thumbnail) bytes, None if missing.
+
+        Photos from before the store (voter_faces/<voter_id>.jpg) get their
+        thumbnail made on first request.
+        """
+        with self.lock:
+            payload = self.pending.get(image_path)
+        if payload is not None:
+            return self._thumbnail(payload) if thumbnail else payload
+        if not image_path or not os.path.exists(image_path):
+            return None
+        path = self.thumbnail_path(image_path) if thumbnail else image_path
+        if not os.path.exists(path):
+            with open(image_path, 'rb') as f:
+                self._write_file(path, self._thumbnail(f.read()))
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def flush(self):
+        """Block until every queued photo is written"""
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+
+    def render(self):
+        with self.lock:
+            counts = dict(self.counts)
+        return (
+            render_metric('face_image_write_queue', 'gauge', 'Enrollment photos waiting to be written',
+                          [({}, self.queue.qsize())])
+            + render_metric('face_image_writes_total', 'counter', 'Enrollment photo writes by result',
+                            [({'result': r}, n) for r, n in sorted(counts.items())])
+        )
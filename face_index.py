@@ -0,0 +1,113 @@
+import os
+import struct
+import threading
+
+import numpy as np
+
+ENCODING_DIM = 128
+HEADER_LEN = 128  # fixed so the shape can be patched in place on append
+SEARCH_CHUNK = 65536
+
+
+class FaceIndex:
+    """1:N face search over every enrolled encoding.
+
+    Encodings live in a float32 ``.npy`` matrix that is memory-mapped on load,
+    row ``i`` belongs to line ``i`` of the ``_ids.txt`` file next to it.
+    """
+
+    def __init__(self, path='face_index'):
+        self.matrix_path = path + '.npy'
+        self.ids_path = path + '_ids.txt'
+        self.lock = threading.Lock()
+        self.matrix = np.empty((0, ENCODING_DIM), dtype=np.float32)
+        self.voter_ids = []
+        self._load()
+
+    def __len__(self):
+        return len(self.voter_ids)
+
+    def _load(self):
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.ids_path)):
+            return
+        matrix = np.load(self.matrix_path, mmap_mode='r')
+        with open(self.ids_path, 'r') as f:
+            voter_ids = f.read().splitlines()
+        # A crash between the row and id appends leaves one side longer
+        rows = min(len(matrix), len(voter_ids))
+        self.matrix = matrix[:rows]
+        self.voter_ids = voter_ids[:rows]
+
+    @staticmethod
+    def _header(rows):
+        header = repr({'descr': '<f4', 'fortran_order': False,
+                       'shape': (rows, ENCODING_DIM)})
+        header = header.ljust(HEADER_LEN - 10 - 1) + '\n'
+        return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+    def rebuild(self, items):
+        """Rewrite the index from (voter_id, encoding) pairs"""
+        voter_ids = []
+        with self.lock:
+            tmp_path = self.matrix_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self._header(0))
+                for voter_id, encoding in items:
+                    f.write(np.asarray(encoding, dtype='<f4').tobytes())
+                    voter_ids.append(voter_id)
+                f.seek(0)
+                f.write(self._header(len(voter_ids)))
+            with open(self.ids_path, 'w') as f:
+                f.writelines(f"{v_id}\n" for v_id in voter_ids)
+            os.replace(tmp_path, self.matrix_path)
+            self.matrix = np.load(self.matrix_path, mmap_mode='r')
+            self.voter_ids = voter_ids
+        print(f"✅ Face index rebuilt: {len(voter_ids)} encoding(s)")
+
+    def add(self, voter_id, encoding):
+        """Append one encoding, the file is extended instead of rewritten"""
+        self.add_many([(voter_id, encoding)])
+
+    def add_many(self, items):
+        """Append (voter_id, encoding) pairs in one file write"""
+        items = list(items)
+        if not items:
+            return
+        rows = np.asarray([enc for _, enc in items], dtype='<f4').reshape(-1, ENCODING_DIM)
+        with self.lock:
+            if not os.path.exists(self.matrix_path):
+                with open(self.matrix_path, 'wb') as f:
+                    f.write(self._header(0))
+            start = len(self.voter_ids)
+            total = start + len(items)
+            with open(self.matrix_path, 'r+b') as f:
+                f.seek(HEADER_LEN + start * ENCODING_DIM * 4)
+                f.write(rows.tobytes())
+                f.truncate()
+                f.seek(0)
+                f.write(self._header(total))
+            with open(self.ids_path, 'a') as f:
+                f.writelines(f"{v_id}\n" for v_id, _ in items)
+            self.matrix = np.load(self.matrix_path, mmap_mode='r')
+            self.voter_ids = self.voter_ids + [v_id for v_id, _ in items]
+
+    def distances(self, encoding):
+        """Euclidean distance from ``encoding`` to every enrolled face"""
+        matrix = self.matrix
+        query = np.asarray(encoding, dtype=np.float32)
+        out = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SEARCH_CHUNK):
+            diff = matrix[start:start + SEARCH_CHUNK] - query
+            out[start:start + SEARCH_CHUNK] = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        return out
+
+    def nearest(self, encoding, k=3):
+        """Return up to ``k`` (voter_id, distance) pairs, closest first"""
+        voter_ids = self.voter_ids
+        dists = self.distances(encoding)[:len(voter_ids)]
+        if len(dists) == 0:
+            return []
+        k = min(k, len(dists))
+        top = np.argpartition(dists, k - 1)[:k]
+        top = top[np.argsort(dists[top])]
+        return [(voter_ids[i], float(dists[i])) for i in top]
@@ -0,0 +1,141 @@
+import base64
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+FACE_IMAGES_DIR = 'voter_faces'
+
+# Captures are shrunk so their longest side is at most this many pixels
+# before HOG detection (0 disables downscaling)
+MAX_IMAGE_SIZE = int(os.environ.get('FACE_MAX_IMAGE_SIZE', '800'))
+
+# Frames of a multi-frame capture are ranked on thumbnails this size before
+# any of them is encoded at full size
+FRAME_RANK_SIZE = int(os.environ.get('FACE_RANK_SIZE', '160'))
+
+
+def decode_base64_payload(base64_string):
+    """Image file bytes of a (data URL) base64 upload"""
+    if 'base64,' in base64_string:
+        base64_string = base64_string.split('base64,')[1]
+    return base64.b64decode(base64_string)
+
+
+def open_image(image_data):
+    """Image file bytes -> RGB PIL image (``format`` kept from the file)"""
+    image = Image.open(BytesIO(image_data))
+    if image.mode != 'RGB':
+        image_format = image.format
+        image = image.convert('RGB')
+        image.format = image_format
+    return image
+
+
+def decode_base64_image(base64_string):
+    """Decode a (data URL) base64 payload into an RGB PIL image"""
+    return open_image(decode_base64_payload(base64_string))
+
+
+def image_to_array(image, max_size=None):
+    """Downscale a PIL image to ``max_size`` and return it as an RGB ndarray"""
+    max_size = MAX_IMAGE_SIZE if max_size is None else max_size
+    if max_size and max(image.size) > max_size:
+        image = image.copy()
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+    return np.asarray(image)
+
+
+def base64_to_image_array(base64_string, max_size=None):
+    """Decode a capture straight into an RGB ndarray, no disk round trip"""
+    try:
+        return image_to_array(decode_base64_image(base64_string), max_size)
+    except Exception as e:
+        print(f"❌ Error decoding image: {e}")
+        return None
+
+
+def save_face_image(image, voter_id):
+    image_path = os.path.join(FACE_IMAGES_DIR, f"{voter_id}.jpg")
+    image.save(image_path, 'JPEG', quality=95)
+    print(f"✅ Saved image: {image_path}")
+    return image_path
+
+
+def base64_to_image_file(base64_string, voter_id):
+    try:
+        return save_face_image(decode_base64_image(base64_string), voter_id)
+    except Exception as e:
+        print(f"❌ Error saving image: {e}")
+        return None
+
+
+def get_face_encodings_from_array(image, timings=None):
+    """Extract face encodings from an RGB ndarray.
+
+    Pass a dict as ``timings`` to get the 'detect' and 'encode' seconds back.
+    """
+    import face_recognition  # loads the dlib models, deferred until first use
+    timings = {} if timings is None else timings
+    try:
+        started = time.perf_counter()
+        face_locations = face_recognition.face_locations(image, model='hog')
+        timings['detect'] = time.perf_counter() - started
+
+        if not face_locations:
+            print("❌ No face detected")
+            return None, 0
+
+        started = time.perf_counter()
+        face_encodings = face_recognition.face_encodings(image, face_locations)
+        timings['encode'] = time.perf_counter() - started
+
+        print(f"✅ Found {len(face_encodings)} face(s)")
+        return face_encodings[0], len(face_encodings)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None, 0
+
+
+def frame_sharpness(gray):
+    """Variance of the 4-neighbour Laplacian, low for blurred frames"""
+    gray = np.asarray(gray, dtype=np.float32)
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0
+    laplacian = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+                 - 4 * gray[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def rank_frames(images, timings=None):
+    """Indices of ``images`` best first, by detected face area x sharpness.
+
+    Detection runs on FRAME_RANK_SIZE thumbnails, a few ms per frame. Frames
+    where no face shows up at that size are kept, ranked last.
+    """
+    import face_recognition
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    scores = []
+    for index, image in enumerate(images):
+        thumb = image_to_array(Image.fromarray(image), FRAME_RANK_SIZE)
+        locations = face_recognition.face_locations(thumb, model='hog')
+        area = max(((bottom - top) * (right - left) for top, right, bottom, left in locations),
+                   default=0) / float(thumb.shape[0] * thumb.shape[1])
+        scores.append((area > 0, area * frame_sharpness(thumb.mean(axis=2)), -index))
+    timings['rank'] = time.perf_counter() - started
+    return [-score[2] for score in sorted(scores, reverse=True)]
+
+
+def get_face_encodings(image_path):
+    """Extract face encodings from image"""
+    import face_recognition
+    try:
+        print(f"🔍 Loading image: {image_path}")
+        image = face_recognition.load_image_file(image_path)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None, 0
+    return get_face_encodings_from_array(image)
@@ -1,9 +1,109 @@
+import os
 import serial
 import time
 import threading
+import queue
+from collections import namedtuple, deque
+from concurrent.futures import Future, TimeoutError
+
+import tracing
+
+# One parsed line of the Arduino protocol
+FingerprintEvent = namedtuple('FingerprintEvent', 'kind slot_id line')
+
+READY = 'READY'
+SCAN_MATCH = 'SCAN_MATCH'
+SCAN_NO_MATCH = 'SCAN_NO_MATCH'
+ENROLL_SUCCESS = 'ENROLL_SUCCESS'
+ENROLL_CANCELLED = 'ENROLL_CANCELLED'
+SLOTS = 'SLOTS'
+ERROR = 'ERROR'
+INFO = 'INFO'
+
+
+def parse_line(line):
+    """Turn a raw Arduino line into a FingerprintEvent"""
+    if line.startswith("SCAN:MATCH:"):
+        return FingerprintEvent(SCAN_MATCH, line.split(':')[2], line)
+    if "SCAN:NO_MATCH" in line or "no match" in line.lower():
+        return FingerprintEvent(SCAN_NO_MATCH, None, line)
+    if line.startswith("ENROLL:SUCCESS:"):
+        parts = line.split(':')
+        if len(parts) >= 3:
+            return FingerprintEvent(ENROLL_SUCCESS, parts[2], line)
+    if line.startswith("ENROLL:CANCELLED"):
+        return FingerprintEvent(ENROLL_CANCELLED, None, line)
+    if line.startswith("SLOTS:"):
+        return FingerprintEvent(SLOTS, None, line)
+    if line.startswith("ERROR:"):
+        return FingerprintEvent(ERROR, None, line)
+    if "READY" in line or "Waiting" in line:
+        return FingerprintEvent(READY, None, line)
+    return FingerprintEvent(INFO, None, line)
+
+
+def parse_slots(line):
+    """'SLOTS:1-40,42,57-60' -> {1, ..., 40, 42, 57, ..., 60} (ranges keep the line short at 9600 baud)"""
+    slots = set()
+    for item in filter(None, line.split(':', 1)[1].split(',')):
+        first, _, last = item.partition('-')
+        slots.update(range(int(first), int(last or first) + 1))
+    return slots
+
+
+def format_slots(slots):
+    """Inverse of parse_slots, without the prefix"""
+    ranges = []
+    for slot in sorted(slots):
+        if ranges and slot == ranges[-1][1] + 1:
+            ranges[-1][1] = slot
+        else:
+            ranges.append([slot, slot])
+    return ','.join(str(a) if a == b else f'{a}-{b}' for a, b in ranges)
+
+
+class _Command:
+    """A command waiting for one of its terminal events"""
+
+    def __init__(self, name, terminal, timeout, on_event=None):
+        self.name = name
+        self.terminal = terminal
+        self.timeout = timeout
+        self.on_event = on_event
+        self.future = Future()
+        self.done = threading.Event()
+        self.replied = threading.Event()  # the device answered, possibly too late
+        self.queued_at = time.perf_counter()
+        self.sent_at = None
+        self.finished_at = None
+
+    def finish(self, event=None, error=None):
+        if not self.future.done():
+            self.finished_at = time.perf_counter()
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(event)
+        self.done.set()
+
 
 class FingerprintScanner:
-    def __init__(self, port='COM4', baud=9600):
+    """R307 scanner behind an Arduino.
+
+    A reader thread turns every line from the device into an event and a
+    writer thread sends queued commands one at a time, so scan and enroll
+    calls from different requests never read the port concurrently.
+    """
+
+    SCAN_TIMEOUT = 8
+    ENROLL_TIMEOUT = 60
+    LIST_TIMEOUT = 10
+    # How long a cancelled enrollment waits for the sensor's ENROLL:CANCELLED
+    CANCEL_TIMEOUT = 3
+    READY_TIMEOUT = 6
+    EVENT_BACKLOG = 200
+
+    def __init__(self, port='COM4', baud=9600, autoconnect=True):
         self.port = port
         self.baud = baud
         self.ser = None
@@ -12,115 +112,271 @@ class FingerprintScanner:
         self.scan_result = None
         self.enroll_message = ""
         self.last_scan_id = None
-        self.connect()
+        self.commands = queue.Queue()
+        self.current = None
+        self.enroll_command = None
+        self.writer_thread = None
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.running = False
+        self.events = deque(maxlen=self.EVENT_BACKLOG)
+        self.event_seq = 0
+        self.event_cond = threading.Condition()
+        if autoconnect:
+            self.connect()
 
     def connect(self):
         """Connect to Arduino"""
         try:
-            self.ser = serial.Serial(self.port, self.baud, timeout=2)
-            time.sleep(3)
-            
+            self.ser = serial.Serial(self.port, self.baud, timeout=0.5)
             self.ser.reset_input_buffer()
             self.ser.reset_output_buffer()
-            
-            for _ in range(10):
-                if self.ser.in_waiting > 0:
-                    response = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    print(f"📡 Arduino says: {response}")
-                    if "READY" in response or "Waiting" in response:
-                        print(f"✅ R307 connected on {self.port}")
-                        return True
-                time.sleep(0.3)
-            
-            print(f"⚠️ Connected on {self.port} (no READY message)")
+            self.ready.clear()
+            self._start_threads()
+
+            # The Arduino resets when the port opens and prints READY once booted
+            if self.ready.wait(self.READY_TIMEOUT):
+                print(f"✅ R307 connected on {self.port}")
+            else:
+                print(f"⚠️ Connected on {self.port} (no READY message)")
             return True
-            
+
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             self.ser = None
             return False
 
+    def _start_threads(self):
+        self.running = True
+        threading.Thread(target=self._read_loop, daemon=True,
+                         name=f'fp-reader-{self.port}').start()
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            self.writer_thread = threading.Thread(target=self._command_loop, daemon=True,
+                                                  name=f'fp-writer-{self.port}')
+            self.writer_thread.start()
+
+    def reconnect(self):
+        """Reopen the port after the device was unplugged or reset"""
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+            self.ser = None
+        return self.connect()
+
+    def close(self):
+        """Stop the I/O threads and release the port"""
+        self.running = False
+        self.commands.put(None)
+        self._fail_current(ConnectionError('Scanner closed'))
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+
     def is_connected(self):
         """Check connection"""
         return self.ser is not None and self.ser.is_open
 
+    # ==================== PROGRESS EVENTS ====================
+
+    def _publish(self, event_type, **data):
+        """Record a progress event for streaming clients"""
+        with self.event_cond:
+            self.event_seq += 1
+            self.events.append({'id': self.event_seq, 'type': event_type,
+                                'time': time.time(), **data})
+            self.event_cond.notify_all()
+
+    def resume_cursor(self, cursor):
+        """(cursor, reset) for a client resuming after ``cursor``.
+
+        A cursor ahead of event_seq comes from before a restart (ids start
+        over at 1): the whole backlog is replayed, reset 'restarted'. One
+        older than the backlog has lost events in between, reset 'overflow'.
+        """
+        with self.event_cond:
+            oldest = self.events[0]['id'] if self.events else self.event_seq + 1
+            if cursor > self.event_seq:
+                return oldest - 1, 'restarted'
+            if cursor < oldest - 1:
+                return oldest - 1, 'overflow'
+            return cursor, None
+
+    def events_since(self, cursor, timeout=0):
+        """Events with id > cursor, waiting up to ``timeout`` seconds for one"""
+        with self.event_cond:
+            self.event_cond.wait_for(lambda: self.event_seq > cursor, timeout)
+            return [e for e in self.events if e['id'] > cursor]
+
+    # ==================== I/O THREADS ====================
+
+    def _read_loop(self):
+        """Blocking readline, dispatches each line as an event"""
+        ser = self.ser
+        while self.running and ser is self.ser:
+            try:
+                raw = ser.readline()
+            except Exception as e:
+                print(f"❌ Serial read error on {self.port}: {e}")
+                self._on_disconnect(e, ser)
+                break
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+            print(f"📡 Arduino: {line}")
+            self._dispatch(parse_line(line))
+        print("🎧 Reader stopped")
+
+    def _dispatch(self, event):
+        if event.kind == READY:
+            self.ready.set()
+        with self.lock:
+            command = self.current
+        if command is None:
+            return
+        if event.kind in command.terminal:
+            command.replied.set()
+            if command.future.done():
+                # Timed out or cancelled already, must not answer the next command
+                if event.kind == ENROLL_CANCELLED:
+                    print(f"🛑 Enrollment cancelled on {self.port}")
+                else:
+                    print(f"🗑️ Discarding late reply to {command.name}: {event.line}")
+                return
+            command.finish(event)
+        elif command.on_event and not command.future.done():
+            command.on_event(event)
+
+    def _command_loop(self):
+        """Send queued commands one at a time"""
+        while self.running:
+            command = self.commands.get()
+            if command is None:
+                break
+            if not command.future.set_running_or_notify_cancel():
+                continue
+            with self.lock:
+                self.current = command
+            command.sent_at = time.perf_counter()
+            try:
+                self.ser.write(f"{command.name}\n".encode())
+                self.ser.flush()
+                print(f"📤 {command.name} command sent")
+            except Exception as e:
+                print(f"❌ Serial write error on {self.port}: {e}")
+                command.finish(error=e)
+                command.replied.set()
+            command.done.wait(command.timeout)
+            command.finish(None)  # no terminal event within the timeout
+            if not command.replied.is_set():
+                # The device is still busy with it (the protocol has no command
+                # IDs): stay on this command so its late reply is discarded, then
+                # drop whatever is left before the next command goes out
+                print(f"⏳ Waiting for {command.name} to finish on {self.port}")
+                if not command.replied.wait(command.timeout):
+                    self._reset_input()
+            with self.lock:
+                self.current = None
+
+    def _fail_current(self, error):
+        with self.lock:
+            command = self.current
+        if command is not None:
+            command.finish(error=error)
+            command.replied.set()  # nothing more will come on this connection
+
+    def _reset_input(self):
+        try:
+            self.ser.reset_input_buffer()
+        except Exception:
+            pass
+
+    def _on_disconnect(self, error, ser=None):
+        """Close ``ser`` (default: the current port) after it failed.
+
+        A reader of an old connection may fail after reconnect() opened a new
+        one, that must not close the new port or fail its command.
+        """
+        ser = ser or self.ser
+        try:
+            ser.close()
+        except Exception:
+            pass
+        if ser is self.ser:
+            self._fail_current(error)
+
+    def _queue_command(self, name, terminal, timeout, on_event=None):
+        command = _Command(name, terminal, timeout, on_event)
+        self.commands.put(command)
+        return command
+
+    def send_command(self, name, terminal, timeout, on_event=None):
+        """Queue a command, returns a Future of its terminal event (None on timeout)"""
+        return self._queue_command(name, terminal, timeout, on_event).future
+
+    # ==================== ENROLLMENT ====================
+
     def start_enrollment(self, security_level=5):
         """Start enrollment"""
         if not self.is_connected():
             return {'success': False, 'error': 'Scanner not connected'}
-        
+
         try:
             self.enrolling = True
             self.enrolled_data = None
             self.enroll_message = "Starting..."
-            
-            self.ser.reset_input_buffer()
-            self.ser.reset_output_buffer()
-            
-            self.ser.write(b'ENROLL\n')
-            self.ser.flush()
-            time.sleep(0.1)
-            
-            print("📤 ENROLL command sent")
-            
-            threading.Thread(target=self._enrollment_listener, daemon=True).start()
-            
-            return {'success': True, 'message': 'Enrollment started'}
+
+            command = self._queue_command('ENROLL', {ENROLL_SUCCESS, ENROLL_CANCELLED, ERROR},
+                                          self.ENROLL_TIMEOUT, self._on_enroll_event)
+            command.future.add_done_callback(self._on_enroll_done)
+            self.enroll_command = command
+            cursor = self.event_seq
+            self._publish('enroll_started', message=self.enroll_message)
+
+            return {'success': True, 'message': 'Enrollment started', 'cursor': cursor}
         except Exception as e:
             print(f"❌ Enrollment start error: {e}")
             return {'success': False, 'error': str(e)}
 
-    def _enrollment_listener(self):
-        """Listen for enrollment updates"""
-        print("🎧 Enrollment listener active")
-        
-        while self.enrolling:
-            try:
-                if self.ser.in_waiting > 0:
-                    line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    
-                    if not line:
-                        continue
-                    
-                    print(f"📡 Arduino: {line}")
-                    
-                    if "place" in line.lower() and "again" in line.lower():
-                        self.enroll_message = "👆 Step 3/3: Place same finger again..."
-                    elif "remove" in line.lower():
-                        self.enroll_message = "✋ Step 2/3: Remove finger..."
-                    elif "place" in line.lower():
-                        self.enroll_message = "👆 Step 1/3: Place finger on sensor..."
-                    else:
-                        self.enroll_message = line
-                    
-                    if line.startswith("ENROLL:SUCCESS:"):
-                        parts = line.split(':')
-                        if len(parts) >= 3:
-                            fp_id = parts[2]
-                            template = f"FP_TEMPLATE_{fp_id}_{int(time.time())}"
-                            
-                            self.enrolled_data = {
-                                'fingerprint_id': fp_id,
-                                'template_data': template
-                            }
-                            self.enroll_message = f"✅ Enrollment complete! ID: {fp_id}"
-                            self.enrolling = False
-                            print(f"✅ SUCCESS: ID {fp_id}")
-                            break
-                    
-                    elif line.startswith("ERROR:"):
-                        self.enroll_message = line
-                        self.enrolling = False
-                        print(f"❌ ERROR: {line}")
-                        break
-                        
-            except Exception as e:
-                print(f"❌ Listener error: {e}")
-                break
-            
-            time.sleep(0.05)
-        
-        print("🎧 Listener stopped")
+    def _on_enroll_event(self, event):
+        """Map Arduino prompts to the step messages shown in the admin portal"""
+        line = event.line.lower()
+        if "place" in line and "again" in line:
+            self.enroll_message = "👆 Step 3/3: Place same finger again..."
+        elif "remove" in line:
+            self.enroll_message = "✋ Step 2/3: Remove finger..."
+        elif "place" in line:
+            self.enroll_message = "👆 Step 1/3: Place finger on sensor..."
+        else:
+            self.enroll_message = event.line
+        self._publish('enroll_step', message=self.enroll_message)
+
+    def _on_enroll_done(self, future):
+        if future.cancelled() or not self.enrolling:
+            return
+        error = future.exception()
+        event = None if error else future.result()
+        if event is not None and event.kind == ENROLL_SUCCESS:
+            fp_id = event.slot_id
+            self.enrolled_data = {
+                'fingerprint_id': fp_id,
+                'template_data': f"FP_TEMPLATE_{fp_id}_{int(time.time())}"
+            }
+            self.enroll_message = f"✅ Enrollment complete! ID: {fp_id}"
+            print(f"✅ SUCCESS: ID {fp_id}")
+            self._publish('enroll_complete', message=self.enroll_message,
+                          **self.enrolled_data)
+        else:
+            if event is not None:
+                self.enroll_message = event.line
+                print(f"❌ ERROR: {event.line}")
+            else:
+                self.enroll_message = f"ERROR:{error}" if error else "⏱️ Enrollment timed out"
+            self._publish('enroll_failed', message=self.enroll_message)
+        self.enrolling = False
 
     def get_enrollment_status(self):
         """Get enrollment status"""
@@ -149,74 +405,271 @@ class FingerprintScanner:
                 'error': 'Not enrolling'
             }
 
+    def cancel_enrollment(self):
+        """Cancel enrollment"""
+        self.enrolling = False
+        self.enrolled_data = None
+        self.enroll_message = ""
+        self._publish('enroll_cancelled', message='Enrollment cancelled')
+        command = self.enroll_command
+        if command is not None and not command.future.cancel() and not command.future.done():
+            # Already sent: CANCEL makes the sketch abandon it and answer
+            # ENROLL:CANCELLED. The command loop waits CANCEL_TIMEOUT for that
+            # answer instead of ENROLL_TIMEOUT, then moves on either way
+            command.timeout = self.CANCEL_TIMEOUT
+            command.finish(None)
+            try:
+                self.ser.write(b"CANCEL\n")
+                self.ser.flush()
+                print("📤 CANCEL command sent")
+            except Exception as e:
+                print(f"❌ Serial write error on {self.port}: {e}")
+                command.replied.set()
+        return {'success': True}
+
+    # ==================== SCAN ====================
+
     def scan_fingerprint(self):
+        """Scan fingerprint and publish the result as a 'scan' event"""
+        result = self._scan()
+        self._publish('scan', **result)
+        return result
+
+    def _scan(self):
         """Scan fingerprint - ✅ FIXED: Don't cache NO_MATCH results"""
         if not self.is_connected():
             return {'scanned': False, 'error': 'Not connected'}
-        
-        # ✅ REMOVED: Cache check - always scan fresh
-        
+
+        command = self._queue_command('SCAN', {SCAN_MATCH, SCAN_NO_MATCH, ERROR}, self.SCAN_TIMEOUT)
+        future = command.future
         try:
-            self.ser.reset_input_buffer()
-            self.ser.reset_output_buffer()
-            
-            self.ser.write(b'SCAN\n')
-            self.ser.flush()
-            
-            print("📤 SCAN command sent")
-            
-            timeout = time.time() + 8
-            
-            while time.time() < timeout:
-                if self.ser.in_waiting > 0:
-                    response = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    print(f"📡 Scan response: {response}")
-                    
-                    if response.startswith("SCAN:MATCH:"):
-                        fp_id = response.split(':')[2]
-                        template = f"FP_TEMPLATE_{fp_id}_{int(time.time())}"
-                        
-                        # ✅ ONLY cache MATCHED fingerprints
-                        self.last_scan_id = fp_id
-                        self._scan_time = time.time()
-                        
-                        print(f"✅ MATCH: Slot {fp_id}")
-                        return {
-                            'scanned': True,
-                            'fingerprint_id': fp_id,
-                            'template_data': template
-                        }
-                    
-                    elif "SCAN:NO_MATCH" in response or "no match" in response.lower():
-                        # ✅ CRITICAL FIX: Don't cache unmatched scans
-                        self.last_scan_id = None
-                        print("❌ NO MATCH - fingerprint not in database")
-                        return {
-                            'scanned': True,
-                            'fingerprint_id': None,
-                            'message': 'No match'
-                        }
-                    
-                    elif response.startswith("ERROR:"):
-                        return {'scanned': False, 'error': response}
-                
-                time.sleep(0.1)
-            
-            return {'scanned': False, 'message': 'Timeout - no finger detected'}
-            
+            # Queue wait (e.g. behind an enrollment) + the scan itself
+            event = future.result(timeout=self.SCAN_TIMEOUT * 2)
+        except TimeoutError:
+            future.cancel()
+            return {'scanned': False, 'message': 'Scanner busy - try again'}
         except Exception as e:
             print(f"❌ Scan error: {e}")
             return {'scanned': False, 'error': str(e)}
+        finally:
+            if command.sent_at is not None:
+                tracing.record('scan_queue_wait', command.sent_at - command.queued_at)
+                tracing.record('scan_device', (command.finished_at or time.perf_counter()) - command.sent_at)
 
-    def cancel_enrollment(self):
-        """Cancel enrollment"""
-        self.enrolling = False
-        self.enrolled_data = None
-        self.enroll_message = ""
-        return {'success': True}
+        if event is None:
+            return {'scanned': False, 'message': 'Timeout - no finger detected'}
+
+        if event.kind == SCAN_MATCH:
+            fp_id = event.slot_id
+            template = f"FP_TEMPLATE_{fp_id}_{int(time.time())}"
+
+            # ✅ ONLY cache MATCHED fingerprints
+            self.last_scan_id = fp_id
+            self._scan_time = time.time()
+
+            print(f"✅ MATCH: Slot {fp_id}")
+            return {
+                'scanned': True,
+                'fingerprint_id': fp_id,
+                'template_data': template
+            }
+
+        if event.kind == SCAN_NO_MATCH:
+            # ✅ CRITICAL FIX: Don't cache unmatched scans
+            self.last_scan_id = None
+            print("❌ NO MATCH - fingerprint not in database")
+            return {
+                'scanned': True,
+                'fingerprint_id': None,
+                'message': 'No match'
+            }
+
+        return {'scanned': False, 'error': event.line}
+
+    # ==================== SLOTS ====================
+
+    def list_slots(self):
+        """Slots holding a template on the sensor, None if it did not answer.
+
+        Sent as LIST, the sketch answers SLOTS:<ranges> from the R307 index
+        table. Sketches without LIST answer with an ERROR line (None here).
+        """
+        if not self.is_connected():
+            return None
+        future = self.send_command('LIST', {SLOTS, ERROR}, self.LIST_TIMEOUT)
+        try:
+            event = future.result(timeout=self.LIST_TIMEOUT * 2)
+        except TimeoutError:
+            future.cancel()
+            return None
+        except Exception as e:
+            print(f"❌ Slot list error: {e}")
+            return None
+        if event is None or event.kind != SLOTS:
+            return None
+        try:
+            return parse_slots(event.line)
+        except ValueError:
+            print(f"❌ Unreadable slot list: {event.line}")
+            return None
 
     def clear_last_scan(self):
         """Clear scan cache"""
         self.last_scan_id = None
         self._scan_time = 0
         return {'success': True}
+
+
+def parse_booth_ports(spec):
+    """'booth1=COM4,booth2=COM5' -> {'booth1': 'COM4', 'booth2': 'COM5'}"""
+    ports = {}
+    for i, item in enumerate(filter(None, (p.strip() for p in spec.split(',')))):
+        booth_id, _, port = item.rpartition('=')
+        ports[booth_id.strip() or f'booth{i + 1}'] = port.strip()
+    return ports
+
+
+def configured_booth_ports():
+    """FINGERPRINT_PORTS of this process, the first booth is the default one"""
+    return parse_booth_ports(os.environ.get('FINGERPRINT_PORTS', 'default=COM4'))
+
+
+class ScannerPool:
+    """One FingerprintScanner per booth, connected and reconnected in the background.
+
+    Construction returns immediately. A monitor thread opens every port, backs
+    off exponentially (RECONNECT_MIN..RECONNECT_MAX seconds) while a scanner is
+    missing and retries at once when its port appears again (hot-plug).
+    """
+
+    RECONNECT_MIN = 1
+    RECONNECT_MAX = 30
+    HOTPLUG_POLL = 1
+
+    def __init__(self, booth_ports, baud=9600):
+        self.booth_ports = dict(booth_ports)
+        self.baud = baud
+        self.scanners = {}
+        self.health = {}
+        self.retry = {}
+        self.lock = threading.Lock()
+        self.connected = threading.Condition(self.lock)
+        self.running = True
+
+        for booth_id, port in self.booth_ports.items():
+            self.scanners[booth_id] = FingerprintScanner(port, self.baud, autoconnect=False)
+            self.retry[booth_id] = {'delay': self.RECONNECT_MIN, 'next_at': 0,
+                                    'present': None, 'connecting': False}
+            self._update_health(booth_id, state='connecting')
+        threading.Thread(target=self._monitor_loop, daemon=True, name='fp-pool-monitor').start()
+
+    @property
+    def default_booth(self):
+        return next(iter(self.booth_ports), None)
+
+    @staticmethod
+    def _port_present(port, listed):
+        """Device nodes exist on POSIX, COM ports only show up in the port list"""
+        if port.startswith('/'):
+            return os.path.exists(port)
+        return port in listed
+
+    def _update_health(self, booth_id, error=None, state=None):
+        scanner = self.scanners.get(booth_id)
+        connected = scanner is not None and scanner.is_connected()
+        with self.lock:
+            health = self.health.setdefault(booth_id, {
+                'booth_id': booth_id,
+                'port': self.booth_ports[booth_id],
+                'reconnects': 0,
+            })
+            health['connected'] = connected
+            if connected:
+                health['state'] = 'connected'
+            elif state:
+                health['state'] = state
+            elif health.get('state', 'connected') == 'connected':
+                health['state'] = 'disconnected'
+            health['checked_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            if error:
+                health['last_error'] = error
+            if connected:
+                self.connected.notify_all()
+        return connected
+
+    def _connect(self, booth_id):
+        scanner = self.scanners[booth_id]
+        retry = self.retry[booth_id]
+        print(f"🔌 Connecting booth {booth_id} on {scanner.port}...")
+        if scanner.reconnect():
+            retry['delay'] = self.RECONNECT_MIN
+            self._update_health(booth_id)
+        else:
+            retry['next_at'] = time.time() + retry['delay']
+            self._update_health(booth_id, state='backoff',
+                                error=f"connect failed, retry in {retry['delay']}s")
+            retry['delay'] = min(retry['delay'] * 2, self.RECONNECT_MAX)
+        retry['connecting'] = False
+
+    def _monitor_loop(self):
+        """Connect missing scanners: on backoff expiry or as soon as the port appears"""
+        from serial.tools import list_ports
+        while self.running:
+            listed = None
+            for booth_id, scanner in list(self.scanners.items()):
+                retry = self.retry[booth_id]
+                connected = self._update_health(booth_id)
+                if retry['connecting']:
+                    continue
+                if listed is None and not scanner.port.startswith('/'):
+                    listed = {p.device for p in list_ports.comports()}
+                present = self._port_present(scanner.port, listed or ())
+                if connected:
+                    retry['present'] = present
+                    if present:
+                        continue
+                    # Unplugged, close it before the reader trips over the dead port
+                    print(f"🔌 Booth {booth_id} unplugged from {scanner.port}")
+                    scanner._on_disconnect(ConnectionError('Port removed'))
+                plugged_in = present and retry['present'] is False
+                retry['present'] = present
+                if not present:
+                    self._update_health(booth_id, state='unplugged')
+                    continue
+                if plugged_in or time.time() >= retry['next_at']:
+                    if plugged_in:
+                        retry['delay'] = self.RECONNECT_MIN
+                    retry['connecting'] = True
+                    with self.lock:
+                        self.health[booth_id]['state'] = 'connecting'
+                        self.health[booth_id]['reconnects'] += 1
+                    threading.Thread(target=self._connect, args=(booth_id,), daemon=True,
+                                     name=f'fp-connect-{booth_id}').start()
+            time.sleep(self.HOTPLUG_POLL)
+
+    def wait_connected(self, timeout=None, booth_id=None):
+        """Block until ``booth_id`` (or any booth) is connected, returns whether it is"""
+        def ready():
+            if booth_id:
+                return self.scanners[booth_id].is_connected()
+            return any(s.is_connected() for s in self.scanners.values())
+        with self.connected:
+            return self.connected.wait_for(ready, timeout)
+
+    def get(self, booth_id=None):
+        """Scanner for ``booth_id`` (default booth when None), or None if unknown"""
+        return self.scanners.get(booth_id or self.default_booth)
+
+    def any_connected(self):
+        return any(s.is_connected() for s in self.scanners.values())
+
+    def status(self):
+        for booth_id in self.scanners:
+            self._update_health(booth_id)
+        with self.lock:
+            return [dict(h) for h in self.health.values()]
+
+    def close(self):
+        self.running = False
+        for scanner in self.scanners.values():
+            scanner.close()
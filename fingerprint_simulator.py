@@ -0,0 +1,155 @@
+"""Hardware-free stand-in for the Arduino + R307 fingerprint sensor.
+
+Opens a pseudo terminal and speaks the same line protocol as the sketch, so
+FingerprintScanner can be pointed at it like a real serial port (POSIX only):
+
+    python fingerprint_simulator.py --scan-delay 0.8
+    FINGERPRINT_PORTS=booth1=/dev/pts/3 python voter_auth_api.py
+"""
+import os
+import pty
+import queue
+import random
+import threading
+import time
+import tty
+
+from fingerprint_service import format_slots
+
+
+class FingerprintSimulator:
+    """Simulated sensor with configurable delays and failure injection"""
+
+    def __init__(self, boot_delay=0.5, scan_delay=0.5, enroll_step_delay=0.5,
+                 enrolled_slots=(1,), error_rate=0.0, no_match_rate=0.0,
+                 silent_rate=0.0, seed=None):
+        self.boot_delay = boot_delay
+        self.scan_delay = scan_delay
+        self.enroll_step_delay = enroll_step_delay
+        self.enrolled_slots = set(enrolled_slots)
+        self.error_rate = error_rate
+        self.no_match_rate = no_match_rate
+        self.silent_rate = silent_rate  # no reply at all, the host must time out
+        self.random = random.Random(seed)
+        self.commands_seen = []
+        self.commands = queue.Queue()
+        self.cancel = threading.Event()
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name='fp-simulator')
+        self.thread.start()
+        threading.Thread(target=self._work, daemon=True, name='fp-simulator-work').start()
+
+    def _send(self, line):
+        os.write(self.master, f"{line}\r\n".encode())
+
+    def _run(self):
+        time.sleep(self.boot_delay)
+        try:
+            self._send("READY")
+        except OSError:
+            return  # closed before it finished booting
+        buf = b''
+        while self.running:
+            try:
+                buf += os.read(self.master, 256)
+            except OSError:
+                break
+            while b'\n' in buf:
+                raw, buf = buf.split(b'\n', 1)
+                command = raw.decode('utf-8', errors='ignore').strip()
+                if not command:
+                    continue
+                self.commands_seen.append(command)
+                # Like the sketch, CANCEL is read while a command is running
+                if command == 'CANCEL':
+                    self.cancel.set()
+                else:
+                    self.commands.put(command)
+        self.commands.put(None)
+
+    def _work(self):
+        while True:
+            command = self.commands.get()
+            if command is None:
+                break
+            try:
+                self._handle(command)
+            except OSError:
+                break
+
+    def _inject_failure(self):
+        """Returns True when this command should fail instead of succeed"""
+        roll = self.random.random()
+        if roll < self.silent_rate:
+            return True
+        if roll < self.silent_rate + self.error_rate:
+            self._send("ERROR:SENSOR_FAULT")
+            return True
+        return False
+
+    def _handle(self, command):
+        if command == 'SCAN':
+            time.sleep(self.scan_delay)
+            if self._inject_failure():
+                return
+            if not self.enrolled_slots or self.random.random() < self.no_match_rate:
+                self._send("SCAN:NO_MATCH")
+            else:
+                self._send(f"SCAN:MATCH:{self.random.choice(sorted(self.enrolled_slots))}")
+        elif command == 'ENROLL':
+            self.cancel.clear()
+            for prompt in ("Place finger", "Remove finger", "Place same finger again", None):
+                if self.cancel.wait(self.enroll_step_delay):
+                    self._send("ENROLL:CANCELLED")
+                    return
+                if prompt:
+                    self._send(prompt)
+            if self._inject_failure():
+                return
+            slot = next(i for i in range(1, 1001) if i not in self.enrolled_slots)
+            self.enrolled_slots.add(slot)
+            self._send(f"ENROLL:SUCCESS:{slot}")
+        elif command == 'LIST':
+            if self._inject_failure():
+                return
+            self._send(f"SLOTS:{format_slots(self.enrolled_slots)}")
+        else:
+            self._send(f"ERROR:UNKNOWN_COMMAND:{command}")
+
+    def close(self):
+        self.running = False
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulated R307 fingerprint sensor')
+    parser.add_argument('--boot-delay', type=float, default=0.5)
+    parser.add_argument('--scan-delay', type=float, default=0.5)
+    parser.add_argument('--enroll-step-delay', type=float, default=0.5)
+    parser.add_argument('--slots', default='1', help='Comma separated enrolled slots')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--no-match-rate', type=float, default=0.0)
+    parser.add_argument('--silent-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    sim = FingerprintSimulator(
+        boot_delay=args.boot_delay, scan_delay=args.scan_delay,
+        enroll_step_delay=args.enroll_step_delay,
+        enrolled_slots=[int(s) for s in args.slots.split(',') if s],
+        error_rate=args.error_rate, no_match_rate=args.no_match_rate,
+        silent_rate=args.silent_rate)
+    print(f"🧪 Simulated R307 on {sim.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sim.close()
@@ -0,0 +1,207 @@
+"""Occupied fingerprint slots, and reconciliation of the database with the sensors.
+
+The R307 stores each enrolled template in a numbered slot (1..FINGERPRINT_CAPACITY)
+and voters carry that slot as fingerprint_id, with the booth whose sensor
+holds it as fingerprint_booth. Slot numbers only mean something on their own
+sensor, so BoothSlots keeps one SlotIndex (a bitmap of the slots the database
+uses) per booth, built from the store at startup and updated by
+register_voter, so a free slot is known without a lookup.
+
+SlotReconciler asks every booth's sensor for its occupied slots (the LIST
+command) once it connects, and again on POST /api/fingerprint/reconcile, and
+reports the differences with that booth's voters:
+
+- orphaned: a template on the sensor that no voter points at (enrollment done
+  but registration failed, or voters lost from the database)
+- missing: a voter whose slot is empty on that sensor, they cannot pass the
+  fingerprint check at that booth
+"""
+import os
+import threading
+import time
+
+from metrics import render_metric
+
+FINGERPRINT_CAPACITY = int(os.environ.get('FINGERPRINT_CAPACITY', '1000'))
+# How long startup reconciliation waits for each booth's scanner to connect
+RECONCILE_CONNECT_WAIT = float(os.environ.get('RECONCILE_CONNECT_WAIT', '60'))
+
+# Slots listed in a report, the counts are always complete
+REPORT_LIMIT = 100
+
+
+class SlotIndex:
+    """Bitmap of occupied sensor slots.
+
+    IDs that are not a slot number in 1..capacity (imported data, a sensor
+    with more slots) are kept in a set so membership stays exact.
+    """
+
+    def __init__(self, slot_ids=(), capacity=FINGERPRINT_CAPACITY):
+        self.capacity = capacity
+        self.bits = bytearray(capacity // 8 + 1)
+        self.other = set()
+        self.count = 0
+        self.lock = threading.Lock()
+        for slot_id in slot_ids:
+            self.add(slot_id)
+
+    def _slot(self, slot_id):
+        try:
+            slot = int(slot_id)
+        except (TypeError, ValueError):
+            return None
+        return slot if 1 <= slot <= self.capacity else None
+
+    def add(self, slot_id):
+        """Mark a slot occupied, returns False if it already was"""
+        slot = self._slot(slot_id)
+        with self.lock:
+            if slot is None:
+                if str(slot_id) in self.other:
+                    return False
+                self.other.add(str(slot_id))
+            else:
+                byte, bit = divmod(slot, 8)
+                if self.bits[byte] & (1 << bit):
+                    return False
+                self.bits[byte] |= 1 << bit
+            self.count += 1
+            return True
+
+    def __contains__(self, slot_id):
+        slot = self._slot(slot_id)
+        if slot is None:
+            return str(slot_id) in self.other
+        byte, bit = divmod(slot, 8)
+        return bool(self.bits[byte] & (1 << bit))
+
+    def __len__(self):
+        return self.count
+
+    def slots(self):
+        """Occupied slot numbers in 1..capacity, ascending"""
+        with self.lock:
+            bits = bytes(self.bits)
+        return [byte * 8 + bit for byte, value in enumerate(bits) if value
+                for bit in range(8) if value & (1 << bit)]
+
+
+
+class BoothSlots:
+    """One SlotIndex per booth.
+
+    Voters stored without a booth (registered before booths were recorded)
+    belong to ``default_booth``, the first configured one.
+    """
+
+    def __init__(self, default_booth, capacity=FINGERPRINT_CAPACITY):
+        self.default_booth = default_booth
+        self.capacity = capacity
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def booth(self, booth_id):
+        """SlotIndex of ``booth_id``, created empty on first use"""
+        booth_id = booth_id or self.default_booth
+        with self.lock:
+            index = self.indexes.get(booth_id)
+            if index is None:
+                index = self.indexes[booth_id] = SlotIndex(capacity=self.capacity)
+            return index
+
+    def add(self, booth_id, slot_id):
+        return self.booth(booth_id).add(slot_id)
+
+    def contains(self, booth_id, slot_id):
+        return slot_id in self.booth(booth_id)
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(index) for index in self.indexes.values())
+
+    @classmethod
+    def from_store(cls, store, default_booth, capacity=FINGERPRINT_CAPACITY):
+        booths = cls(default_booth, capacity)
+        for _, voter in store.iter_voters(include_encoding=False):
+            if voter.get('fingerprint_id'):
+                booths.add(voter.get('fingerprint_booth'), voter['fingerprint_id'])
+        return booths
+
+
+def compare(sensor_slots, slot_index):
+    """Report of one sensor's slots against its booth's SlotIndex"""
+    db_slots = set(slot_index.slots())
+    orphaned = sorted(sensor_slots - db_slots)
+    missing = sorted(db_slots - sensor_slots)
+    return {
+        'sensor_slots': len(sensor_slots),
+        'db_slots': len(slot_index),
+        'orphaned_count': len(orphaned),
+        'missing_count': len(missing),
+        'orphaned': orphaned[:REPORT_LIMIT],
+        'missing': missing[:REPORT_LIMIT],
+        'unchecked': sorted(slot_index.other)[:REPORT_LIMIT],
+    }
+
+
+class SlotReconciler:
+    """Per-booth reconciliation reports, at startup and on demand"""
+
+    def __init__(self, scanner_pool, booth_slots):
+        self.scanner_pool = scanner_pool
+        self.booth_slots = booth_slots
+        self.reports = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Reconcile every booth in the background as soon as it connects"""
+        threading.Thread(target=self._startup, daemon=True, name='fp-reconcile').start()
+
+    def _startup(self):
+        for booth_id in self.scanner_pool.booth_ports:
+            if self.scanner_pool.wait_connected(RECONCILE_CONNECT_WAIT, booth_id):
+                self.reconcile(booth_id)
+            else:
+                self._store(booth_id, {'error': 'Scanner not connected'})
+
+    def reconcile(self, booth_id):
+        scanner = self.scanner_pool.get(booth_id)
+        if scanner is None or not scanner.is_connected():
+            return self._store(booth_id, {'error': 'Scanner not connected'})
+        sensor_slots = scanner.list_slots()
+        if sensor_slots is None:
+            return self._store(booth_id, {'error': 'Sensor did not list its slots'})
+        report = compare(sensor_slots, self.booth_slots.booth(booth_id))
+        if report['orphaned_count'] or report['missing_count']:
+            print(f"⚠️ Booth {booth_id}: {report['orphaned_count']} orphaned template(s), "
+                  f"{report['missing_count']} voter slot(s) missing on the sensor")
+        else:
+            print(f"✅ Booth {booth_id}: sensor matches the database ({report['sensor_slots']} slots)")
+        return self._store(booth_id, report)
+
+    def reconcile_all(self):
+        return [self.reconcile(booth_id) for booth_id in self.scanner_pool.booth_ports]
+
+    def _store(self, booth_id, report):
+        report = {'booth_id': booth_id, 'checked_at': time.strftime('%Y-%m-%d %H:%M:%S'), **report}
+        with self.lock:
+            self.reports[booth_id] = report
+        return report
+
+    def status(self):
+        with self.lock:
+            return [dict(r) for r in self.reports.values()]
+
+    def render(self):
+        reports = [r for r in self.status() if 'error' not in r]
+        with self.booth_slots.lock:
+            occupied = sorted((booth, len(index)) for booth, index in self.booth_slots.indexes.items())
+        return (
+            render_metric('fingerprint_slots_occupied', 'gauge', 'Sensor slots used by registered voters',
+                          [({'booth': booth}, n) for booth, n in occupied])
+            + render_metric('fingerprint_slot_drift', 'gauge',
+                            'Slots that differ between a sensor and the database at the last reconciliation',
+                            [({'booth': r['booth_id'], 'kind': kind}, r[f'{kind}_count'])
+                             for r in reports for kind in ('orphaned', 'missing')])
+        )
@@ -0,0 +1,107 @@
+import threading
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def render_metric(name, kind, help_text, samples):
+    """Prometheus text format for one metric, samples are (labels, value)"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(f'{name}{format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class TurnoutCounters:
+    """Registered / voted counts per constituency, kept in memory.
+
+    Seeded from the store at startup, then updated by register_voter and
+    mark_voted so health checks never touch the voter data.
+    """
+
+    def __init__(self, store=None):
+        self.lock = threading.Lock()
+        self.counts = {}
+        if store is not None:
+            self.rebuild(store)
+
+    def rebuild(self, store):
+        totals = store.turnout()
+        with self.lock:
+            self.counts = {c: dict(v) for c, v in totals.items()}
+
+    def _bucket(self, constituency):
+        return self.counts.setdefault(constituency, {'registered': 0, 'voted': 0})
+
+    def on_register(self, constituency):
+        with self.lock:
+            self._bucket(constituency)['registered'] += 1
+
+    def on_vote(self, constituency):
+        with self.lock:
+            self._bucket(constituency)['voted'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {c: dict(v) for c, v in self.counts.items()}
+
+    def totals(self):
+        with self.lock:
+            registered = sum(v['registered'] for v in self.counts.values())
+            voted = sum(v['voted'] for v in self.counts.values())
+        return registered, voted
+
+    def render(self):
+        counts = sorted(self.snapshot().items())
+        return (
+            render_metric('voters_registered', 'gauge', 'Registered voters per constituency',
+                          [({'constituency': c}, v['registered']) for c, v in counts])
+            + render_metric('voters_voted', 'gauge', 'Voters marked as voted per constituency',
+                            [({'constituency': c}, v['voted']) for c, v in counts])
+        )
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with labels, in seconds"""
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            items = sorted((k, dict(v, buckets=list(v['buckets']))) for k, v in self.series.items())
+        for label_values, series in items:
+            labels = dict(zip(self.label_names, label_values))
+            for bound, count in zip(self.buckets, series['buckets']):
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': '+Inf'})} {series['count']}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {series['count']}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,400 @@
+"""Routes API requests to the node that owns the voter's constituency.
+
+Each regional node runs voter_auth_api.py with NODE_PARTITIONS set to the
+constituencies it serves. The router sits in front of them and keeps a
+persisted directory (ROUTER_DB) of voter ID -> constituency,
+constituency -> node URL and booth -> node URL:
+
+- registrations go to the node of the voter's constituency; the voter ID is
+  reserved in the directory first and released if the node turns them down
+- requests carrying a voter_id go to the node of that voter's partition
+- requests with ?constituency= (exports, results) go to that partition's node
+- /api/fingerprint/* goes to the node whose FINGERPRINT_PORTS has the booth
+  (X-Booth-Id or ?booth_id=); each booth's scanner is attached to one node
+- health is summed over every node, anything else goes to ROUTER_DEFAULT_NODE
+
+A booth enrolls fingerprints on its node's sensor, so registration and dual
+authentication at a booth are only accepted for constituencies served by the
+booth's node; a request without a booth uses the default node's first booth.
+
+A partition moves by copying its files to the new node, adding it to that
+node's NODE_PARTITIONS, then reassigning it here; voter entries are untouched.
+
+Uniqueness across partitions: voter IDs are unique over every node, the
+reservation is a single INSERT into the directory, so two registrations of
+one ID race for it and only one reaches a node. Fingerprint (booth, slot)
+pairs and faces are NOT checked across partitions: each node only compares
+them with its own constituencies, so one person can be registered again, with
+the same finger or face, in a constituency served by another node. Voters
+bulk-imported on a node directly (bulk_import.py) reach the directory with
+--rebuild.
+
+    python partition_router.py --assign jalna=http://10.0.0.11:5000 beed=http://10.0.0.12:5000
+    python partition_router.py --assign-booth booth1=http://10.0.0.11:5000
+    python partition_router.py --rebuild   # re-read voter IDs from every node
+    python partition_router.py             # serve on ROUTER_PORT
+"""
+import json
+import os
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+
+ROUTER_DB = os.environ.get('ROUTER_DB', 'router.db')
+ROUTER_PORT = int(os.environ.get('ROUTER_PORT', '5000'))
+# Fingerprint, results and other voter-less endpoints go here (default: the
+# node of the first assigned partition)
+ROUTER_DEFAULT_NODE = os.environ.get('ROUTER_DEFAULT_NODE', '')
+ROUTER_TIMEOUT = float(os.environ.get('ROUTER_TIMEOUT', '30'))
+
+# Headers passed through to the nodes, and back from them
+FORWARD_HEADERS = ('Content-Type', 'X-Booth-Id', 'Accept', 'Accept-Encoding')
+RETURN_HEADERS = ('Content-Type', 'Retry-After', 'Cache-Control', 'Content-Encoding',
+                  'Content-Disposition', 'Vary')
+
+
+class PartitionDirectory:
+    """SQLite-backed voter -> partition -> node mapping"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS voters (
+            voter_id TEXT PRIMARY KEY,
+            constituency TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS partitions (
+            constituency TEXT PRIMARY KEY,
+            node_url TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS booths (
+            booth_id TEXT PRIMARY KEY,
+            node_url TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path=ROUTER_DB):
+        self.path = path
+        self.local = threading.local()
+        self.conn.executescript(self.SCHEMA)
+
+    @property
+    def conn(self):
+        """One connection per thread, Flask serves requests on many threads"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def assign(self, constituency, node_url):
+        """Point a partition at a node, returns the previous node or None"""
+        constituency = constituency.lower()
+        previous = self.node_for_constituency(constituency)
+        self.conn.execute('INSERT OR REPLACE INTO partitions (constituency, node_url) VALUES (?, ?)',
+                          (constituency, node_url.rstrip('/')))
+        return previous
+
+    def node_for_constituency(self, constituency):
+        row = self.conn.execute('SELECT node_url FROM partitions WHERE constituency = ?',
+                                (constituency.lower(),)).fetchone()
+        return row[0] if row else None
+
+    def assign_booth(self, booth_id, node_url):
+        """Point a booth at the node its scanner is attached to, returns the previous node"""
+        previous = self.node_for_booth(booth_id)
+        self.conn.execute('INSERT OR REPLACE INTO booths (booth_id, node_url) VALUES (?, ?)',
+                          (booth_id, node_url.rstrip('/')))
+        return previous
+
+    def node_for_booth(self, booth_id):
+        row = self.conn.execute('SELECT node_url FROM booths WHERE booth_id = ?',
+                                (booth_id,)).fetchone()
+        return row[0] if row else None
+
+    def booths(self):
+        return dict(self.conn.execute('SELECT booth_id, node_url FROM booths ORDER BY booth_id'))
+
+    def constituency_of(self, voter_id):
+        row = self.conn.execute('SELECT constituency FROM voters WHERE voter_id = ?',
+                                (voter_id,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, voter_id, constituency):
+        self.record_many([(voter_id, constituency)])
+
+    def reserve(self, voter_id, constituency):
+        """Claim a voter ID for a registration in flight, False if it is taken"""
+        cur = self.conn.execute(
+            'INSERT OR IGNORE INTO voters (voter_id, constituency) VALUES (?, ?)',
+            (voter_id, constituency.lower()))
+        return cur.rowcount > 0
+
+    def release(self, voter_id):
+        self.conn.execute('DELETE FROM voters WHERE voter_id = ?', (voter_id,))
+
+    def record_many(self, items):
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO voters (voter_id, constituency) VALUES (?, ?)',
+                ((v_id, c.lower()) for v_id, c in items))
+
+    def partitions(self):
+        """{constituency: {'node_url': ..., 'voters': n}}"""
+        counts = dict(self.conn.execute(
+            'SELECT constituency, COUNT(*) FROM voters GROUP BY constituency'))
+        return {
+            constituency: {'node_url': node_url, 'voters': counts.get(constituency, 0)}
+            for constituency, node_url in self.conn.execute(
+                'SELECT constituency, node_url FROM partitions ORDER BY constituency')
+        }
+
+    def nodes(self):
+        return sorted({p['node_url'] for p in self.partitions().values()})
+
+    def default_node(self):
+        if ROUTER_DEFAULT_NODE:
+            return ROUTER_DEFAULT_NODE.rstrip('/')
+        nodes = self.partitions()
+        return next(iter(nodes.values()))['node_url'] if nodes else None
+
+    def rebuild(self):
+        """Re-read every assigned partition's voter IDs from its node"""
+        total = 0
+        for constituency, partition in self.partitions().items():
+            status, body = fetch_json(f"{partition['node_url']}/api/partitions/{constituency}/voter_ids")
+            if status != 200:
+                print(f"⚠️ {constituency}: {partition['node_url']} answered {status}")
+                continue
+            self.record_many((v_id, constituency) for v_id in body['voter_ids'])
+            total += len(body['voter_ids'])
+            print(f"🗂️ {constituency}: {len(body['voter_ids'])} voter(s) on {partition['node_url']}")
+        return total
+
+
+def fetch_json(url):
+    """GET a node endpoint, returns (status, parsed body or None)"""
+    try:
+        with urllib.request.urlopen(url, timeout=ROUTER_TIMEOUT) as resp:
+            return resp.status, json.loads(resp.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError, ValueError):
+        return 502, None
+
+
+app = Flask(__name__)
+CORS(app)
+directory = PartitionDirectory()
+
+
+def forward(node_url):
+    """Send the current request to ``node_url``, the response is streamed back"""
+    if node_url is None:
+        return jsonify({'success': False, 'error': 'Partition not assigned to any node'}), 503
+    url = node_url + request.full_path.rstrip('?')
+    headers = {h: request.headers[h] for h in FORWARD_HEADERS if h in request.headers}
+    data = request.get_data() if request.method != 'GET' else None
+    upstream = urllib.request.Request(url, data=data, headers=headers, method=request.method)
+    try:
+        resp = urllib.request.urlopen(upstream, timeout=ROUTER_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        resp = e
+    except (urllib.error.URLError, OSError) as e:
+        print(f"❌ {node_url} unreachable: {e}")
+        return jsonify({'success': False, 'error': 'Voter partition unavailable'}), 502
+
+    def stream():
+        # read1 returns as soon as some data is there (SSE from the node)
+        with resp:
+            yield from iter(lambda: resp.read1(65536), b'')
+
+    response = Response(stream(), status=resp.status)
+    for header in RETURN_HEADERS:
+        if resp.headers.get(header):
+            response.headers[header] = resp.headers[header]
+    return response
+
+
+def request_booth_id():
+    """Booth of the current request, as voter_auth_api.request_booth_id reads it"""
+    booth_id = request.args.get('booth_id') or request.headers.get('X-Booth-Id')
+    if not booth_id and request.is_json:
+        booth_id = (request.get_json(silent=True) or {}).get('booth_id')
+    return booth_id
+
+
+def booth_node(booth_id):
+    """Node whose scanner pool has ``booth_id``, the default node without a booth"""
+    if not booth_id:
+        return directory.default_node()
+    return directory.node_for_booth(booth_id)
+
+
+def booth_mismatch(booth_id, node_url, constituency):
+    """Error response unless the booth's scanner is on the node serving ``constituency``"""
+    scanner_node = booth_node(booth_id)
+    if scanner_node is None:
+        return jsonify({'success': False, 'error': 'Unknown booth'}), 400
+    if scanner_node != node_url:
+        print(f"⚠️ Booth {booth_id or '(default)'} is on {scanner_node}, "
+              f"{constituency} is served by {node_url}")
+        return jsonify({'success': False,
+                        'error': 'This booth cannot serve voters of that constituency'}), 421
+    return None
+
+
+def request_voter_id():
+    voter_id = request.args.get('voter_id')
+    if not voter_id and request.is_json:
+        voter_id = (request.get_json(silent=True) or {}).get('voter_id')
+    return str(voter_id or '').strip().upper()
+
+
+@app.route('/api/register', methods=['POST'])
+def register():
+    data = request.get_json(silent=True) or {}
+    voter_id = str(data.get('voter_id', '')).strip().upper()
+    constituency = str(data.get('constituency', '')).lower()
+    node_url = directory.node_for_constituency(constituency)
+    if node_url is None:
+        return jsonify({'success': False, 'error': 'Unknown constituency'}), 400
+    # The template was enrolled on the booth's sensor, which only its node can read
+    mismatch = booth_mismatch(request_booth_id(), node_url, constituency)
+    if mismatch:
+        return mismatch
+    if not voter_id:
+        return forward(node_url)
+    # Held for the whole registration so the same ID cannot reach two nodes
+    if not directory.reserve(voter_id, constituency):
+        return jsonify({'success': False, 'error': 'Voter already registered'}), 400
+    registered = False
+    try:
+        response = forward(node_url)
+        if getattr(response, 'status_code', None) == 200:
+            # Read the body here so the reservation is only kept once the node is done
+            body = response.get_data()
+            registered = bool(json.loads(body).get('success'))
+            response.set_data(body)
+    finally:
+        if not registered:
+            directory.release(voter_id)
+    return response
+
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Turnout summed over every node"""
+    totals = {'status': 'running', 'nodes': {}, 'fingerprint_connected': False,
+              'total_voters': 0, 'voted_count': 0, 'pending_count': 0}
+    for node_url in directory.nodes():
+        status, body = fetch_json(node_url + '/api/health')
+        totals['nodes'][node_url] = 'up' if status == 200 else 'down'
+        if status != 200:
+            totals['status'] = 'degraded'
+            continue
+        totals['fingerprint_connected'] |= bool(body.get('fingerprint_connected'))
+        for key in ('total_voters', 'voted_count', 'pending_count'):
+            totals[key] += body.get(key, 0)
+    return jsonify(totals)
+
+
+@app.route('/router/partitions', methods=['GET', 'POST'])
+def partitions():
+    """List partitions, or reassign one with {"constituency", "node_url"}"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if not data.get('constituency') or not data.get('node_url'):
+            return jsonify({'success': False, 'error': 'constituency and node_url required'}), 400
+        previous = directory.assign(data['constituency'], data['node_url'])
+        print(f"🔀 Partition {data['constituency']}: {previous} -> {data['node_url']}")
+    return jsonify({'success': True, 'partitions': directory.partitions()})
+
+
+def assign_booth(booth_id, node_url):
+    """Record the booth's node, warning if that node does not list the booth"""
+    previous = directory.assign_booth(booth_id, node_url)
+    print(f"🔀 Booth {booth_id}: {previous} -> {node_url}")
+    status, body = fetch_json(node_url.rstrip('/') + '/api/fingerprint/booths')
+    if status != 200:
+        print(f"⚠️ {node_url} answered {status}, booth {booth_id} not verified")
+    elif booth_id not in {b['booth_id'] for b in body.get('booths', [])}:
+        print(f"⚠️ Booth {booth_id} is not in the FINGERPRINT_PORTS of {node_url}")
+
+
+@app.route('/router/booths', methods=['GET', 'POST'])
+def booths():
+    """List booth nodes, or move one with {"booth_id", "node_url"}"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if not data.get('booth_id') or not data.get('node_url'):
+            return jsonify({'success': False, 'error': 'booth_id and node_url required'}), 400
+        assign_booth(data['booth_id'], data['node_url'])
+    return jsonify({'success': True, 'booths': directory.booths()})
+
+
+@app.route('/api/<path:path>', methods=['GET', 'POST'])
+def proxy(path):
+    if path.startswith('fingerprint/'):
+        # Enrollment, scans and events come from the booth's own scanner
+        node_url = booth_node(request_booth_id())
+        if node_url is None:
+            return jsonify({'success': False, 'error': 'Unknown booth'}), 404
+        return forward(node_url)
+    voter_id = request_voter_id()
+    if not voter_id:
+        # Exports and results of one constituency come from its node
+        constituency = request.args.get('constituency', '').lower()
+        if constituency and directory.node_for_constituency(constituency):
+            return forward(directory.node_for_constituency(constituency))
+        return forward(directory.default_node())
+    constituency = directory.constituency_of(voter_id)
+    if constituency is None:
+        if path == 'check_voter_id':
+            return jsonify({'exists': False})
+        if path == 'check_voted':
+            return jsonify({'has_voted': False})
+        return jsonify({'success': False, 'error': 'Voter ID not found'}), 404
+    node_url = directory.node_for_constituency(constituency)
+    if path == 'authenticate/dual':
+        # The node scans with its own ScannerPool
+        mismatch = booth_mismatch(request_booth_id(), node_url, constituency)
+        if mismatch:
+            return mismatch
+    return forward(node_url)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Constituency partition router')
+    parser.add_argument('--assign', nargs='+', metavar='CONSTITUENCY=URL',
+                        help='Assign partitions to nodes and exit')
+    parser.add_argument('--assign-booth', nargs='+', metavar='BOOTH=URL',
+                        help='Point booths at the node their scanner is attached to and exit')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Re-read voter IDs from every node and exit')
+    args = parser.parse_args()
+
+    if args.assign:
+        for entry in args.assign:
+            constituency, _, node_url = entry.partition('=')
+            previous = directory.assign(constituency, node_url)
+            print(f"🔀 Partition {constituency}: {previous} -> {node_url}")
+    if args.assign_booth:
+        for entry in args.assign_booth:
+            booth_id, _, node_url = entry.partition('=')
+            assign_booth(booth_id, node_url)
+    if args.rebuild:
+        print(f"✅ Directory rebuilt: {directory.rebuild()} voter(s)")
+    if not (args.assign or args.assign_booth or args.rebuild):
+        for constituency, partition in directory.partitions().items():
+            print(f"🗂️ {constituency}: {partition['node_url']} ({partition['voters']} voters)")
+        for booth_id, node_url in directory.booths().items():
+            print(f"👆 Booth {booth_id}: {node_url}")
+        app.run(debug=False, port=ROUTER_PORT, host='0.0.0.0', threaded=True)
@@ -0,0 +1,291 @@
+"""Batches voter registrations onto the Voting contract.
+
+register_voter enqueues every new voter here. A background thread drains the
+queue with registerVoters(bytes32[], uint256[]) transactions, several batches
+in flight with consecutive nonces, and marks voters confirmed once their batch
+is RELAYER_CONFIRMATIONS blocks deep. Transactions are sent with
+eth_sendTransaction, so RELAYER_FROM (the contract owner) must be unlocked on
+the node: a dev chain account, or an external signer such as Clef.
+
+    python registration_relayer.py --backfill   # queue every voter in the store
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from eth_rpc import (ExecutionReverted, RpcClient, RpcError, encode_word,
+                     function_selector, keccak256)
+from results_indexer import CONSTITUENCIES, ETH_RPC_URL, VOTING_CONTRACT_ADDRESS
+
+RELAYER_FROM = os.environ.get('RELAYER_FROM', '')
+RELAYER_DB = os.environ.get('RELAYER_DB', 'relayer.db')
+RELAYER_BATCH_SIZE = int(os.environ.get('RELAYER_BATCH_SIZE', '200'))
+RELAYER_MAX_IN_FLIGHT = int(os.environ.get('RELAYER_MAX_IN_FLIGHT', '4'))
+RELAYER_CONFIRMATIONS = int(os.environ.get('RELAYER_CONFIRMATIONS', '2'))
+RELAYER_TX_TIMEOUT = float(os.environ.get('RELAYER_TX_TIMEOUT', '60'))
+RELAYER_MAX_BATCH_GAS = int(os.environ.get('RELAYER_MAX_BATCH_GAS', '15000000'))
+RELAYER_POLL_INTERVAL = float(os.environ.get('RELAYER_POLL_INTERVAL', '2'))
+
+GAS_MARGIN = 1.2   # on top of eth_estimateGas
+GAS_BUMP = 1.125   # replacement transactions must pay at least 10% more
+
+REGISTER_VOTERS = function_selector('registerVoters(bytes32[],uint256[])')
+
+
+def voter_hash(voter_id):
+    """Same hash the voting frontend passes to vote(): keccak256(voter_id)"""
+    return keccak256(voter_id.encode('utf-8'))
+
+
+def encode_register_voters(hashes, constituencies):
+    """Calldata for registerVoters(bytes32[], uint256[])"""
+    n = len(hashes)
+    return (REGISTER_VOTERS
+            + encode_word(64) + encode_word(64 + 32 * (n + 1))
+            + encode_word(n) + b''.join(encode_word(h) for h in hashes)
+            + encode_word(n) + b''.join(encode_word(c) for c in constituencies))
+
+
+class Batch:
+    """One registerVoters transaction and its replacements"""
+
+    def __init__(self, voter_ids, constituencies, nonce, gas, gas_price):
+        self.voter_ids = voter_ids
+        self.constituencies = constituencies
+        self.nonce = nonce
+        self.gas = gas
+        self.gas_price = gas_price
+        self.tx_hashes = []
+        self.sent_at = None
+
+
+class RegistrationRelayer:
+    """Durable registration queue (SQLite) plus the batching sender"""
+
+    def __init__(self, rpc, contract, sender, path=RELAYER_DB, batch_size=RELAYER_BATCH_SIZE,
+                 max_in_flight=RELAYER_MAX_IN_FLIGHT, confirmations=RELAYER_CONFIRMATIONS):
+        self.rpc = rpc
+        self.contract = contract
+        self.sender = sender
+        self.batch_size = batch_size
+        self.batch_limit = batch_size  # shrinks while batches revert
+        self.max_in_flight = max_in_flight
+        self.confirmations = confirmations
+        self.in_flight = []
+        self.nonce = None
+        self.running = False
+        self.last_error = None
+        self.stats = {'transactions': 0, 'voters': 0, 'gas_used': 0}
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS registrations (
+                voter_id TEXT PRIMARY KEY,
+                constituency INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                tx_hash TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_registrations_status ON registrations(status);
+        ''')
+        # Batches in flight when we stopped are sent again, registerVoters is
+        # idempotent so one that did get mined only costs gas
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE registrations SET status = 'pending' WHERE status = 'submitted'")
+
+    # ---------- queue ----------
+
+    def enqueue(self, voter_id, constituency):
+        return self.enqueue_many([(voter_id, constituency)]) == 1
+
+    def enqueue_many(self, voters):
+        """Queue (voter_id, constituency name) pairs, already queued ones are ignored"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for voter_id, constituency in voters:
+            if constituency.lower() not in CONSTITUENCIES:
+                print(f"⚠️ {voter_id}: constituency {constituency} is not on the contract, skipped")
+                continue
+            rows.append((voter_id, CONSTITUENCIES.index(constituency.lower()), now))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO registrations (voter_id, constituency, updated_at) '
+                'VALUES (?, ?, ?)', rows)
+        return len(rows)
+
+    def _set_status(self, voter_ids, status, tx_hash=None, error=None, attempt=False):
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'UPDATE registrations SET status = ?, tx_hash = ?, error = ?, updated_at = ?, '
+                'attempts = attempts + ? WHERE voter_id = ?',
+                [(status, tx_hash, error, now, int(attempt), v) for v in voter_ids])
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT status, COUNT(*) FROM registrations GROUP BY status').fetchall()
+        counts = {'pending': 0, 'submitted': 0, 'confirmed': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def status(self):
+        return {'counts': self.counts(), 'in_flight': len(self.in_flight),
+                'batch_limit': self.batch_limit, 'nonce': self.nonce,
+                'error': self.last_error, **self.stats}
+
+    # ---------- sending ----------
+
+    def _revert(self, voter_ids, error):
+        """Halve the batch size to isolate the bad voter, a lone one is failed"""
+        if len(voter_ids) == 1:
+            print(f"❌ On-chain registration failed for {voter_ids[0]}: {error}")
+            self._set_status(voter_ids, 'failed', error=error, attempt=True)
+        else:
+            self.batch_limit = max(1, len(voter_ids) // 2)
+            self._set_status(voter_ids, 'pending', error=error, attempt=True)
+
+    def _send(self, batch):
+        tx = {'from': self.sender, 'to': self.contract, 'nonce': hex(batch.nonce),
+              'gas': hex(batch.gas), 'gasPrice': hex(batch.gas_price),
+              'data': '0x' + encode_register_voters(
+                  [voter_hash(v) for v in batch.voter_ids], batch.constituencies).hex()}
+        batch.tx_hashes.append(self.rpc.send_transaction(tx))
+        batch.sent_at = time.time()
+
+    def _submit_next(self):
+        """Send one batch of pending voters, returns False when nothing was sent"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT voter_id, constituency FROM registrations WHERE status = 'pending' "
+                "ORDER BY rowid LIMIT ?", (self.batch_limit,)).fetchall()
+        if not rows:
+            return False
+        voter_ids = [r[0] for r in rows]
+        constituencies = [r[1] for r in rows]
+        data = encode_register_voters([voter_hash(v) for v in voter_ids], constituencies)
+
+        try:
+            gas = self.rpc.estimate_gas({'from': self.sender, 'to': self.contract,
+                                         'data': '0x' + data.hex()})
+        except ExecutionReverted as e:
+            # A batch that would revert is caught here, before it costs a nonce
+            self._revert(voter_ids, str(e))
+            return True
+        gas = int(gas * GAS_MARGIN)
+        if gas > RELAYER_MAX_BATCH_GAS and len(voter_ids) > 1:
+            self.batch_limit = max(1, len(voter_ids) // 2)
+            return True
+
+        if self.nonce is None:
+            self.nonce = self.rpc.transaction_count(self.sender)
+        batch = Batch(voter_ids, constituencies, self.nonce, gas, self.rpc.gas_price())
+        try:
+            self._send(batch)
+        except RpcError as e:
+            if 'nonce' in str(e).lower():
+                self.nonce = None  # resync from the node on the next round
+            raise
+        self.nonce += 1
+        self.in_flight.append(batch)
+        self._set_status(voter_ids, 'submitted', tx_hash=batch.tx_hashes[-1])
+        return True
+
+    def _check_in_flight(self):
+        head = self.rpc.block_number()
+        for batch in list(self.in_flight):
+            receipt = None
+            for tx_hash in batch.tx_hashes:
+                receipt = self.rpc.receipt(tx_hash)
+                if receipt:
+                    break
+
+            if receipt is None:
+                if time.time() - batch.sent_at > RELAYER_TX_TIMEOUT:
+                    # Same nonce, higher price: replaces the stuck transaction
+                    batch.gas_price = int(batch.gas_price * GAS_BUMP)
+                    print(f"⏱️ Batch nonce {batch.nonce} not mined, resending at "
+                          f"{batch.gas_price} wei/gas")
+                    self._send(batch)
+                continue
+
+            if head - int(receipt['blockNumber'], 16) + 1 < self.confirmations:
+                continue
+            self.in_flight.remove(batch)
+            self.stats['transactions'] += 1
+            self.stats['gas_used'] += int(receipt['gasUsed'], 16)
+            if int(receipt.get('status', '0x1'), 16) == 1:
+                self._set_status(batch.voter_ids, 'confirmed', tx_hash=receipt['transactionHash'])
+                self.stats['voters'] += len(batch.voter_ids)
+                self.batch_limit = min(self.batch_size, self.batch_limit * 2)
+                print(f"⛓️ Registered {len(batch.voter_ids)} voter(s) on-chain "
+                      f"({receipt['transactionHash'][:10]}...)")
+            else:
+                self._revert(batch.voter_ids, 'Transaction reverted')
+
+    def poll_once(self):
+        """Confirm or retry batches in flight, then fill the pipeline"""
+        self._check_in_flight()
+        while len(self.in_flight) < self.max_in_flight and self._submit_next():
+            pass
+
+    def _run(self):
+        delay = RELAYER_POLL_INTERVAL
+        while self.running:
+            try:
+                self.poll_once()
+                self.last_error = None
+                delay = RELAYER_POLL_INTERVAL
+            except (RpcError, KeyError, ValueError) as e:
+                self.last_error = str(e)
+                print(f"❌ Registration relayer: {e}")
+                delay = min(delay * 2, 60)
+            time.sleep(delay)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._run, daemon=True, name='registration-relayer').start()
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.stop()
+        self.conn.close()
+
+
+def create_relayer():
+    """Relayer from ETH_RPC_URL / VOTING_CONTRACT_ADDRESS / RELAYER_FROM, None if unset"""
+    if not (ETH_RPC_URL and VOTING_CONTRACT_ADDRESS and RELAYER_FROM):
+        return None
+    return RegistrationRelayer(RpcClient(ETH_RPC_URL), VOTING_CONTRACT_ADDRESS, RELAYER_FROM)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from voter_store import open_store
+
+    parser = argparse.ArgumentParser(description='On-chain voter registration relayer')
+    parser.add_argument('--backfill', action='store_true', help='Queue every voter in the store')
+    parser.add_argument('--db', default=os.environ.get('VOTERS_DB', 'voters.db'))
+    parser.add_argument('--json', default='voters_db.json')
+    args = parser.parse_args()
+
+    relayer = create_relayer()
+    if relayer is None:
+        raise SystemExit('Set ETH_RPC_URL, VOTING_CONTRACT_ADDRESS and RELAYER_FROM')
+    if args.backfill:
+        store = open_store(json_path=args.json, db_path=args.db)
+        relayer.enqueue_many((v_id, v['constituency']) for v_id, v in store.iter_voters())
+        print(f"📥 Queued {relayer.counts()['pending']} voter(s)")
+    while relayer.counts()['pending'] or relayer.in_flight:
+        relayer.poll_once()
+        time.sleep(RELAYER_POLL_INTERVAL)
+    print(f"✅ {relayer.status()}")
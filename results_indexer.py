@@ -0,0 +1,245 @@
+"""Follows VoteCast events and keeps per-constituency tallies.
+
+Dashboards read the cached tallies from /api/results instead of calling
+getResultsFor for every refresh. Blocks deeper than RESULTS_CONFIRMATIONS are
+treated as final. Newer blocks are tracked by hash, so a reorg rolls the
+tallies back to the last block that is still canonical and rescans from there.
+
+    ETH_RPC_URL=http://127.0.0.1:8545 VOTING_CONTRACT_ADDRESS=0x... python voter_auth_api.py
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from eth_rpc import RpcClient, RpcError, decode_string, decode_words, event_topic
+
+ETH_RPC_URL = os.environ.get('ETH_RPC_URL', '')
+VOTING_CONTRACT_ADDRESS = os.environ.get('VOTING_CONTRACT_ADDRESS', '')
+RESULTS_CONFIRMATIONS = int(os.environ.get('RESULTS_CONFIRMATIONS', '12'))
+RESULTS_START_BLOCK = int(os.environ.get('RESULTS_START_BLOCK', '0'))
+RESULTS_POLL_INTERVAL = float(os.environ.get('RESULTS_POLL_INTERVAL', '3'))
+RESULTS_INDEX_FILE = os.environ.get('RESULTS_INDEX_FILE', 'results_index.json')
+
+# Constituency indexes as used by the contract and both frontends
+CONSTITUENCIES = ('jalna', 'aurangabad', 'beed', 'ahmednagar')
+
+VOTE_CAST_TOPIC = event_topic('VoteCast(bytes32,uint256,uint256,string)')
+LOG_RANGE = 2000  # blocks per eth_getLogs call
+
+
+def decode_vote_cast(log):
+    """(constituency, candidate_index, candidate_name) from a VoteCast log"""
+    raw, words = decode_words(log['data'])
+    return words[0], words[1], decode_string(raw, words[2])
+
+
+class ResultsIndexer:
+    """Incremental VoteCast indexer with durable, reorg-safe tallies"""
+
+    def __init__(self, rpc, address, path=RESULTS_INDEX_FILE,
+                 confirmations=RESULTS_CONFIRMATIONS, start_block=RESULTS_START_BLOCK):
+        self.rpc = rpc
+        self.address = address.lower()
+        self.path = path
+        self.confirmations = confirmations
+        self.lock = threading.Lock()
+        self.running = False
+        self.last_error = None
+        self.synced_at = None
+        self.dirty = False
+
+        # Final state: tallies up to confirmed_block, never rolled back
+        self.confirmed_block = start_block - 1
+        self.confirmed = {}  # (constituency, candidate) -> votes
+        self.names = {}      # (constituency, candidate) -> candidate name
+        # Unconfirmed state: votes per block and block hashes to detect reorgs
+        self.last_block = start_block - 1
+        self.pending = {}      # block number -> [(constituency, candidate)]
+        self.checkpoints = {}  # block number -> block hash
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+        if state.get('contract') != self.address:
+            print(f"⚠️ {self.path} belongs to another contract, reindexing")
+            return
+        self.confirmed_block = state['confirmed_block']
+        self.last_block = state['last_block']
+        for c, i, name, votes in state['confirmed']:
+            self.confirmed[(c, i)] = votes
+            self.names[(c, i)] = name
+        for number, votes in state['pending'].items():
+            self.pending[int(number)] = [tuple(v[:2]) for v in votes]
+            for c, i, name in votes:
+                self.names[(c, i)] = name
+        self.checkpoints = {int(n): h for n, h in state['checkpoints'].items()}
+        print(f"📂 Results index resumed at block {self.last_block}")
+
+    def _save(self):
+        state = {
+            'contract': self.address,
+            'confirmed_block': self.confirmed_block,
+            'last_block': self.last_block,
+            'confirmed': [[c, i, self.names[(c, i)], v] for (c, i), v in sorted(self.confirmed.items())],
+            'pending': {n: [[c, i, self.names[(c, i)]] for c, i in votes]
+                        for n, votes in self.pending.items()},
+            'checkpoints': self.checkpoints,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    # ---------- indexing ----------
+
+    def _rollback(self):
+        """Drop unconfirmed blocks back to the newest checkpoint still canonical"""
+        ancestor = self.confirmed_block
+        for number in sorted(self.checkpoints, reverse=True):
+            if self.rpc.block_hash(number) == self.checkpoints[number]:
+                ancestor = number
+                break
+        with self.lock:
+            dropped = [n for n in self.pending if n > ancestor]
+            for n in dropped:
+                del self.pending[n]
+            self.checkpoints = {n: h for n, h in self.checkpoints.items() if n <= ancestor}
+            self.last_block = ancestor
+            self.dirty = True
+        print(f"🔀 Reorg detected, rolled back to block {ancestor} "
+              f"({len(dropped)} block(s) with votes dropped)")
+
+    def _scan(self, from_block, to_block):
+        """Index one block range, returns False if the chain moved underneath"""
+        tip_hash = self.rpc.block_hash(to_block)
+        logs = self.rpc.get_logs(self.address, [VOTE_CAST_TOPIC], from_block, to_block)
+        if tip_hash is None or self.rpc.block_hash(to_block) != tip_hash:
+            return False
+
+        with self.lock:
+            for log in logs:
+                if log.get('removed'):
+                    continue
+                number = int(log['blockNumber'], 16)
+                c, i, name = decode_vote_cast(log)
+                self.names[(c, i)] = name
+                self.pending.setdefault(number, []).append((c, i))
+                self.checkpoints[number] = log['blockHash']
+            self.checkpoints[to_block] = tip_hash
+            self.last_block = to_block
+            self.dirty = True
+        return True
+
+    def _finalize(self, head):
+        """Fold blocks that reached the confirmation depth into the final tallies"""
+        final = head - self.confirmations
+        if final <= self.confirmed_block:
+            return
+        with self.lock:
+            for number in [n for n in self.pending if n <= final]:
+                for key in self.pending.pop(number):
+                    self.confirmed[key] = self.confirmed.get(key, 0) + 1
+            self.confirmed_block = min(final, self.last_block)
+            # Keep the checkpoint at the confirmed block as the rollback floor
+            self.checkpoints = {n: h for n, h in self.checkpoints.items()
+                                if n >= self.confirmed_block}
+            self.dirty = True
+
+    def poll_once(self):
+        """Catch up with the chain head, returns the number of blocks indexed"""
+        head = self.rpc.block_number()
+        if self.checkpoints:
+            tip = max(self.checkpoints)
+            if tip > head or self.rpc.block_hash(tip) != self.checkpoints[tip]:
+                self._rollback()
+
+        start = self.last_block + 1
+        while self.last_block < head:
+            to_block = min(self.last_block + LOG_RANGE, head)
+            if not self._scan(self.last_block + 1, to_block):
+                break
+        self._finalize(head)
+        if self.dirty:
+            self._save()
+            self.dirty = False
+        self.synced_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return self.last_block - start + 1
+
+    def _run(self):
+        delay = RESULTS_POLL_INTERVAL
+        while self.running:
+            try:
+                indexed = self.poll_once()
+                if indexed > 0:
+                    print(f"⛓️ Indexed up to block {self.last_block}")
+                self.last_error = None
+                delay = RESULTS_POLL_INTERVAL
+            except Exception as e:
+                # RPC failures, and log data decode_vote_cast cannot read
+                # (IndexError), must not end the thread: /api/results would keep
+                # serving stale tallies with no error
+                self.last_error = str(e) if isinstance(e, RpcError) else f'{type(e).__name__}: {e}'
+                print(f"❌ Results indexer: {self.last_error}")
+                delay = min(delay * 2, 60)
+            time.sleep(delay)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._run, daemon=True, name='results-indexer').start()
+
+    def stop(self):
+        self.running = False
+
+    # ---------- reads ----------
+
+    def results(self):
+        """Cached tallies per constituency, including unconfirmed votes"""
+        with self.lock:
+            confirmed = dict(self.confirmed)
+            current = dict(confirmed)
+            for votes in self.pending.values():
+                for key in votes:
+                    current[key] = current.get(key, 0) + 1
+            names = dict(self.names)
+            last_block, confirmed_block = self.last_block, self.confirmed_block
+
+        constituencies = {}
+        for (c, i), votes in sorted(current.items()):
+            label = CONSTITUENCIES[c] if c < len(CONSTITUENCIES) else str(c)
+            bucket = constituencies.setdefault(label, {'index': c, 'total': 0, 'candidates': []})
+            bucket['candidates'].append({'index': i, 'name': names[(c, i)], 'votes': votes,
+                                         'confirmed_votes': confirmed.get((c, i), 0)})
+            bucket['total'] += votes
+        return {
+            'contract': self.address,
+            'block': last_block,
+            'confirmed_block': confirmed_block,
+            'synced_at': self.synced_at,
+            'error': self.last_error,
+            'total_votes': sum(b['total'] for b in constituencies.values()),
+            'constituencies': constituencies,
+        }
+
+
+def create_indexer():
+    """Indexer from ETH_RPC_URL / VOTING_CONTRACT_ADDRESS, None if unset"""
+    if not (ETH_RPC_URL and VOTING_CONTRACT_ADDRESS):
+        return None
+    return ResultsIndexer(RpcClient(ETH_RPC_URL), VOTING_CONTRACT_ADDRESS, RESULTS_INDEX_FILE)
+
+
+if __name__ == '__main__':
+    indexer = create_indexer()
+    if indexer is None:
+        raise SystemExit('Set ETH_RPC_URL and VOTING_CONTRACT_ADDRESS')
+    indexer.poll_once()
+    print(json.dumps(indexer.results(), indent=2))
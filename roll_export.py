@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import os
+import zlib
+
+# Voters per export page unless ?limit= says otherwise (0 streams everything)
+EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', '10000'))
+
+VOTER_FIELDS = ('voter_id', 'name', 'constituency', 'fingerprint_id', 'fingerprint_booth',
+                'has_voted', 'registered_at', 'voted_at')
+TURNOUT_FIELDS = ('constituency', 'registered', 'voted', 'pending')
+
+# Output is handed to the server in chunks of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+def voter_row(voter_id, voter, include_encoding=False):
+    row = {'voter_id': voter_id}
+    row.update((field, voter.get(field)) for field in VOTER_FIELDS[1:])
+    row['has_voted'] = bool(row['has_voted'])
+    if include_encoding:
+        encoding = voter.get('face_encoding')
+        row['face_encoding'] = encoding.tolist() if encoding is not None else None
+    return row
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')).encode() + b'\n'
+
+
+def csv_lines(rows, fields):
+    """CSV header + one line per row dict, written through a single reused buffer"""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+def chunked(lines):
+    """Join small lines into CHUNK_BYTES pieces, memory stays at one chunk"""
+    pending, size = [], 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b''.join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzipped(chunks, level=6):
+    """Gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,100 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from metrics import Histogram
+
+# Requests slower than this are written to SLOW_REQUEST_LOG with their
+# stage breakdown (0 disables the log)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '0'))
+SLOW_REQUEST_LOG = os.environ.get('SLOW_REQUEST_LOG', 'slow_requests.log')
+
+REQUEST_SECONDS = Histogram('request_duration_seconds', 'End-to-end request latency',
+                            ('operation',))
+STAGE_SECONDS = Histogram('request_stage_duration_seconds', 'Latency of each request stage',
+                          ('operation', 'stage'))
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Trace:
+    """Stage timings of one request"""
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def record(self, stage_name, seconds):
+        self.stages.append((stage_name, seconds))
+        STAGE_SECONDS.observe(seconds, self.operation, stage_name)
+
+    def finish(self, status=None):
+        total = time.perf_counter() - self.started
+        REQUEST_SECONDS.observe(total, self.operation)
+        if SLOW_REQUEST_MS and total * 1000 >= SLOW_REQUEST_MS:
+            stages_ms = {}
+            for name, sec in self.stages:
+                stages_ms[name] = round(stages_ms.get(name, 0) + sec * 1000, 2)
+            entry = {
+                'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'operation': self.operation,
+                'status': status,
+                'total_ms': round(total * 1000, 2),
+                'stages_ms': stages_ms,
+            }
+            print(f"🐢 Slow {self.operation}: {entry['total_ms']} ms {entry['stages_ms']}")
+            with _log_lock, open(SLOW_REQUEST_LOG, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        return total
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def record(stage_name, seconds):
+    """Attach an already measured stage (e.g. timed in a worker) to the current request"""
+    trace = current_trace()
+    if trace is not None:
+        trace.record(stage_name, seconds)
+
+
+@contextmanager
+def stage(stage_name):
+    """Time a block as one stage of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage_name, time.perf_counter() - started)
+
+
+def traced(operation):
+    """Flask view decorator: collect stage timings for the whole request"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            trace = _local.trace = Trace(operation)
+            status = None
+            try:
+                response = view(*args, **kwargs)
+                if isinstance(response, tuple):
+                    status = response[1]
+                else:
+                    status = getattr(response, 'status_code', 200)
+                return response
+            finally:
+                trace.finish(status)
+                _local.trace = None
+        return wrapper
+    return decorator
+
+
+def render():
+    return REQUEST_SECONDS.render() + STAGE_SECONDS.render()
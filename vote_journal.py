@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+
+
+class VoteJournal:
+    """Append-only, fsync'd log of has_voted transitions.
+
+    Callers block in append() until their entry is on disk. A single flusher
+    thread writes every entry queued since the last fsync together, so
+    concurrent mark_voted calls share one fsync (group commit).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'ab')
+        self.cond = threading.Condition()
+        self.pending = []
+        self.flushing = False
+        self.entries = sum(1 for _ in self.replay(path))
+        self.running = True
+        threading.Thread(target=self._flush_loop, daemon=True, name='vote-journal').start()
+
+    @staticmethod
+    def replay(path):
+        """Yield journal entries, a torn last line from a crash is skipped"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def append(self, voter_id, voted_at):
+        """Durably record a voter as voted, returns once fsync'd"""
+        done = threading.Event()
+        entry = {'voter_id': voter_id, 'has_voted': True, 'voted_at': voted_at}
+        with self.cond:
+            self.pending.append((json.dumps(entry).encode() + b'\n', done))
+            self.cond.notify()
+        done.wait()
+        if getattr(done, 'error', None):
+            raise done.error
+
+    def _flush_loop(self):
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or not self.running)
+                if not self.pending:
+                    return
+                batch, self.pending = self.pending, []
+                self.flushing = True
+            error = None
+            try:
+                self.file.write(b''.join(line for line, _ in batch))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            except OSError as e:
+                print(f"❌ Vote journal write failed: {e}")
+                error = e
+            with self.cond:
+                self.entries += len(batch)
+                self.flushing = False
+                self.cond.notify_all()
+            for _, done in batch:
+                done.error = error
+                done.set()
+
+    def truncate(self):
+        """Drop all entries once a snapshot containing them is on disk"""
+        with self.cond:
+            self.cond.wait_for(lambda: not self.pending and not self.flushing)
+            self.file.truncate(0)
+            self.file.seek(0)
+            os.fsync(self.file.fileno())
+            self.entries = 0
+
+    def close(self):
+        with self.cond:
+            self.cond.wait_for(lambda: not self.pending and not self.flushing)
+            self.running = False
+            self.cond.notify_all()
+        self.file.close()
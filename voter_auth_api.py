@@ -1,111 +1,272 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+import functools
 import json
+import math
+import mimetypes
 import os
-import base64
-from io import BytesIO
-from PIL import Image
-import face_recognition
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 from datetime import datetime
-from fingerprint_service import FingerprintScanner
+from fingerprint_service import ScannerPool, configured_booth_ports
+from fingerprint_slots import BoothSlots, SlotReconciler
+from voter_store import assign_legacy_fingerprints, open_store
+from face_index import FaceIndex
+from face_pipeline import (FACE_IMAGES_DIR, decode_base64_payload, open_image, image_to_array,
+                           base64_to_image_array)
+from face_image_store import FaceImageStore
+from face_engine import FACE_WARMUP, FaceEncodingPool, PoolBusy, JobTimeout
+from metrics import TurnoutCounters, render_metric
+from auth_sessions import SessionTokens
+from capture_cache import MISS, CaptureCache, capture_key, payload_key
+from roll_export import (EXPORT_PAGE_SIZE, TURNOUT_FIELDS, VOTER_FIELDS,
+                         chunked, csv_lines, gzipped, ndjson_lines, voter_row)
+from admission import ADMISSION_LIMITS, AdmissionController, Shed, parse_limits
+from results_indexer import create_indexer
+from registration_relayer import create_relayer
+import tracing
+from tracing import stage, traced
 
 app = Flask(__name__)
 CORS(app)
 
 VOTERS_FILE = 'voters_db.json'
-FACE_IMAGES_DIR = 'voter_faces'
+VOTERS_DB = os.environ.get('VOTERS_DB', 'voters.db')
+FACE_INDEX_PATH = os.environ.get('FACE_INDEX_PATH', 'face_index')
+FACE_MATCH_THRESHOLD = 0.4
+# Frames accepted per authentication request (face_frames)
+FACE_MAX_FRAMES = int(os.environ.get('FACE_MAX_FRAMES', '5'))
 
-os.makedirs(FACE_IMAGES_DIR, exist_ok=True)
+# Face pool workers re-import this module as __mp_main__ when processes are
+# spawned (Windows). They only run face_engine jobs: no serial ports, store,
+# indexes or background threads are set up for them below.
+IN_POOL_WORKER = __name__ == '__mp_main__'
+
+# Enrollment photos, content-addressed and written off the request thread
+# (FACE_THUMB_SIZE / FACE_IMAGE_QUEUE, see face_image_store.py)
+face_images = FaceImageStore(FACE_IMAGES_DIR) if not IN_POOL_WORKER else None
+
+# ==================== FACE ENCODING POOL ====================
+# FACE_WORKERS / FACE_QUEUE_SIZE / FACE_JOB_TIMEOUT, see face_engine.py
+face_pool = FaceEncodingPool()
+# Encodings of recent uploads, a booth resending the same frame skips decode
+# and HOG (CAPTURE_CACHE_MB / CAPTURE_CACHE_TTL, see capture_cache.py)
+capture_cache = CaptureCache()
+
+def pool_error(e):
+    if isinstance(e, PoolBusy):
+        print("⚠️ Face encoding queue full")
+        return jsonify({'success': False, 'error': 'Server busy, please retry'}), 503
+    print(f"⏱️ {e}")
+    return jsonify({'success': False, 'error': 'Face processing timed out'}), 504
+
+def encode_face(image, key=None):
+    """Encode on the worker pool, returns (encoding, error_response)"""
+    encoding = capture_cache.get(key)
+    if encoding is not MISS:
+        return encoding, None
+    try:
+        encoding, _ = face_pool.encode(image)
+    except (PoolBusy, JobTimeout) as e:
+        return None, pool_error(e)
+    capture_cache.put(key, encoding)
+    return encoding, None
+
+def match_face(frames, reference):
+    """Best of the captured frames against ``reference``, returns (match, error_response).
+
+    Frames already seen within CAPTURE_CACHE_TTL are compared from the cache,
+    only the others are decoded and matched on the pool. ``match`` is None
+    when no frame shows a face.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    best, pending = None, []
+    for key, frame in frames:
+        encoding = capture_cache.get(key)
+        if encoding is MISS:
+            pending.append((key, frame))
+        elif encoding is not None:
+            distance = float(np.linalg.norm(reference - encoding))
+            if best is None or distance < best['distance']:
+                best = {'encoding': encoding, 'distance': distance, 'tried': 0}
+    if not pending or (best is not None and best['distance'] < FACE_MATCH_THRESHOLD):
+        return best, None
+    
+    with stage('decode'):
+        decoded = [(key, base64_to_image_array(frame)) for key, frame in pending]
+    decoded = [(key, image) for key, image in decoded if image is not None]
+    if not decoded:
+        if best is None:
+            return None, (jsonify({'success': False, 'error': 'Failed to process image'}), 400)
+        return best, None
+    try:
+        match, encoded = face_pool.match([image for _, image in decoded], reference,
+                                         FACE_MATCH_THRESHOLD)
+    except (PoolBusy, JobTimeout) as e:
+        return None, pool_error(e)
+    for index, encoding in encoded:
+        capture_cache.put(decoded[index][0], encoding)
+    if match is not None and (best is None or match['distance'] < best['distance']):
+        best = match
+    if best is not None:
+        best['tried'] = len(encoded)
+    return best, None
+
+def captured_frames(data):
+    """(capture_key, base64) of the face_frames (or single face_data) of an auth request"""
+    frames = data.get('face_frames') or [data.get('face_data', '')]
+    return [(capture_key(frame), frame) for frame in frames[:FACE_MAX_FRAMES] if frame]
+
+# ==================== ADMISSION CONTROL ====================
+# Register / face / dual auth wait for one of their endpoint's slots (one per
+# encoding worker by default, dual auth only holds it while matching the face,
+# not through the fingerprint scan), overflow is shed with 429/503 + Retry-After
+# instead of queueing until every request times out. ADMISSION_LIMITS /
+# ADMISSION_QUEUE_SIZE / ADMISSION_DEADLINE, see admission.py
+# Exports share the store with the auth path, at most two stream at once
+admission = AdmissionController(default_limit=max(face_pool.workers, 1),
+                                limits={'export': 2, **parse_limits(ADMISSION_LIMITS)})
+
+def shed_response(e):
+    print(f"🚦 {e}")
+    response = jsonify({'success': False, 'error': 'Server busy, please retry',
+                        'retry_after': e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, e.status
+
+@contextmanager
+def admission_slot(lane):
+    """Hold an admission slot for ``lane`` around a block, raises Shed"""
+    slot = admission.lane(lane)
+    tracing.record('admission_wait', slot.acquire(request_booth_id()))
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        slot.release(time.perf_counter() - started)
+
+def admitted(lane):
+    """View decorator: run the view inside an admission slot for ``lane``"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with admission_slot(lane):
+                    return view(*args, **kwargs)
+            except Shed as e:
+                return shed_response(e)
+        return wrapper
+    return decorator
 
 # ==================== FINGERPRINT SCANNER ====================
-fp_scanner = None
+# FINGERPRINT_PORTS='booth1=COM4,booth2=COM5', one R307 per polling booth
+FINGERPRINT_PORTS = configured_booth_ports()
+# Slot numbers are per sensor, voters stored without a booth enrolled on the first one
+DEFAULT_BOOTH = next(iter(FINGERPRINT_PORTS))
+scanner_pool = None
 
 def init_fingerprint():
-    """Initialize fingerprint scanner"""
-    global fp_scanner
+    """Start the scanner pool, ports are opened in the background"""
+    global scanner_pool
     try:
-        fp_scanner = FingerprintScanner('COM4')
-        if fp_scanner.is_connected():
-            return True
-        return False
+        scanner_pool = ScannerPool(FINGERPRINT_PORTS)
+        return True
     except Exception as e:
         print(f"❌ Fingerprint init error: {e}")
         return False
 
-print("\n" + "="*70)
-print("🚀 INITIALIZING FINGERPRINT SCANNER...")
-print("="*70)
-fp_connected = init_fingerprint()
-print(f"👆 Fingerprint Scanner: {'✅ Connected' if fp_connected else '❌ Not Connected'}")
-print("="*70 + "\n")
+def request_booth_id():
+    """Booth of the current request (?booth_id=, X-Booth-Id or JSON booth_id)"""
+    booth_id = request.args.get('booth_id') or request.headers.get('X-Booth-Id')
+    if not booth_id and request.is_json:
+        booth_id = (request.get_json(silent=True) or {}).get('booth_id')
+    return booth_id
 
-# ==================== DATABASE FUNCTIONS ====================
-def load_voters():
-    if os.path.exists(VOTERS_FILE):
-        try:
-            with open(VOTERS_FILE, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+def enrolled_booth(voter):
+    """Booth whose sensor holds the voter's fingerprint template"""
+    return voter.get('fingerprint_booth') or DEFAULT_BOOTH
 
-def save_voters(voters):
-    with open(VOTERS_FILE, 'w') as f:
-        json.dump(voters, f, indent=2)
+def fingerprint_owner(fingerprint_id, booth_id):
+    """Voter enrolled in ``fingerprint_id`` on ``booth_id``'s sensor, if any"""
+    owner_id = store.find_by_fingerprint(fingerprint_id, booth_id)
+    if not owner_id and booth_id == DEFAULT_BOOTH:
+        owner_id = store.find_by_fingerprint(fingerprint_id)
+    return owner_id
 
-def base64_to_image_file(base64_string, voter_id):
-    try:
-        if 'base64,' in base64_string:
-            base64_string = base64_string.split('base64,')[1]
-        
-        image_data = base64.b64decode(base64_string)
-        image = Image.open(BytesIO(image_data))
-        
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        image_path = os.path.join(FACE_IMAGES_DIR, f"{voter_id}.jpg")
-        image.save(image_path, 'JPEG', quality=95)
-        
-        print(f"✅ Saved image: {image_path}")
-        return image_path
-    except Exception as e:
-        print(f"❌ Error saving image: {e}")
+def get_scanner():
+    """Scanner for the requesting booth"""
+    if scanner_pool is None:
         return None
+    return scanner_pool.get(request_booth_id())
 
-def get_face_encodings(image_path):
-    """Extract face encodings from image"""
-    try:
-        print(f"🔍 Loading image: {image_path}")
-        image = face_recognition.load_image_file(image_path)
-        
-        face_locations = face_recognition.face_locations(image, model='hog')
-        
-        if not face_locations:
-            print("❌ No face detected")
-            return None, 0
-        
-        face_encodings = face_recognition.face_encodings(image, face_locations)
-        
-        print(f"✅ Found {len(face_encodings)} face(s)")
-        return face_encodings[0], len(face_encodings)
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return None, 0
+# Nothing here blocks: scanners connect in the background, models load on
+# first use unless FACE_WARMUP=1 loads them in the background right away.
+if not IN_POOL_WORKER:
+    init_fingerprint()
+    for booth_id, port in FINGERPRINT_PORTS.items():
+        print(f"👆 Booth {booth_id} ({port}): connecting in background")
+    if FACE_WARMUP:
+        threading.Thread(target=face_pool.warm_up, daemon=True, name='face-warmup').start()
+
+# ==================== DATABASE FUNCTIONS ====================
+# VOTER_STORE=sqlite (default) or json, see voter_store.py
+store = face_index = turnout = booth_slots = reconciler = None
+if not IN_POOL_WORKER:
+    store = open_store(json_path=VOTERS_FILE, db_path=VOTERS_DB)
+    assign_legacy_fingerprints(store, DEFAULT_BOOTH)
+
+    face_index = FaceIndex(FACE_INDEX_PATH)
+    if len(face_index) != store.count():
+        face_index.rebuild(
+            (v_id, v['face_encoding'])
+            for v_id, v in store.iter_voters(include_encoding=True)
+            if v.get('face_encoding') is not None
+        )
+
+    # Turnout counters for /api/health and /api/metrics, seeded from the store
+    turnout = TurnoutCounters(store)
+
+    # Sensor slots used by voters, per booth (FINGERPRINT_CAPACITY), compared
+    # with what each booth's sensor holds once it connects, see fingerprint_slots.py
+    booth_slots = BoothSlots.from_store(store, DEFAULT_BOOTH)
+    if scanner_pool:
+        reconciler = SlotReconciler(scanner_pool, booth_slots)
+        reconciler.start()
+
+# ==================== RESULTS INDEXER ====================
+# ETH_RPC_URL + VOTING_CONTRACT_ADDRESS enable it, see results_indexer.py
+results_indexer = create_indexer() if not IN_POOL_WORKER else None
+if results_indexer:
+    results_indexer.start()
+
+# New voters are queued for batched on-chain registration when RELAYER_FROM
+# is also set, see registration_relayer.py
+relayer = create_relayer() if not IN_POOL_WORKER else None
+if relayer:
+    relayer.start()
 
 # ==================== FINGERPRINT ENDPOINTS ====================
 
 @app.route('/api/fingerprint/status', methods=['GET'])
 def fingerprint_status():
     """Check fingerprint scanner status"""
+    fp_scanner = get_scanner()
     if fp_scanner and fp_scanner.is_connected():
         return jsonify({'connected': True, 'message': 'Scanner ready'})
     return jsonify({'connected': False, 'message': 'Scanner not connected'}), 503
 
+@app.route('/api/fingerprint/booths', methods=['GET'])
+def fingerprint_booths():
+    """Health of every configured booth scanner"""
+    return jsonify({'booths': scanner_pool.status() if scanner_pool else []})
+
 @app.route('/api/fingerprint/start_enroll', methods=['POST'])
 def start_fingerprint_enrollment():
     """Start fingerprint enrollment"""
+    fp_scanner = get_scanner()
     if not fp_scanner or not fp_scanner.is_connected():
         return jsonify({'success': False, 'error': 'Scanner not connected'})
     
@@ -115,6 +276,7 @@ def start_fingerprint_enrollment():
 @app.route('/api/fingerprint/enroll_status', methods=['GET'])
 def fingerprint_enroll_status():
     """Check enrollment progress"""
+    fp_scanner = get_scanner()
     if not fp_scanner or not fp_scanner.is_connected():
         return jsonify({'success': False, 'error': 'Scanner not connected'})
     
@@ -124,6 +286,7 @@ def fingerprint_enroll_status():
 @app.route('/api/fingerprint/cancel_enroll', methods=['POST'])
 def cancel_fingerprint_enrollment():
     """Cancel ongoing enrollment"""
+    fp_scanner = get_scanner()
     if not fp_scanner:
         return jsonify({'success': False, 'error': 'Scanner not available'})
     
@@ -131,17 +294,86 @@ def cancel_fingerprint_enrollment():
     return jsonify(result)
 
 @app.route('/api/fingerprint/scan', methods=['GET'])
+@traced('fingerprint_scan')
 def get_fingerprint_scan():
     """Scan existing fingerprint for authentication"""
+    fp_scanner = get_scanner()
     if not fp_scanner or not fp_scanner.is_connected():
         return jsonify({'scanned': False, 'error': 'Scanner not connected'}), 503
     
     scan_result = fp_scanner.scan_fingerprint()
     return jsonify(scan_result)
 
+# Longest ?wait= a long-poll for fingerprint events may hold a request thread
+EVENTS_MAX_WAIT = 60
+
+@app.route('/api/fingerprint/events', methods=['GET'])
+def fingerprint_events():
+    """Enrollment steps and scan results as they arrive from the device.
+
+    Server-Sent Events when the client accepts text/event-stream, otherwise a
+    long-poll returning everything after ?cursor= (waits up to ?wait= s, 0..60).
+    A cursor from before a restart, or older than the backlog, gets a 'reset'
+    event (reason 'restarted' or 'overflow') before the events that are left.
+    """
+    fp_scanner = get_scanner()
+    if not fp_scanner:
+        return jsonify({'success': False, 'error': 'Scanner not available'}), 503
+    
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    cursor = int(cursor) if cursor and cursor.isdigit() else fp_scanner.event_seq
+    cursor, reset = fp_scanner.resume_cursor(cursor)
+    
+    if 'text/event-stream' not in request.headers.get('Accept', ''):
+        try:
+            wait = float(request.args.get('wait', 25))
+        except ValueError:
+            wait = float('nan')
+        if not math.isfinite(wait):
+            return jsonify({'success': False, 'error': 'wait must be a number of seconds'}), 400
+        wait = max(0.0, min(wait, EVENTS_MAX_WAIT))
+        events = fp_scanner.events_since(cursor, timeout=0 if reset else wait)
+        return jsonify({
+            'success': True,
+            'events': events,
+            'cursor': events[-1]['id'] if events else cursor,
+            'reset': reset
+        })
+    
+    def stream(cursor):
+        yield 'retry: 1000\n\n'
+        if reset:
+            # The id moves the client's Last-Event-ID onto this process's sequence
+            yield f"id: {cursor}\nevent: reset\ndata: {json.dumps({'reason': reset, 'cursor': cursor})}\n\n"
+        while True:
+            events = fp_scanner.events_since(cursor, timeout=15)
+            if not events:
+                yield ': keepalive\n\n'
+            for event in events:
+                cursor = event['id']
+                yield f"id: {cursor}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(stream(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/fingerprint/reconcile', methods=['GET', 'POST'])
+def reconcile_fingerprints():
+    """Last sensor vs database reports, POST re-checks ?booth_id= (default: every booth)"""
+    if reconciler is None:
+        return jsonify({'success': False, 'error': 'Scanner not available'}), 503
+    if request.method == 'POST':
+        booth_id = request.args.get('booth_id')
+        if booth_id and booth_id not in FINGERPRINT_PORTS:
+            return jsonify({'success': False, 'error': 'Unknown booth'}), 404
+        reports = [reconciler.reconcile(booth_id)] if booth_id else reconciler.reconcile_all()
+    else:
+        reports = reconciler.status()
+    return jsonify({'success': True, 'db_slots': len(booth_slots), 'booths': reports})
+
 @app.route('/api/fingerprint/clear', methods=['POST'])
 def clear_fingerprint():
     """Clear the stored fingerprint scan"""
+    fp_scanner = get_scanner()
     if fp_scanner:
         fp_scanner.clear_last_scan()
     return jsonify({'success': True})
@@ -149,10 +381,11 @@ def clear_fingerprint():
 # ==================== REGISTRATION ====================
 
 @app.route('/api/register', methods=['POST'])
+@traced('register')
+@admitted('register')
 def register_voter():
     try:
         data = request.json
-        voters = load_voters()
         
         voter_id = str(data.get('voter_id', '')).strip().upper()
         name = data.get('name', '')
@@ -163,7 +396,14 @@ def register_voter():
         if not all([voter_id, name, constituency, face_data, fingerprint_template]):
             return jsonify({'success': False, 'error': 'All fields required'}), 400
         
-        if voter_id in voters:
+        # A partitioned node only holds its own constituencies, the router
+        # (partition_router.py) sends registrations to the owning node
+        if not store.owns(constituency.lower()):
+            return jsonify({'success': False, 'error': 'Constituency not served by this node'}), 421
+        
+        with stage('db_lookup'):
+            already_registered = store.exists(voter_id)
+        if already_registered:
             return jsonify({'success': False, 'error': 'Voter already registered'}), 400
         
         # Extract fingerprint ID from template
@@ -171,39 +411,77 @@ def register_voter():
             fingerprint_id = fingerprint_template.split('_')[2]
         except IndexError:
             return jsonify({'success': False, 'error': 'Invalid fingerprint template format'}), 400
+        
+        # The slot is only meaningful on the sensor of the booth that enrolled it
+        fingerprint_booth = request_booth_id() or DEFAULT_BOOTH
+        if fingerprint_booth not in FINGERPRINT_PORTS:
+            return jsonify({'success': False, 'error': 'Unknown booth'}), 400
 
-        # Check if fingerprint ID already used
-        for v_id, v_data in voters.items():
-            if v_data.get('fingerprint_id') == fingerprint_id:
-                print(f"⚠️ Fingerprint ID {fingerprint_id} already registered to {v_id}")
-                return jsonify({'success': False, 'error': 'Fingerprint already registered'}), 400
+        # Check if fingerprint ID already used, a slot clear in the bitmap needs no lookup
+        owner_id = None
+        if booth_slots.contains(fingerprint_booth, fingerprint_id):
+            with stage('db_lookup'):
+                owner_id = fingerprint_owner(fingerprint_id, fingerprint_booth)
+        if owner_id:
+            print(f"⚠️ Fingerprint ID {fingerprint_id} on booth {fingerprint_booth} already registered to {owner_id}")
+            return jsonify({'success': False, 'error': 'Fingerprint already registered'}), 400
         
         print(f"📸 Registering: {voter_id} with Fingerprint ID: {fingerprint_id}")
         
-        # Save face image
-        image_path = base64_to_image_file(face_data, voter_id)
-        if not image_path:
-            return jsonify({'success': False, 'error': 'Failed to save image'}), 400
+        # Decode the upload, the photo itself is only written once the voter is stored
+        try:
+            with stage('decode'):
+                payload = decode_base64_payload(face_data)
+                image = open_image(payload)
+        except Exception as e:
+            print(f"❌ Error decoding image: {e}")
+            return jsonify({'success': False, 'error': 'Failed to process image'}), 400
+        image_path = face_images.path_for(payload, image.format)
         
-        # Get face encoding
-        encoding, count = get_face_encodings(image_path)
+        with stage('downscale'):
+            image_array = image_to_array(image)
+        encoding, error = encode_face(image_array, payload_key(payload))
+        if error:
+            return error
         if encoding is None:
-            os.remove(image_path)
             return jsonify({'success': False, 'error': 'No face detected'}), 400
         
+        # Check if the same face is enrolled under another voter ID
+        with stage('dedup_search'):
+            matches = face_index.nearest(encoding, k=3)
+        duplicates = [
+            {'voter_id': v_id, 'distance': round(dist, 3)}
+            for v_id, dist in matches if dist < FACE_MATCH_THRESHOLD
+        ]
+        if duplicates:
+            print(f"⚠️ Face already registered to {duplicates[0]['voter_id']} (distance={duplicates[0]['distance']})")
+            return jsonify({'success': False, 'error': 'Face already registered', 'matches': duplicates}), 400
+        
         # Store voter with fingerprint ID
-        voters[voter_id] = {
+        record = {
             'name': name,
             'constituency': constituency.lower(),
             'image_path': image_path,
             'face_encoding': encoding.tolist(),
             'fingerprint_id': fingerprint_id,
+            'fingerprint_booth': fingerprint_booth,
             'has_voted': False,
             'registered_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        save_voters(voters)
-        print(f"✅ Registered: {voter_id} ({name}) - FP ID: {fingerprint_id}")
+        with stage('db_write'):
+            added = store.add(voter_id, record)
+        if not added:
+            return jsonify({'success': False, 'error': 'Voter or fingerprint already registered'}), 400
+        with stage('save_image'):
+            face_images.save(image_path, payload)
+        with stage('index_write'):
+            face_index.add(voter_id, encoding)
+        booth_slots.add(fingerprint_booth, fingerprint_id)
+        turnout.on_register(record['constituency'])
+        if relayer:
+            relayer.enqueue(voter_id, record['constituency'])
+        print(f"✅ Registered: {voter_id} ({name}) - FP ID: {fingerprint_id} (booth {fingerprint_booth})")
         
         return jsonify({'success': True, 'message': 'Registration successful'})
     
@@ -216,48 +494,44 @@ def register_voter():
 # ==================== FACE AUTHENTICATION ====================
 
 @app.route('/api/authenticate/face', methods=['POST'])
+@traced('authenticate_face')
+@admitted('authenticate_face')
 def authenticate_face():
     try:
         data = request.json
-        voters = load_voters()
         
         voter_id = str(data.get('voter_id', '')).strip().upper()
-        captured_face = data.get('face_data', '')
+        captured_face = data.get('face_frames') or data.get('face_data', '')
         
         if not voter_id or not captured_face:
             return jsonify({'success': False, 'error': 'Voter ID and face required'}), 400
         
-        if voter_id not in voters:
+        with stage('db_load'):
+            voter = store.get(voter_id)
+        if not voter:
             return jsonify({'success': False, 'error': 'Voter ID not found'}), 404
         
-        voter = voters[voter_id]
-        
         if voter.get('has_voted', False):
             return jsonify({'success': False, 'error': 'You have already voted!'}), 403
         
         print(f"🔍 Face auth: {voter_id}")
         
-        temp_path = base64_to_image_file(captured_face, 'temp_auth')
-        if not temp_path:
-            return jsonify({'success': False, 'error': 'Failed to process image'}), 400
-        
-        captured_encoding, _ = get_face_encodings(temp_path)
-        if captured_encoding is None:
-            os.remove(temp_path)
+        # Frames are tried best-ranked first, stopping at the first match
+        match, error = match_face(captured_frames(data), voter.get('face_encoding'))
+        if error:
+            return error
+        if match is None:
             return jsonify({'success': False, 'error': 'No face detected'}), 400
         
-        stored_enc = np.array(voter.get('face_encoding', []))
-        distance = face_recognition.face_distance([stored_enc], captured_encoding)[0]
+        distance = match['distance']
         confidence = max(0, min(100, (1 - distance) * 100))
         
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
-        if distance < 0.4:
+        if distance < FACE_MATCH_THRESHOLD:
             print(f"✅ Face auth SUCCESS: {voter_id} (distance={distance:.3f}, confidence={confidence:.2f}%)")
             return jsonify({
                 'success': True,
                 'confidence': round(confidence, 2),
+                'frames_tried': match['tried'],
                 'voter': {
                     'name': voter['name'],
                     'voter_id': voter_id,
@@ -266,7 +540,7 @@ def authenticate_face():
                 }
             }), 200
         else:
-            print(f"❌ Face MISMATCH: {voter_id} (distance={distance:.3f})")
+            print(f"❌ Face MISMATCH: {voter_id} (best distance={distance:.3f} over {match['tried']} frame(s))")
             return jsonify({'success': False, 'error': 'Face verification failed'}), 403
     
     except Exception as e:
@@ -283,6 +557,7 @@ def authenticate_voter():
 # ==================== FINGERPRINT AUTHENTICATION ====================
 
 @app.route('/api/authenticate/fingerprint', methods=['POST'])
+@traced('authenticate_fingerprint')
 def authenticate_fingerprint():
     """Authenticate by comparing fingerprint IDs - ✅ FIXED: Reject NO_MATCH"""
     try:
@@ -305,8 +580,8 @@ def authenticate_fingerprint():
             print(f"❌ Invalid fingerprint template format: {fingerprint_template}")
             return jsonify({'success': False, 'error': 'Invalid fingerprint format'}), 400
         
-        voters = load_voters()
-        voter = voters.get(voter_id)
+        with stage('db_load'):
+            voter = store.get(voter_id, include_encoding=False)
         
         if not voter:
             return jsonify({'success': False, 'error': 'Voter ID not found'}), 404
@@ -318,6 +593,13 @@ def authenticate_fingerprint():
         if not fp_id_from_db:
             return jsonify({'success': False, 'error': 'No fingerprint enrolled for this voter'}), 400
         
+        # Another booth's sensor numbers its slots independently, a match there means nothing
+        scan_booth = request_booth_id() or DEFAULT_BOOTH
+        if scan_booth != enrolled_booth(voter):
+            print(f"❌ FP booth mismatch: {voter_id} enrolled on {enrolled_booth(voter)}, scanned on {scan_booth}")
+            return jsonify({'success': False, 'error': 'Fingerprint enrolled at another booth',
+                            'enrolled_booth': enrolled_booth(voter)}), 403
+        
         print(f"🔍 FP AUTH: Voter={voter_id}, DB_Slot={fp_id_from_db}, Scanned_Slot={fp_id_from_scan}")
         
         # Compare fingerprint slot IDs
@@ -342,19 +624,118 @@ def authenticate_fingerprint():
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ==================== DUAL-FACTOR AUTHENTICATION ====================
+# One booth round trip: the sensor scan runs while the face is encoded, both
+# are checked against a single voter lookup and a session token is issued
+# that mark_voted requires (VOTE_SESSION_TTL, see auth_sessions.py)
+sessions = SessionTokens()
+scan_executor = ThreadPoolExecutor(max_workers=max(len(FINGERPRINT_PORTS) * 2, 2),
+                                   thread_name_prefix='dual-scan')
+
+def _timed_scan(fp_scanner):
+    started = time.perf_counter()
+    result = fp_scanner.scan_fingerprint()
+    return result, time.perf_counter() - started
+
+@app.route('/api/authenticate/dual', methods=['POST'])
+@traced('authenticate_dual')
+def authenticate_dual():
+    """Face + fingerprint in parallel, returns a session token for mark_voted"""
+    try:
+        data = request.json
+        voter_id = str(data.get('voter_id', '')).strip().upper()
+        captured_face = data.get('face_frames') or data.get('face_data', '')
+        
+        if not voter_id or not captured_face:
+            return jsonify({'success': False, 'error': 'Voter ID and face required'}), 400
+        
+        fp_scanner = get_scanner()
+        if not fp_scanner or not fp_scanner.is_connected():
+            return jsonify({'success': False, 'error': 'Scanner not connected'}), 503
+        
+        with stage('db_load'):
+            voter = store.get(voter_id)
+        if not voter:
+            return jsonify({'success': False, 'error': 'Voter ID not found'}), 404
+        if voter.get('has_voted', False):
+            return jsonify({'success': False, 'error': 'You have already voted!'}), 403
+        if not voter.get('fingerprint_id'):
+            return jsonify({'success': False, 'error': 'No fingerprint enrolled for this voter'}), 400
+        if (request_booth_id() or DEFAULT_BOOTH) != enrolled_booth(voter):
+            return jsonify({'success': False, 'error': 'Fingerprint enrolled at another booth',
+                            'enrolled_booth': enrolled_booth(voter)}), 403
+        
+        print(f"🔍 Dual auth: {voter_id}")
+        # The voter places their finger while the frames are decoded and matched;
+        # the admission slot is only held for the face match, the scan wait
+        # below takes no encoding capacity
+        try:
+            with admission_slot('authenticate_dual'):
+                scan_future = scan_executor.submit(_timed_scan, fp_scanner)
+                match, error = match_face(captured_frames(data), voter['face_encoding'])
+        except Shed as e:
+            return shed_response(e)
+        
+        with stage('scan_wait'):
+            scan_result, scan_seconds = scan_future.result()
+        tracing.record('fingerprint_scan', scan_seconds)
+        fp_scanner.clear_last_scan()
+        if error:
+            return error
+        
+        face = {'matched': False}
+        if match is None:
+            face['error'] = 'No face detected'
+        else:
+            face['matched'] = match['distance'] < FACE_MATCH_THRESHOLD
+            face['confidence'] = round(max(0, min(100, (1 - match['distance']) * 100)), 2)
+            face['frames_tried'] = match['tried']
+        
+        fingerprint = {'matched': False}
+        if scan_result.get('fingerprint_id'):
+            fingerprint['matched'] = str(scan_result['fingerprint_id']) == str(voter['fingerprint_id'])
+        else:
+            fingerprint['error'] = scan_result.get('error') or scan_result.get('message') or 'No match'
+        
+        factors = {'face': face, 'fingerprint': fingerprint}
+        if not (face['matched'] and fingerprint['matched']):
+            failed = ' and '.join(name for name, f in factors.items() if not f['matched'])
+            print(f"❌ Dual auth FAILED: {voter_id} ({failed})")
+            return jsonify({'success': False, 'error': f'Verification failed: {failed}',
+                            'factors': factors}), 403
+        
+        print(f"✅ Dual auth SUCCESS: {voter_id} (confidence={face['confidence']}%)")
+        return jsonify({
+            'success': True,
+            'session_token': sessions.issue(voter_id),
+            'expires_in': int(sessions.ttl),
+            'factors': factors,
+            'voter': {
+                'name': voter['name'],
+                'voter_id': voter_id,
+                'constituency': voter['constituency'],
+                'has_voted': False
+            }
+        }), 200
+    
+    except Exception as e:
+        print(f"❌ Dual auth error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ==================== OTHER ENDPOINTS ====================
 
 @app.route('/api/check_voter_id', methods=['POST'])
 def check_voter_id():
     try:
         data = request.json
-        voters = load_voters()
         voter_id = str(data.get('voter_id', '')).strip().upper()
         
         if not voter_id:
             return jsonify({'exists': False, 'error': 'Voter ID required'}), 400
         
-        voter = voters.get(voter_id)
+        voter = store.get(voter_id, include_encoding=False)
         if voter:
             return jsonify({
                 'exists': True,
@@ -371,53 +752,236 @@ def check_voter_id():
 def check_voted():
     try:
         data = request.json
-        voters = load_voters()
         voter_id = str(data.get('voter_id', '')).strip().upper()
         
-        if voter_id in voters:
-            return jsonify({'has_voted': voters[voter_id].get('has_voted', False)})
+        voter = store.get(voter_id, include_encoding=False)
+        if voter:
+            return jsonify({'has_voted': voter.get('has_voted', False)})
         return jsonify({'has_voted': False})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/voter_photo', methods=['GET'])
+def voter_photo():
+    """Enrollment photo of ?voter_id=, ?size=thumb for the admin views"""
+    voter_id = request.args.get('voter_id', '').strip().upper()
+    voter = store.get(voter_id, include_encoding=False) if voter_id else None
+    if not voter:
+        return jsonify({'success': False, 'error': 'Voter not found'}), 404
+    thumbnail = request.args.get('size') == 'thumb'
+    try:
+        photo = face_images.read(voter.get('image_path'), thumbnail=thumbnail)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading photo of {voter_id}: {e}")
+        photo = None
+    if photo is None:
+        return jsonify({'success': False, 'error': 'Photo not found'}), 404
+    mimetype = 'image/jpeg' if thumbnail else (
+        mimetypes.guess_type(voter['image_path'])[0] or 'application/octet-stream')
+    response = Response(photo, mimetype=mimetype)
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    return response
+
 @app.route('/api/mark_voted', methods=['POST'])
 def mark_voted():
     try:
         data = request.json
-        voters = load_voters()
-        voter_id = str(data.get('voter_id', '')).strip().upper()
+        token = data.get('session_token')
+        session_voter = sessions.owner(token)
+        if session_voter is None:
+            return jsonify({'success': False, 'error': 'Valid session token required'}), 401
+        voter_id = str(data.get('voter_id') or session_voter).strip().upper()
+        # Checked before the token is used up, a mismatched request leaves it valid
+        if voter_id != session_voter:
+            return jsonify({'success': False, 'error': 'Session token belongs to another voter'}), 403
+        if not sessions.redeem(token, voter_id):
+            # Used by a concurrent request, or expired since
+            return jsonify({'success': False, 'error': 'Valid session token required'}), 401
+        
+        voter = store.get(voter_id, include_encoding=False)
+        if not voter:
+            return jsonify({'success': False, 'error': 'Voter not found'}), 404
         
-        if voter_id in voters:
-            voters[voter_id]['has_voted'] = True
-            voters[voter_id]['voted_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            save_voters(voters)
+        if store.mark_voted(voter_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S')):
+            turnout.on_vote(voter['constituency'])
             print(f"✅ Marked voted: {voter_id}")
-            return jsonify({'success': True})
-        
-        return jsonify({'success': False, 'error': 'Voter not found'}), 404
+        return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    voters = load_voters()
-    return jsonify({
+    """Cheap liveness + turnout, served from in-memory counters"""
+    total, voted = turnout.totals()
+    response = {
         'status': 'running',
-        'fingerprint_connected': fp_scanner.is_connected() if fp_scanner else False,
-        'total_voters': len(voters),
-        'voted_count': sum(1 for v in voters.values() if v.get('has_voted')),
-        'pending_count': sum(1 for v in voters.values() if not v.get('has_voted'))
+        'fingerprint_connected': scanner_pool.any_connected() if scanner_pool else False,
+        'total_voters': total,
+        'voted_count': voted,
+        'pending_count': total - voted
+    }
+    if request.args.get('detail'):
+        response['constituencies'] = turnout.snapshot()
+    return jsonify(response)
+
+@app.route('/api/results', methods=['GET'])
+def results():
+    """Cached on-chain tallies, ?constituency=jalna for a single one"""
+    if results_indexer is None:
+        return jsonify({'success': False, 'error': 'Results indexer not configured'}), 503
+    response = results_indexer.results()
+    constituency = request.args.get('constituency', '').lower()
+    if constituency:
+        response['constituencies'] = {
+            constituency: response['constituencies'].get(
+                constituency, {'total': 0, 'candidates': []})
+        }
+    response['success'] = True
+    return jsonify(response)
+
+# ==================== EXPORTS ====================
+
+def export_response(lines, fmt, filename):
+    """Stream ``lines`` back, gzipped when the client accepts it"""
+    chunks = chunked(lines)
+    headers = {'Content-Disposition': f'attachment; filename="{filename}.{fmt}"',
+               'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        chunks = gzipped(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(chunks, mimetype=mimetype, headers=headers)
+
+def export_format():
+    fmt = request.args.get('format', 'ndjson').lower()
+    return fmt if fmt in ('ndjson', 'csv') else None
+
+@app.route('/api/export/voters', methods=['GET'])
+def export_voters():
+    """One page of the voter roll as NDJSON (default) or CSV, streamed.
+
+    ?constituency=, ?has_voted=true|false, ?limit= (default EXPORT_PAGE_SIZE,
+    0 for the whole roll) and ?cursor=<last voter_id of the previous page>; a
+    page shorter than the limit is the last one. Encodings only with
+    ?include_encoding=1 (NDJSON).
+    """
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({'success': False, 'error': 'format must be ndjson or csv'}), 400
+    include_encoding = request.args.get('include_encoding') in ('1', 'true')
+    if include_encoding and fmt == 'csv':
+        return jsonify({'success': False, 'error': 'Encodings are only exported as NDJSON'}), 400
+    has_voted = request.args.get('has_voted', '').lower()
+    if has_voted not in ('', 'true', 'false', '1', '0'):
+        return jsonify({'success': False, 'error': 'has_voted must be true or false'}), 400
+    try:
+        limit = int(request.args.get('limit', EXPORT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be a number'}), 400
+    
+    slot = admission.lane('export')
+    try:
+        slot.acquire(request_booth_id())
+    except Shed as e:
+        return shed_response(e)
+    started = time.perf_counter()
+    
+    rows = (
+        voter_row(v_id, v, include_encoding)
+        for v_id, v in store.iter_voters(
+            constituency=request.args.get('constituency', '').lower() or None,
+            include_encoding=include_encoding,
+            after=request.args.get('cursor', '').strip().upper() or None,
+            has_voted=has_voted in ('true', '1') if has_voted else None,
+            limit=limit if limit > 0 else None)
+    )
+    lines = csv_lines(rows, VOTER_FIELDS) if fmt == 'csv' else ndjson_lines(rows)
+    response = export_response(lines, fmt, 'voters')
+    # The slot is held until the last byte is sent
+    response.call_on_close(lambda: slot.release(time.perf_counter() - started))
+    return response
+
+@app.route('/api/export/turnout', methods=['GET'])
+def export_turnout():
+    """Registered / voted per constituency as NDJSON (default) or CSV"""
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({'success': False, 'error': 'format must be ndjson or csv'}), 400
+    rows = [
+        {'constituency': c, 'registered': v['registered'], 'voted': v['voted'],
+         'pending': v['registered'] - v['voted']}
+        for c, v in sorted(turnout.snapshot().items())
+    ]
+    lines = csv_lines(rows, TURNOUT_FIELDS) if fmt == 'csv' else ndjson_lines(rows)
+    return export_response(lines, fmt, 'turnout')
+
+@app.route('/api/partitions', methods=['GET'])
+def partitions():
+    """Constituencies held by this node and their voter counts"""
+    return jsonify({
+        'success': True,
+        'partitioned': hasattr(store, 'partitions'),
+        'partitions': {c: v['registered'] for c, v in sorted(store.turnout().items())}
     })
 
+@app.route('/api/partitions/<constituency>/voter_ids', methods=['GET'])
+def partition_voter_ids(constituency):
+    """Voter IDs of one partition, the router rebuilds its directory from this"""
+    constituency = constituency.lower()
+    if not store.owns(constituency):
+        return jsonify({'success': False, 'error': 'Constituency not served by this node'}), 421
+    return jsonify({
+        'success': True,
+        'constituency': constituency,
+        'voter_ids': [v_id for v_id, _ in store.iter_voters(constituency=constituency)]
+    })
+
+@app.route('/api/relayer/status', methods=['GET'])
+def relayer_status():
+    """On-chain registration queue and batch pipeline"""
+    if relayer is None:
+        return jsonify({'success': False, 'error': 'Relayer not configured'}), 503
+    return jsonify({'success': True, **relayer.status()})
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition"""
+    booths = scanner_pool.status() if scanner_pool else []
+    body = (
+        turnout.render()
+        + render_metric('fingerprint_scanner_up', 'gauge', 'Scanner connected (1) or not (0)',
+                        [({'booth_id': b['booth_id']}, int(b['connected'])) for b in booths])
+        + admission.render()
+        + capture_cache.render()
+        + face_images.render()
+        + (reconciler.render() if reconciler else '')
+        + render_metric('face_encoding_jobs_in_flight', 'gauge',
+                        'Face encoding jobs accepted and not finished',
+                        [({}, face_pool.pending())])
+        + (render_metric('results_indexer_block', 'gauge',
+                         'Last block indexed for VoteCast events',
+                         [({'state': 'indexed'}, results_indexer.last_block),
+                          ({'state': 'confirmed'}, results_indexer.confirmed_block)])
+           if results_indexer else '')
+        + (render_metric('relayer_registrations', 'gauge',
+                         'Voters in the on-chain registration queue by status',
+                         [({'status': k}, v) for k, v in relayer.counts().items()])
+           if relayer else '')
+        + tracing.render()
+    )
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     print("\n" + "="*70)
     print("🚀 BLOCKCHAIN VOTING API SERVER")
     print("="*70)
-    print("📍 Server: http://localhost:5000")
-    print(f"👆 Fingerprint: {'✅ Connected' if fp_connected else '❌ Not Connected'}")
+    port = int(os.environ.get('PORT', '5000'))
+    print(f"📍 Server: http://localhost:{port}")
+    fp_connected = scanner_pool is not None and scanner_pool.any_connected()
+    print(f"👆 Fingerprint: {'✅ Connected' if fp_connected else '⏳ Connecting in background'}")
     print("🔐 Face Auth Threshold: 0.4 (Strict)")
     print("🔐 Fingerprint: Slot-based matching with NO_MATCH rejection")
     print("🚫 Duplicate Check: Hardware + Database validation")
     print("="*70 + "\n")
     
-    app.run(debug=False, port=5000, host='0.0.0.0')
+    app.run(debug=False, port=port, host='0.0.0.0')
@@ -0,0 +1,754 @@
+import bisect
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from itertools import islice
+
+from encoding_store import EncodingFile, pack_encoding, unpack_encoding
+from vote_journal import VoteJournal
+
+
+def fingerprint_key(fingerprint_id, booth_id=''):
+    """Slots are numbered per sensor, a fingerprint is its (booth, slot) pair"""
+    return (str(booth_id or ''), str(fingerprint_id))
+
+
+def fsync_dir(path):
+    """Make a rename inside ``path`` durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JsonVoterStore:
+    """Legacy voters_db.json backend, parsed once and kept in memory.
+
+    has_voted transitions go to an append-only journal next to the snapshot
+    instead of rewriting it; the journal is replayed on startup and folded
+    into the snapshot every COMPACT_EVERY entries. Face encodings live in a
+    memory-mapped ``.encodings`` file, records only keep ``encoding_offset``.
+
+    ``read_only`` opens a file that is only copied from (a migration source):
+    nothing is written or created next to it, inline encodings of older
+    snapshots are served as they are and writes raise PermissionError.
+    """
+
+    COMPACT_EVERY = 1000
+
+    def __init__(self, path='voters_db.json', read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.journal_path = path + '.journal'
+        self.lock = threading.RLock()
+        self.voters = self._load()
+        replayed = 0
+        for entry in VoteJournal.replay(self.journal_path):
+            voter = self.voters.get(entry.get('voter_id'))
+            if voter is not None:
+                voter['has_voted'] = True
+                voter['voted_at'] = entry.get('voted_at')
+                replayed += 1
+        if replayed:
+            print(f"↩️ Replayed {replayed} vote(s) from {self.journal_path}")
+        self.compacting = False
+        if read_only:
+            self.journal = None
+            encodings_path = path + '.encodings'
+            self.encodings = EncodingFile(encodings_path) if os.path.exists(encodings_path) else None
+        else:
+            self.journal = VoteJournal(self.journal_path)
+            self.encodings = EncodingFile(path + '.encodings')
+            self._migrate_encodings()
+        self.fingerprint_index = {
+            fingerprint_key(v['fingerprint_id'], v.get('fingerprint_booth')): v_id
+            for v_id, v in self.voters.items() if v.get('fingerprint_id')
+        }
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    def _migrate_encodings(self):
+        """Move inline float lists from older snapshots into the encodings file"""
+        legacy = [(v_id, v) for v_id, v in self.voters.items() if 'face_encoding' in v]
+        if not legacy:
+            return
+        with self.lock:
+            self._store_encodings([v for _, v in legacy])
+            self._save()
+        print(f"🗜️ Moved {len(legacy)} face encoding(s) to {self.encodings.path}")
+
+    def _store_encodings(self, records):
+        """Replace ``face_encoding`` in records with an offset into the encodings file"""
+        with_encoding = [r for r in records
+                         if r.get('face_encoding') is not None and len(r['face_encoding'])]
+        if with_encoding:
+            offsets = self.encodings.append_many([r['face_encoding'] for r in with_encoding])
+            for record, offset in zip(with_encoding, offsets):
+                record['encoding_offset'] = offset
+        for record in records:
+            record.pop('face_encoding', None)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f'{self.path} is open read-only')
+
+    def _save(self):
+        """Write the whole file atomically (tmp file + rename), call with lock held"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.voters, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # The rename must be on disk before the journal that covers it is dropped
+        fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+        # The snapshot now holds every journaled vote
+        self.journal.truncate()
+
+    def compact(self):
+        """Fold the vote journal into the snapshot"""
+        with self.lock:
+            self._save()
+            self.compacting = False
+        print(f"🗜️ Compacted vote journal into {self.path}")
+
+    def get(self, voter_id, include_encoding=True):
+        with self.lock:
+            voter = self.voters.get(voter_id)
+            if voter is None:
+                return None
+            voter = dict(voter)
+        offset = voter.pop('encoding_offset', None)
+        inline = voter.pop('face_encoding', None)
+        if include_encoding:
+            if offset is not None:
+                voter['face_encoding'] = self.encodings.read(offset)
+            else:
+                voter['face_encoding'] = unpack_encoding(inline) if inline is not None else None
+        return voter
+
+    def exists(self, voter_id):
+        return voter_id in self.voters
+
+    def owns(self, constituency):
+        """An unpartitioned store holds every constituency"""
+        return True
+
+    def find_by_fingerprint(self, fingerprint_id, booth_id=''):
+        return self.fingerprint_index.get(fingerprint_key(fingerprint_id, booth_id))
+
+    def assign_fingerprint_booth(self, booth_id, exclude=()):
+        """Move voters stored without a fingerprint booth to ``booth_id``.
+
+        Returns the IDs left without one because their slot is already taken
+        on that booth (or listed in ``exclude``).
+        """
+        self._check_writable()
+        conflicts = []
+        assigned = 0
+        with self.lock:
+            for voter_id, voter in self.voters.items():
+                fp_id = voter.get('fingerprint_id')
+                if not fp_id or voter.get('fingerprint_booth'):
+                    continue
+                if voter_id in exclude or fingerprint_key(fp_id, booth_id) in self.fingerprint_index:
+                    conflicts.append(voter_id)
+                    continue
+                voter['fingerprint_booth'] = booth_id
+                self.fingerprint_index.pop(fingerprint_key(fp_id), None)
+                self.fingerprint_index[fingerprint_key(fp_id, booth_id)] = voter_id
+                assigned += 1
+            if assigned:
+                self._save()
+        return conflicts
+
+    def add(self, voter_id, record):
+        """Insert a new voter, returns False if the ID or fingerprint is taken"""
+        self._check_writable()
+        with self.lock:
+            if voter_id in self.voters:
+                return False
+            fp_id = record.get('fingerprint_id')
+            fp_key = fingerprint_key(fp_id, record.get('fingerprint_booth'))
+            if fp_id and fp_key in self.fingerprint_index:
+                return False
+            record = dict(record)
+            self._store_encodings([record])
+            self.voters[voter_id] = record
+            if fp_id:
+                self.fingerprint_index[fp_key] = voter_id
+            self._save()
+            return True
+
+    def add_many(self, records):
+        """Insert (voter_id, record) pairs with a single file write.
+
+        Returns the IDs actually inserted, taken IDs or fingerprints are skipped.
+        """
+        self._check_writable()
+        with self.lock:
+            added = []
+            for voter_id, record in records:
+                fp_id = record.get('fingerprint_id')
+                fp_key = fingerprint_key(fp_id, record.get('fingerprint_booth'))
+                if voter_id in self.voters or (fp_id and fp_key in self.fingerprint_index):
+                    continue
+                record = dict(record)
+                self.voters[voter_id] = record
+                added.append((voter_id, record))
+                if fp_id:
+                    self.fingerprint_index[fp_key] = voter_id
+            self._store_encodings([record for _, record in added])
+            self._save()
+        return [voter_id for voter_id, _ in added]
+
+    def mark_voted(self, voter_id, voted_at):
+        """None if unknown, False if already voted, True if marked by this call"""
+        self._check_writable()
+        with self.lock:
+            voter = self.voters.get(voter_id)
+            if voter is None:
+                return None
+            if voter.get('has_voted'):
+                return False
+            previous = voter.get('has_voted', False), voter.get('voted_at')
+            voter['has_voted'] = True
+            voter['voted_at'] = voted_at
+        # Outside the lock so concurrent marks share one fsync
+        try:
+            self.journal.append(voter_id, voted_at)
+        except OSError:
+            with self.lock:
+                voter['has_voted'], voter['voted_at'] = previous
+                if voter['voted_at'] is None:
+                    voter.pop('voted_at')
+            raise
+        if self.journal.entries >= self.COMPACT_EVERY and not self.compacting:
+            self.compacting = True
+            threading.Thread(target=self.compact, daemon=True).start()
+        return True
+
+    def count(self):
+        return len(self.voters)
+
+    def turnout(self):
+        """{constituency: {'registered': n, 'voted': m}}"""
+        totals = {}
+        with self.lock:
+            for v in self.voters.values():
+                counts = totals.setdefault(v.get('constituency', ''), {'registered': 0, 'voted': 0})
+                counts['registered'] += 1
+                if v.get('has_voted'):
+                    counts['voted'] += 1
+        return totals
+
+    def iter_voters(self, constituency=None, include_encoding=False, after=None,
+                    has_voted=None, limit=None):
+        """Yield (voter_id, record) pairs ordered by voter ID.
+
+        ``after`` resumes after that voter ID (keyset pagination), ``has_voted``
+        filters on voting status and ``limit`` caps the number of voters.
+        """
+        with self.lock:
+            voter_ids = sorted(self.voters)
+        start = bisect.bisect_right(voter_ids, after) if after else 0
+        yielded = 0
+        for voter_id in islice(voter_ids, start, None):
+            if limit is not None and yielded >= limit:
+                return
+            voter = self.get(voter_id, include_encoding=include_encoding)
+            if voter is None:
+                continue
+            if constituency and voter.get('constituency') != constituency:
+                continue
+            if has_voted is not None and bool(voter.get('has_voted')) != has_voted:
+                continue
+            yielded += 1
+            yield voter_id, voter
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+
+class SqliteVoterStore:
+    """SQLite backend in WAL mode, one row per voter.
+
+    Encodings are float32 BLOBs (see encoding_store.py) and fingerprints are
+    unique per (fingerprint_booth, fingerprint_id); older databases are
+    converted on open and tagged with ``PRAGMA user_version``.
+    """
+
+    SCHEMA_VERSION = 2
+
+    COLUMNS_WITHOUT_ENCODING = ('voter_id, name, constituency, image_path, fingerprint_id, '
+                                'fingerprint_booth, has_voted, registered_at, voted_at')
+
+    INSERT_COLUMNS = ('voter_id, name, constituency, image_path, face_encoding, fingerprint_id, '
+                      'fingerprint_booth, has_voted, registered_at, voted_at')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS voters (
+            voter_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            constituency TEXT NOT NULL,
+            image_path TEXT,
+            face_encoding BLOB,
+            fingerprint_id TEXT,
+            fingerprint_booth TEXT NOT NULL DEFAULT '',
+            has_voted INTEGER NOT NULL DEFAULT 0,
+            registered_at TEXT,
+            voted_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_voters_constituency
+            ON voters(constituency, has_voted);
+    """
+
+    def __init__(self, path='voters.db'):
+        self.path = path
+        self.local = threading.local()
+        self.conn.executescript(self.SCHEMA)
+        self._upgrade()
+
+    def _upgrade(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        rows = []
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(voters)')}
+        with self.conn:
+            self.conn.execute('BEGIN')
+            if version < 1:
+                rows = self.conn.execute(
+                    "SELECT voter_id, face_encoding FROM voters WHERE typeof(face_encoding) = 'text'"
+                ).fetchall()
+                self.conn.executemany(
+                    'UPDATE voters SET face_encoding = ? WHERE voter_id = ?',
+                    [(pack_encoding(unpack_encoding(enc)), v_id) for v_id, enc in rows])
+            if version < 2:
+                # Rows from before booths were recorded keep '' (the first booth)
+                if 'fingerprint_booth' not in columns:
+                    self.conn.execute(
+                        "ALTER TABLE voters ADD COLUMN fingerprint_booth TEXT NOT NULL DEFAULT ''")
+                self.conn.execute('DROP INDEX IF EXISTS idx_voters_fingerprint')
+                self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_voters_booth_fingerprint '
+                                  'ON voters(fingerprint_booth, fingerprint_id)')
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        if rows:
+            self.conn.execute('VACUUM')
+            print(f"🗜️ Converted {len(rows)} face encoding(s) in {self.path} to float32")
+
+    @property
+    def conn(self):
+        """One connection per thread, Flask serves requests on many threads"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            # FULL fsyncs the WAL on every commit, like the JSON backend's vote
+            # journal, so an acknowledged vote survives a power cut
+            conn.execute('PRAGMA synchronous=FULL')
+            self.local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_voter(row, include_encoding=True):
+        voter = {
+            'name': row['name'],
+            'constituency': row['constituency'],
+            'image_path': row['image_path'],
+            'fingerprint_id': row['fingerprint_id'],
+            'fingerprint_booth': row['fingerprint_booth'],
+            'has_voted': bool(row['has_voted']),
+            'registered_at': row['registered_at'],
+        }
+        if row['voted_at']:
+            voter['voted_at'] = row['voted_at']
+        if include_encoding:
+            voter['face_encoding'] = unpack_encoding(row['face_encoding'])
+        return voter
+
+    def get(self, voter_id, include_encoding=True):
+        row = self.conn.execute(
+            'SELECT * FROM voters WHERE voter_id = ?', (voter_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_voter(row, include_encoding)
+
+    def exists(self, voter_id):
+        row = self.conn.execute(
+            'SELECT 1 FROM voters WHERE voter_id = ?', (voter_id,)).fetchone()
+        return row is not None
+
+    def owns(self, constituency):
+        """An unpartitioned store holds every constituency"""
+        return True
+
+    def find_by_fingerprint(self, fingerprint_id, booth_id=''):
+        row = self.conn.execute(
+            'SELECT voter_id FROM voters WHERE fingerprint_booth = ? AND fingerprint_id = ?',
+            fingerprint_key(fingerprint_id, booth_id)).fetchone()
+        return row['voter_id'] if row else None
+
+    def assign_fingerprint_booth(self, booth_id, exclude=()):
+        """Move voters stored without a fingerprint booth to ``booth_id``, see JsonVoterStore"""
+        with self.conn:
+            self.conn.execute('BEGIN')
+            legacy = [row['voter_id'] for row in self.conn.execute(
+                "SELECT voter_id FROM voters WHERE fingerprint_booth = '' "
+                "AND fingerprint_id IS NOT NULL")]
+            # OR IGNORE leaves a row whose slot is already taken on the booth
+            self.conn.executemany(
+                'UPDATE OR IGNORE voters SET fingerprint_booth = ? WHERE voter_id = ?',
+                [(booth_id, v_id) for v_id in legacy if v_id not in exclude])
+            return [row['voter_id'] for row in self.conn.execute(
+                "SELECT voter_id FROM voters WHERE fingerprint_booth = '' "
+                "AND fingerprint_id IS NOT NULL")]
+
+    def add(self, voter_id, record):
+        """Insert a new voter, returns False if the ID or fingerprint is taken"""
+        try:
+            self.conn.execute(
+                f'INSERT INTO voters ({self.INSERT_COLUMNS}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._record_params(voter_id, record))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    @staticmethod
+    def _record_params(voter_id, record):
+        fp_id = record.get('fingerprint_id')
+        return (
+            voter_id,
+            record.get('name', ''),
+            record.get('constituency', ''),
+            record.get('image_path'),
+            pack_encoding(record.get('face_encoding')),
+            str(fp_id) if fp_id else None,
+            str(record.get('fingerprint_booth') or ''),
+            1 if record.get('has_voted') else 0,
+            record.get('registered_at'),
+            record.get('voted_at'),
+        )
+
+    def add_many(self, records):
+        """Insert (voter_id, record) pairs in one transaction.
+
+        Returns the IDs actually inserted, taken IDs or fingerprints are skipped.
+        """
+        added = []
+        with self.conn:
+            self.conn.execute('BEGIN')
+            for voter_id, record in records:
+                cur = self.conn.execute(
+                    f'INSERT OR IGNORE INTO voters ({self.INSERT_COLUMNS}) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    self._record_params(voter_id, record))
+                if cur.rowcount > 0:
+                    added.append(voter_id)
+        return added
+
+    def mark_voted(self, voter_id, voted_at):
+        """None if unknown, False if already voted, True if marked by this call"""
+        cur = self.conn.execute(
+            'UPDATE voters SET has_voted = 1, voted_at = ? WHERE voter_id = ? AND has_voted = 0',
+            (voted_at, voter_id))
+        if cur.rowcount > 0:
+            return True
+        return False if self.exists(voter_id) else None
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM voters').fetchone()[0]
+
+    def turnout(self):
+        """{constituency: {'registered': n, 'voted': m}}, served by the constituency index"""
+        rows = self.conn.execute(
+            'SELECT constituency, COUNT(*), SUM(has_voted) FROM voters GROUP BY constituency')
+        return {c: {'registered': n, 'voted': voted or 0} for c, n, voted in rows}
+
+    def iter_voters(self, constituency=None, include_encoding=False, after=None,
+                    has_voted=None, limit=None):
+        """Yield (voter_id, record) pairs ordered by voter ID.
+
+        ``after`` resumes after that voter ID (keyset pagination), ``has_voted``
+        filters on voting status and ``limit`` caps the number of voters.
+        Rows are streamed from the cursor, encodings are only read if asked for.
+        """
+        columns = '*' if include_encoding else self.COLUMNS_WITHOUT_ENCODING
+        where, params = [], []
+        if constituency:
+            where.append('constituency = ?')
+            params.append(constituency)
+        if after:
+            where.append('voter_id > ?')
+            params.append(after)
+        if has_voted is not None:
+            where.append('has_voted = ?')
+            params.append(1 if has_voted else 0)
+        sql = f'SELECT {columns} FROM voters'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY voter_id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield row['voter_id'], self._row_to_voter(row, include_encoding)
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+class PartitionedVoterStore:
+    """One backend store per constituency this node serves.
+
+    Each partition is a self-contained store under ``root``
+    (``<constituency>.db``, or ``<constituency>.json`` plus its journal and
+    encodings files), so a partition moves to another node by copying its
+    files there and reassigning it in the router (see partition_router.py).
+    Voter IDs are mapped to their partition, and (booth, slot) fingerprints
+    to their voter, in memory when the store opens.
+    """
+
+    def __init__(self, constituencies, root='partitions', backend='sqlite'):
+        self.root = root
+        self.backend = backend
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.partitions = {c: self._open(c) for c in constituencies}
+        self.directory = {}
+        self.fingerprints = {}
+        for constituency, partition in self.partitions.items():
+            for voter_id, voter in partition.iter_voters():
+                self.directory[voter_id] = constituency
+                if voter.get('fingerprint_id'):
+                    self.fingerprints[fingerprint_key(voter['fingerprint_id'],
+                                                      voter.get('fingerprint_booth'))] = voter_id
+        print(f"🗂️ Serving {len(self.partitions)} partition(s) from {root}: "
+              f"{', '.join(f'{c} ({n})' for c, n in self.partition_counts().items())}")
+
+    def _open(self, constituency):
+        if self.backend == 'json':
+            return JsonVoterStore(os.path.join(self.root, f'{constituency}.json'))
+        return SqliteVoterStore(os.path.join(self.root, f'{constituency}.db'))
+
+    def _partition_of(self, voter_id):
+        constituency = self.directory.get(voter_id)
+        return self.partitions[constituency] if constituency is not None else None
+
+    def owns(self, constituency):
+        return constituency in self.partitions
+
+    def partition_counts(self):
+        counts = dict.fromkeys(self.partitions, 0)
+        for constituency in self.directory.values():
+            counts[constituency] += 1
+        return counts
+
+    def get(self, voter_id, include_encoding=True):
+        partition = self._partition_of(voter_id)
+        return partition.get(voter_id, include_encoding) if partition else None
+
+    def exists(self, voter_id):
+        return voter_id in self.directory
+
+    def find_by_fingerprint(self, fingerprint_id, booth_id=''):
+        return self.fingerprints.get(fingerprint_key(fingerprint_id, booth_id))
+
+    def assign_fingerprint_booth(self, booth_id, exclude=()):
+        """Move voters stored without a fingerprint booth to ``booth_id``, see JsonVoterStore"""
+        with self.lock:
+            # A slot taken on the booth in another partition conflicts too
+            exclude = set(exclude) | {
+                voter_id for (booth, fp_id), voter_id in self.fingerprints.items()
+                if not booth and fingerprint_key(fp_id, booth_id) in self.fingerprints}
+            conflicts = []
+            for partition in self.partitions.values():
+                conflicts += partition.assign_fingerprint_booth(booth_id, exclude)
+            for (booth, fp_id), voter_id in list(self.fingerprints.items()):
+                if not booth and voter_id not in conflicts:
+                    del self.fingerprints[(booth, fp_id)]
+                    self.fingerprints[fingerprint_key(fp_id, booth_id)] = voter_id
+        return conflicts
+
+    def add(self, voter_id, record):
+        """Insert a new voter into its constituency's partition.
+
+        Returns False if the ID or fingerprint is taken on this node, raises
+        KeyError for a constituency this node does not serve.
+        """
+        constituency = record.get('constituency', '')
+        partition = self.partitions[constituency]
+        with self.lock:
+            fp_id = record.get('fingerprint_id')
+            fp_key = fingerprint_key(fp_id, record.get('fingerprint_booth'))
+            if voter_id in self.directory or (fp_id and fp_key in self.fingerprints):
+                return False
+            if not partition.add(voter_id, record):
+                return False
+            self.directory[voter_id] = constituency
+            if fp_id:
+                self.fingerprints[fp_key] = voter_id
+            return True
+
+    def add_many(self, records):
+        """Insert (voter_id, record) pairs, one batch per partition.
+
+        Records for constituencies this node does not serve are skipped.
+        Returns the IDs actually inserted.
+        """
+        grouped = {}
+        added = []
+        skipped = 0
+        for voter_id, record in records:
+            constituency = record.get('constituency', '')
+            if constituency not in self.partitions:
+                skipped += 1
+                continue
+            grouped.setdefault(constituency, []).append((voter_id, record))
+        with self.lock:
+            for constituency, rows in grouped.items():
+                rows = [(v_id, rec) for v_id, rec in rows if v_id not in self.directory
+                        and fingerprint_key(rec.get('fingerprint_id'), rec.get('fingerprint_booth'))
+                        not in self.fingerprints]
+                inserted = set(self.partitions[constituency].add_many(rows))
+                for voter_id, record in rows:
+                    if voter_id in inserted:
+                        added.append(voter_id)
+                        self.directory[voter_id] = constituency
+                        if record.get('fingerprint_id'):
+                            self.fingerprints[fingerprint_key(
+                                record['fingerprint_id'], record.get('fingerprint_booth'))] = voter_id
+        if skipped:
+            print(f"⚠️ Skipped {skipped} voter(s) of constituencies not served by this node")
+        return added
+
+    def mark_voted(self, voter_id, voted_at):
+        partition = self._partition_of(voter_id)
+        return partition.mark_voted(voter_id, voted_at) if partition else None
+
+    def count(self):
+        return len(self.directory)
+
+    def turnout(self):
+        totals = {}
+        for partition in self.partitions.values():
+            for constituency, counts in partition.turnout().items():
+                bucket = totals.setdefault(constituency, {'registered': 0, 'voted': 0})
+                bucket['registered'] += counts['registered']
+                bucket['voted'] += counts['voted']
+        return totals
+
+    def iter_voters(self, constituency=None, include_encoding=False, after=None,
+                    has_voted=None, limit=None):
+        """Yield (voter_id, record) pairs ordered by voter ID, see SqliteVoterStore"""
+        filters = {'include_encoding': include_encoding, 'after': after,
+                   'has_voted': has_voted, 'limit': limit}
+        if constituency:
+            partition = self.partitions.get(constituency)
+            if partition is not None:
+                yield from partition.iter_voters(**filters)
+            return
+        yield from islice(heapq.merge(
+            *(p.iter_voters(**filters) for p in self.partitions.values()),
+            key=lambda item: item[0]), limit)
+
+    def close(self):
+        for partition in self.partitions.values():
+            partition.close()
+
+
+def assign_legacy_fingerprints(store, booth_id):
+    """Voters stored before booths were recorded enrolled on the first booth,
+    give them ``booth_id`` so the (booth, slot) uniqueness covers them"""
+    conflicts = store.assign_fingerprint_booth(booth_id)
+    if conflicts:
+        print(f"⚠️ {len(conflicts)} voter(s) without a fingerprint booth hold a slot already "
+              f"registered on {booth_id}, left unassigned: {', '.join(sorted(conflicts)[:20])}")
+    return conflicts
+
+
+def split_into_partitions(source, root='partitions', backend='sqlite'):
+    """Copy every voter of ``source`` into per-constituency partition stores"""
+    constituencies = sorted(source.turnout())
+    target = PartitionedVoterStore(constituencies, root, backend)
+    batch = []
+    for item in source.iter_voters(include_encoding=True):
+        batch.append(item)
+        if len(batch) >= 10000:
+            target.add_many(batch)
+            batch = []
+    target.add_many(batch)
+    counts = target.partition_counts()
+    target.close()
+    print(f"✅ Split {sum(counts.values())} voter(s) into {len(counts)} partition(s) under {root}")
+    return counts
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """One-shot copy of voters_db.json into a SQLite store, returns rows copied"""
+    source = JsonVoterStore(json_path, read_only=True)
+    target = SqliteVoterStore(db_path)
+    before = target.count()
+    target.add_many(source.iter_voters(include_encoding=True))
+    copied = target.count() - before
+    target.close()
+    print(f"✅ Migrated {copied} voter(s) from {json_path} to {db_path}")
+    return copied
+
+
+def open_store(backend=None, json_path='voters_db.json', db_path='voters.db', partitions=None):
+    """Open the configured backend (VOTER_STORE=sqlite|json).
+
+    With NODE_PARTITIONS='jalna,beed' (or ``partitions``) only those
+    constituencies are served, each from its own store under PARTITION_DIR.
+    """
+    backend = (backend or os.environ.get('VOTER_STORE', 'sqlite')).lower()
+    if partitions is None:
+        partitions = [c.strip().lower() for c in os.environ.get('NODE_PARTITIONS', '').split(',')
+                      if c.strip()]
+    if partitions:
+        return PartitionedVoterStore(partitions, os.environ.get('PARTITION_DIR', 'partitions'),
+                                     backend)
+    if backend == 'json':
+        return JsonVoterStore(json_path)
+    if backend == 'sqlite':
+        fresh = not os.path.exists(db_path)
+        if fresh and os.path.exists(json_path):
+            migrate_json_to_sqlite(json_path, db_path)
+        return SqliteVoterStore(db_path)
+    raise ValueError(f"Unknown voter store backend: {backend}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrate voters_db.json into SQLite')
+    parser.add_argument('--json', default='voters_db.json')
+    parser.add_argument('--db', default='voters.db')
+    parser.add_argument('--split', metavar='PARTITION_DIR',
+                        help='Split the store into per-constituency partitions instead')
+    args = parser.parse_args()
+    if args.split:
+        split_into_partitions(open_store(json_path=args.json, db_path=args.db, partitions=[]),
+                              args.split, os.environ.get('VOTER_STORE', 'sqlite').lower())
+    else:
+        migrate_json_to_sqlite(args.json, args.db)
@@ -2,7 +2,6 @@ import React, { useState, useEffect } from 'react';
 import { ethers } from 'ethers';
 import VotingContract from './VotingABI.json';
 import FaceAuth from './FaceAuth';
-import FingerprintAuth from './FingerprintAuth';
 
 const CONTRACT_ADDRESS = "YOUR_CONTRACT_ADDRESS";
 
@@ -29,7 +28,6 @@ function BlockchainVoting() {
   const [voterId, setVoterId] = useState('');
   const [voterIdError, setVoterIdError] = useState('');
   const [checkingVoterId, setCheckingVoterId] = useState(false);
-  const [authMethod, setAuthMethod] = useState(null);
   
   const [authenticatedVoter, setAuthenticatedVoter] = useState(null);
   const [voterHasVoted, setVoterHasVoted] = useState(false);
@@ -84,7 +82,7 @@ function BlockchainVoting() {
         setStep('voting');
         setTimeout(() => resetSystem(), 5000);
       } else {
-        setStep('choose_auth');
+        setStep('authenticating');
       }
     } catch (error) {
       setVoterIdError('Connection error. Please check backend server.');
@@ -175,7 +173,10 @@ function BlockchainVoting() {
         await fetch('http://localhost:5000/api/mark_voted', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ voter_id: authenticatedVoter.voter_id })
+          body: JSON.stringify({
+            voter_id: authenticatedVoter.voter_id,
+            session_token: authenticatedVoter.session_token
+          })
         });
       }
     } catch (error) {
@@ -187,7 +188,6 @@ function BlockchainVoting() {
     setStep('voter_id');
     setVoterId('');
     setVoterIdError('');
-    setAuthMethod(null);
     setAuthenticatedVoter(null);
     setContract(null);
     setVoterHasVoted(false);
@@ -313,129 +313,17 @@ function BlockchainVoting() {
           </div>
         )}
 
-        {/* STEP 2: CHOOSE AUTHENTICATION METHOD */}
-        {step === 'choose_auth' && (
-          <div style={{ textAlign: 'center' }}>
-            <div style={{ fontSize: '64px', marginBottom: '20px' }}>🔐</div>
-            
-            <h2 style={{ 
-              fontSize: '28px', 
-              fontWeight: '700', 
-              color: '#2d3748', 
-              margin: '0 0 12px 0' 
-            }}>
-              Choose Authentication Method
-            </h2>
-            
-            <p style={{ 
-              fontSize: '16px', 
-              color: '#718096', 
-              marginBottom: '40px' 
-            }}>
-              Select how you want to verify your identity
-            </p>
-
-            <div style={{ 
-              display: 'grid', 
-              gridTemplateColumns: '1fr 1fr', 
-              gap: '24px',
-              maxWidth: '600px',
-              margin: '0 auto'
-            }}>
-              <button
-                onClick={() => {
-                  setAuthMethod('face');
-                  setStep('authenticating');
-                }}
-                style={{
-                  padding: '40px 20px',
-                  background: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-                  color: 'white',
-                  border: 'none',
-                  borderRadius: '16px',
-                  cursor: 'pointer',
-                  boxShadow: '0 4px 12px rgba(102, 126, 234, 0.4)',
-                  transition: 'transform 0.2s'
-                }}
-                onMouseEnter={(e) => e.target.style.transform = 'scale(1.05)'}
-                onMouseLeave={(e) => e.target.style.transform = 'scale(1)'}
-              >
-                <div style={{ fontSize: '64px', marginBottom: '16px' }}>📸</div>
-                <h3 style={{ fontSize: '20px', fontWeight: '600', margin: '0 0 8px 0' }}>
-                  Face Recognition
-                </h3>
-                <p style={{ fontSize: '14px', margin: 0, opacity: 0.9 }}>
-                  Verify using your face
-                </p>
-              </button>
-
-              <button
-                onClick={() => {
-                  setAuthMethod('fingerprint');
-                  setStep('authenticating');
-                }}
-                style={{
-                  padding: '40px 20px',
-                  background: 'linear-gradient(135deg, #48bb78 0%, #38a169 100%)',
-                  color: 'white',
-                  border: 'none',
-                  borderRadius: '16px',
-                  cursor: 'pointer',
-                  boxShadow: '0 4px 12px rgba(72, 187, 120, 0.4)',
-                  transition: 'transform 0.2s'
-                }}
-                onMouseEnter={(e) => e.target.style.transform = 'scale(1.05)'}
-                onMouseLeave={(e) => e.target.style.transform = 'scale(1)'}
-              >
-                <div style={{ fontSize: '64px', marginBottom: '16px' }}>👆</div>
-                <h3 style={{ fontSize: '20px', fontWeight: '600', margin: '0 0 8px 0' }}>
-                  Fingerprint
-                </h3>
-                <p style={{ fontSize: '14px', margin: 0, opacity: 0.9 }}>
-                  Verify using fingerprint sensor
-                </p>
-              </button>
-            </div>
-
-            <button
-              onClick={() => setStep('voter_id')}
-              style={{
-                marginTop: '32px',
-                padding: '12px 32px',
-                fontSize: '16px',
-                background: 'transparent',
-                color: '#667eea',
-                border: '2px solid #667eea',
-                borderRadius: '8px',
-                cursor: 'pointer',
-                fontWeight: '600'
-              }}
-            >
-              ← Back
-            </button>
-          </div>
-        )}
-
-        {/* STEP 3: AUTHENTICATING */}
+        {/* STEP 2: FACE + FINGERPRINT */}
         {step === 'authenticating' && (
           <div>
-            {authMethod === 'face' && (
-              <FaceAuth 
-                voterId={voterId.trim().toUpperCase()} 
-                onAuthSuccess={handleAuthSuccess} 
-              />
-            )}
-
-            {authMethod === 'fingerprint' && (
-              <FingerprintAuth 
-                voterId={voterId.trim().toUpperCase()} 
-                onAuthSuccess={handleAuthSuccess} 
-              />
-            )}
+            <FaceAuth 
+              voterId={voterId.trim().toUpperCase()} 
+              onAuthSuccess={handleAuthSuccess} 
+            />
 
             <div style={{ textAlign: 'center', marginTop: '24px' }}>
               <button
-                onClick={() => setStep('choose_auth')}
+                onClick={() => setStep('voter_id')}
                 style={{
                   padding: '12px 32px',
                   fontSize: '16px',
@@ -447,13 +335,13 @@ function BlockchainVoting() {
                   fontWeight: '600'
                 }}
               >
-                ← Back to Authentication Methods
+                ← Back
               </button>
             </div>
           </div>
         )}
 
-        {/* STEP 4: VOTING */}
+        {/* STEP 3: VOTING */}
         {step === 'voting' && (
           <div>
             {!voterHasVoted && !justVoted && (
@@ -1,8 +1,14 @@
 import React, { useState, useRef, useEffect } from 'react';
 
+// A short burst is sent in one request, the server ranks the frames and stops
+// at the first one that matches, so a blink or blur does not cost a retry
+const BURST_FRAMES = 3;
+const BURST_INTERVAL_MS = 150;
+
 const FaceAuth = ({ voterId, onAuthSuccess }) => {
   const [cameraState, setCameraState] = useState('idle');
   const [capturedImage, setCapturedImage] = useState(null);
+  const [capturedFrames, setCapturedFrames] = useState([]);
   const [error, setError] = useState('');
   const [message, setMessage] = useState('');
   const videoRef = useRef(null);
@@ -40,7 +46,7 @@ const FaceAuth = ({ voterId, onAuthSuccess }) => {
     }
   };
 
-  const capturePhoto = () => {
+  const capturePhoto = async () => {
     if (!videoRef.current || !canvasRef.current) return;
 
     const video = videoRef.current;
@@ -50,10 +56,16 @@ const FaceAuth = ({ voterId, onAuthSuccess }) => {
     canvas.height = video.videoHeight;
 
     const ctx = canvas.getContext('2d');
-    ctx.drawImage(video, 0, 0);
-
-    const imageData = canvas.toDataURL('image/jpeg', 0.85);
-    setCapturedImage(imageData);
+    const frames = [];
+    for (let i = 0; i < BURST_FRAMES; i++) {
+      if (i > 0) {
+        await new Promise(resolve => setTimeout(resolve, BURST_INTERVAL_MS));
+      }
+      ctx.drawImage(video, 0, 0);
+      frames.push(canvas.toDataURL('image/jpeg', 0.85));
+    }
+    setCapturedImage(frames[0]);
+    setCapturedFrames(frames);
     
     stopCamera();
     setCameraState('captured');
@@ -61,24 +73,27 @@ const FaceAuth = ({ voterId, onAuthSuccess }) => {
 
   const retakePhoto = () => {
     setCapturedImage(null);
+    setCapturedFrames([]);
     setError('');
     setMessage('');
     setCameraState('idle');
   };
 
   const authenticateVoter = async () => {
-    if (!capturedImage || !voterId) return;
+    if (!capturedFrames.length || !voterId) return;
 
     setCameraState('verifying');
-    setMessage('🔍 Verifying your identity...');
+    setMessage('👆 Place your registered finger on the sensor...');
 
+    // Face and fingerprint are verified together, the scan runs while the
+    // photo is processed and a session token comes back for mark_voted
     try {
-      const response = await fetch('http://localhost:5000/api/authenticate', {
+      const response = await fetch('http://localhost:5000/api/authenticate/dual', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ 
           voter_id: voterId,
-          face_data: capturedImage 
+          face_frames: capturedFrames
         })
       });
 
@@ -87,9 +102,10 @@ const FaceAuth = ({ voterId, onAuthSuccess }) => {
       if (result.success) {
         setMessage(`✅ Authenticated: ${result.voter.name}`);
         setTimeout(() => {
-          onAuthSuccess(result.voter);
+          onAuthSuccess({ ...result.voter, session_token: result.session_token });
         }, 1500);
       } else {
+        setMessage('');
         setError(result.error || 'Authentication failed');
         setCameraState('captured');
       }
@@ -116,7 +132,7 @@ const FaceAuth = ({ voterId, onAuthSuccess }) => {
         fontSize: '24px',
         fontWeight: '700'
       }}>
-        🔐 Face Authentication
+        🔐 Face + Fingerprint Verification
       </h2>
 
       {error && (